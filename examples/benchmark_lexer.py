@@ -0,0 +1,40 @@
+import os
+import sys
+import time
+
+from smali import SmaliReader, ClassVisitor, Line, LineTokenizer
+
+path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+    os.path.dirname(__file__), "..", "example.smali"
+)
+rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+with open(path, "r", encoding="utf-8") as fp:
+    source = fp.read()
+lines = source.splitlines()
+
+
+def bench_lines(line_type: type) -> float:
+    line = line_type(None)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for raw in lines:
+            line.reset(raw)
+            while line.has_next():
+                next(line)
+    return len(lines) * rounds / (time.perf_counter() - start)
+
+
+def bench_reader(line_type: type) -> float:
+    reader = SmaliReader(comments=True)
+    reader.line = line_type(None)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        reader.visit(source, ClassVisitor())
+    return len(lines) * rounds / (time.perf_counter() - start)
+
+
+for name, func in (("tokenize", bench_lines), ("SmaliReader.visit", bench_reader)):
+    old = func(Line)
+    new = func(LineTokenizer)
+    print(f"{name:<18} Line: {old:>10,.0f} lines/s  LineTokenizer: {new:>10,.0f} lines/s  ({new / old:.2f}x)")
@@ -0,0 +1,58 @@
+import sys
+import tracemalloc
+
+from smali.bridge import SmaliVM, SmaliObject
+
+classes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+methods = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+objects = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+
+
+def new_class(index: int) -> str:
+    lines = [
+        f".class public Lcom/example/gen/Class{index};",
+        ".super Ljava/lang/Object;",
+        '.source "Generated.java"',
+        "",
+        ".field private count:I",
+        ".field private name:Ljava/lang/String;",
+        f".field public static final ID:I = {index:#x}",
+        "",
+    ]
+    for i in range(methods):
+        lines += [
+            f".method public get{i}(ILjava/lang/String;)I",
+            "    .registers 4",
+            "    .annotation runtime Ljava/lang/Deprecated;",
+            "    .end annotation",
+            f"    const/16 v0, {i:#x}",
+            "    add-int v0, v0, p1",
+            "    if-lez v0, :cond_0",
+            "    iget v1, p0, Lcom/example/gen/Class0;->count:I",
+            "    add-int/2addr v0, v1",
+            "    :cond_0",
+            "    return v0",
+            ".end method",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+sources = [new_class(i) for i in range(classes)]
+
+tracemalloc.start()
+vm = SmaliVM()
+base, _ = tracemalloc.get_traced_memory()
+loaded = [vm.classloader.load_class(source, init=False) for source in sources]
+used, peak = tracemalloc.get_traced_memory()
+used -= base
+
+print(f"loaded {classes:,} classes ({classes * methods:,} methods)")
+print(f"  total:      {used / 1024 / 1024:>10.2f} MiB (peak {peak / 1024 / 1024:.2f} MiB)")
+print(f"  per class:  {used / classes:>10,.0f} bytes")
+print(f"  per method: {used / (classes * methods):>10,.0f} bytes")
+
+base, _ = tracemalloc.get_traced_memory()
+instances = [SmaliObject(loaded[i % classes]) for i in range(objects)]
+used = tracemalloc.get_traced_memory()[0] - base
+print(f"  per object: {used / objects:>10,.0f} bytes")
@@ -23,12 +23,16 @@ Basic component classes when working with the Smali language.
 import re
 
 from enum import Enum, IntFlag
+from functools import lru_cache
 
 __all__ = [
     "AccessType",
     "Token",
     "Line",
+    "LineTokenizer",
+    "TokenKind",
     "smali_value",
+    "smali_values",
     "is_type_descriptor",
     "Signature",
     "SVMType",
@@ -192,6 +196,8 @@ class Token(Enum):
 class Line:
     """Simple peekable Iterator implementation."""
 
+    __slots__ = ("_it", "_head", "_elements", "raw", "cleaned", "eol_comment")
+
     RE_EOL_COMMENT = re.compile(r"\s*#.*$")
     """Pattern for EOL (end of line) comments"""
 
@@ -340,8 +346,226 @@ class Line:
         return elements
 
 
+class TokenKind(Enum):
+    """Classification of a single token within a source line.
+
+    >>> LineTokenizer.classify(".method")
+    <TokenKind.DIRECTIVE: 1>
+    >>> LineTokenizer.classify("Lcom/example/A;->foo()V")
+    <TokenKind.MEMBER: 6>
+    """
+
+    DIRECTIVE = 1
+    LABEL = 2
+    REGISTER = 3
+    LITERAL = 4
+    DESCRIPTOR = 5
+    MEMBER = 6
+    IDENTIFIER = 7
+    SYMBOL = 8
+    COMMENT = 9
+
+
+class LineTokenizer(Line):
+    """Single-pass replacement for :class:`Line`.
+
+    Instead of removing the EOL comment, counting quotes and splitting the
+    line character by character, the whole line is tokenized in one pass:
+    lines without quotes or ``#`` are split on whitespace directly, all
+    other lines by one master regex. String and char literals are kept
+    together (escaped quotes are respected) and an unquoted ``#`` always
+    starts the EOL comment. The elements are stored in a list and accessed
+    by index, so no iterator object has to be created per line.
+
+    >>> line = LineTokenizer('const-string v0, "a # b" # comment')
+    >>> next(line), line.peek(), line.last()
+    ('const-string', 'v0,', '"a # b"')
+    >>> line.eol_comment
+    'comment'
+    >>> line.tokens
+    [(<TokenKind.IDENTIFIER: 7>, 'const-string'), (<TokenKind.REGISTER: 3>, 'v0,'), ...]
+    """
+
+    RE_TOKEN = re.compile(
+        r"""(\#.*)|((?:[^\s"'\#]+|"[^"\\]*(?:\\.[^"\\]*)*"?|'[^'\\]*(?:\\.[^'\\]*)*'?)+)"""
+    )
+    """Master pattern: either the EOL comment or a whitespace separated token."""
+
+    __slots__ = ("_pos",)
+
+    KIND_TABLE: dict = {
+        ".": TokenKind.DIRECTIVE,
+        ":": TokenKind.LABEL,
+        '"': TokenKind.LITERAL,
+        "'": TokenKind.LITERAL,
+        "-": TokenKind.LITERAL,
+        "+": TokenKind.LITERAL,
+        "#": TokenKind.COMMENT,
+        "{": TokenKind.REGISTER,
+        "}": TokenKind.SYMBOL,
+        "=": TokenKind.SYMBOL,
+        "[": TokenKind.DESCRIPTOR,
+        "L": TokenKind.DESCRIPTOR,
+        "v": TokenKind.REGISTER,
+        "p": TokenKind.REGISTER,
+        **{str(digit): TokenKind.LITERAL for digit in range(10)},
+    }
+    """Precomputed classification of a token by its first character.
+
+    :meta private:
+    """
+
+    def __init__(self, line: str | None) -> None:
+        if isinstance(line, (bytearray, bytes)):
+            line = line.decode()
+
+        self._elements = []
+        self._pos = 0
+        self.raw = ""
+        self.cleaned = ""
+        self.eol_comment = None
+        self.reset(line)
+
+    def reset(self, line: str | None = None) -> None:
+        """Tokenizes the given line and moves the cursor to its first element.
+
+        :param line: the next line, defaults to None
+        :type line: str, optional
+        """
+        self._pos = 0
+        if not line:
+            self._elements = []
+            return
+
+        self.raw = line.rstrip()
+        cleaned = self.raw.lstrip()
+        self.eol_comment = None
+        if '"' not in cleaned and "'" not in cleaned and "#" not in cleaned:
+            # Most lines contain neither literals nor comments, so a plain
+            # whitespace split is sufficient here.
+            self.cleaned = cleaned
+            self._elements = cleaned.split()
+            return
+
+        found = LineTokenizer.RE_TOKEN.findall(cleaned)
+        if found and found[-1][0]:
+            # The comment pattern consumes the rest of the line, so it can
+            # only be the last match.
+            comment = found.pop()[0]
+            self.eol_comment = comment.lstrip("# ")
+            cleaned = cleaned[: len(cleaned) - len(comment)].rstrip()
+
+        self.cleaned = cleaned
+        self._elements = [token for _, token in found]
+
+    def __next__(self) -> str:
+        pos = self._pos
+        if pos >= len(self._elements):
+            raise StopIteration()
+
+        self._pos = pos + 1
+        return self._elements[pos]
+
+    def peek(self, default: str | Any = Line._default) -> str | Any:
+        """Returns the current element if this line.
+
+        This method won't move forwards.
+
+        :param default: the default value to return, defaults to _default
+        :type default: str, optional
+        :raises StopIteration: if the end of this line has been reached
+        :return: the current value
+        :rtype: str
+        """
+        if self._pos >= len(self._elements):
+            if default is not Line._default:
+                return default
+            raise StopIteration()
+        return self._elements[self._pos]
+
+    def __bool__(self) -> bool:
+        return self._pos < len(self._elements)
+
+    def has_next(self) -> bool:
+        """Returns whether there as a following element.
+
+        :return: True if next() can be called safely
+        :rtype: bool
+        """
+        return self._pos < len(self._elements)
+
+    @property
+    def elements(self) -> list:
+        """Returns all tokens of this line (without the EOL comment).
+
+        :return: the token strings
+        :rtype: list
+        """
+        return self._elements
+
+    @property
+    def tokens(self) -> list:
+        """Returns the typed tokens of this line including the EOL comment.
+
+        :return: a list of ``(TokenKind, str)`` tuples
+        :rtype: list
+        """
+        tokens = [(LineTokenizer.classify(x), x) for x in self._elements]
+        if self.eol_comment is not None:
+            tokens.append((TokenKind.COMMENT, self.eol_comment))
+        return tokens
+
+    @staticmethod
+    def classify(token: str) -> TokenKind:
+        """Returns the kind of the given token.
+
+        The first character selects the candidate kind; registers, descriptors
+        and member references need one additional check.
+
+        :param token: the token to classify
+        :type token: str
+        :return: the token's kind
+        :rtype: TokenKind
+        """
+        if not token:
+            return TokenKind.SYMBOL
+
+        if "->" in token or "(" in token:
+            return TokenKind.MEMBER
+
+        kind = LineTokenizer.KIND_TABLE.get(token[0], TokenKind.IDENTIFIER)
+        if kind == TokenKind.REGISTER and token[0] != "{":
+            if not token.rstrip(",}").lstrip("vp").isdigit():
+                kind = TokenKind.IDENTIFIER
+
+        elif kind == TokenKind.DESCRIPTOR:
+            if token[0] == "L" and not token.rstrip(",").endswith(";"):
+                kind = TokenKind.IDENTIFIER
+
+        elif kind == TokenKind.DIRECTIVE and token == "..":
+            kind = TokenKind.SYMBOL
+
+        elif kind == TokenKind.IDENTIFIER:
+            if token in ("true", "false", "null"):
+                kind = TokenKind.LITERAL
+            elif ":" in token:
+                # field references in the form of name:descriptor
+                kind = TokenKind.MEMBER
+
+        return kind
+
+
 class Signature:
-    """Internal class to encapsulate method signatures."""
+    """Internal class to encapsulate method signatures.
+
+    Instances are interned, i.e. creating a signature from a recently used
+    string returns the existing instance (the amount of cached signatures is
+    bounded by :data:`INTERN_CACHE_SIZE`). Therefore, signatures must be
+    treated as immutable:
+
+    >>> Signature("<init>(II)V") is Signature("<init>(II)V")
+    True
+    """
 
     CLINIT = "<clinit>"
     """Static block initializer"""
@@ -349,11 +573,34 @@ class Signature:
     INIT = "<init>"
     """Constructor method"""
 
-    def __init__(self, __signature: str | SVMType) -> None:
-        self.__signature = str(__signature)
-        self.__params = None
-        self.__return_type = None
-        self.__name = None
+    __slots__ = ("__signature", "__params", "__return_type", "__name")
+
+    def __new__(cls, __signature: str | SVMType) -> Signature:
+        if cls is Signature:
+            return _intern_signature(str(__signature))
+        return cls._create(str(__signature))
+
+    @classmethod
+    def _create(cls, __signature: str) -> Signature:
+        instance = object.__new__(cls)
+        instance.__signature = __signature
+        instance.__params = None
+        instance.__return_type = None
+        instance.__name = None
+        return instance
+
+    def __reduce__(self):
+        return (self.__class__, (self.__signature,))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, Signature):
+            return self.__signature == other.__signature
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.__signature)
 
     @property
     def sig(self) -> str:
@@ -392,10 +639,11 @@ class Signature:
         if "->" in name:
             name = name[name.find("->") + 2 :]
         # Handle bracket names if not <clinit> or <init>
-        if name in (Signature.INIT, Signature.CLINIT):
-            return name
+        if name not in (Signature.INIT, Signature.CLINIT):
+            name = name.rstrip(">").lstrip("<")
 
-        return name.rstrip(">").lstrip("<")
+        self.__name = name
+        return name
 
     @property
     def declaring_class(self) -> SVMType | None:
@@ -428,8 +676,9 @@ class Signature:
         :return: the method parameters
         :rtype: list
         """
-        if self.__params:
-            return self.__params
+        if self.__params is not None:
+            # The cached tuple is shared by all users of this signature
+            return list(self.__params)
 
         start = self.__signature.find("(")
         end = self.__signature.find(")")  # we don't want the closing brace
@@ -438,6 +687,7 @@ class Signature:
 
         params = self.__signature[start + 1 : end]
         if not params:
+            self.__params = ()
             return []
 
         param_list = []
@@ -465,8 +715,8 @@ class Signature:
         if current_param:
             param_list.append(SVMType(current_param))
 
-        self.__params = param_list
-        return self.__params
+        self.__params = tuple(param_list)
+        return param_list
 
     @property  # lazy
     def return_type(self) -> SVMType:
@@ -513,7 +763,16 @@ class Signature:
         return f'Signature("{self.__signature}")'
 
 
+RE_PRIMITIVE_TYPE = re.compile(r"\[*[ZCBSIFVJD]$")
+
+
 class SVMType:
+    """Internal class to classify and normalize type descriptors.
+
+    Like :class:`Signature`, instances are interned and therefore immutable.
+    Two types are equal if their normalized descriptors are equal.
+    """
+
     class TYPES(Enum):
         """Represents the classification of a type descriptor."""
 
@@ -523,18 +782,41 @@ class SVMType:
         METHOD = 4
         UNKNOWN = 5
 
-    def __init__(self, __type: str) -> None:
-        self.__class = SVMType.TYPES.UNKNOWN
-        self.__dim = __type.count("[")
-        self.__type = self._clean(str(__type))
-        self.__array_type = None
-        if self.dim > 0 and not self.is_signature():
-            self.__class = SVMType.TYPES.ARRAY
-            self.__array_type = SVMType(self.__type.replace("[", ""))
+    __slots__ = ("__class", "__dim", "__type", "__array_type")
+
+    def __new__(cls, __type: str) -> SVMType:
+        if cls is SVMType:
+            return _intern_type(str(__type))
+        return cls._create(str(__type))
+
+    @classmethod
+    def _create(cls, __type: str) -> SVMType:
+        instance = object.__new__(cls)
+        instance.__class = SVMType.TYPES.UNKNOWN
+        instance.__dim = __type.count("[")
+        instance.__type = instance._clean(__type)
+        instance.__array_type = None
+        if instance.dim > 0 and not instance.is_signature():
+            instance.__class = SVMType.TYPES.ARRAY
+            instance.__array_type = SVMType(instance.__type.replace("[", ""))
+        return instance
+
+    def __reduce__(self):
+        return (self.__class__, (self.__type,))
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, SVMType):
+            return self.__type == other.__type
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.__type)
 
     def _clean(self, __type: str) -> str:
         # 1. check if we have a primitive type:
-        if re.match(r"\[*[ZCBSIFVJD]$", __type):
+        if RE_PRIMITIVE_TYPE.match(__type):
             self.__class = SVMType.TYPES.PRIMITIVE
             return __type
 
@@ -684,34 +966,62 @@ class SVMType:
         return self.pretty_name.split(".")[-1]
 
 
+INTERN_CACHE_SIZE = 1 << 16
+"""Maximum amount of interned :class:`SVMType` and :class:`Signature` instances
+(each). Subclasses are never interned."""
+
+_intern_type = lru_cache(maxsize=INTERN_CACHE_SIZE)(SVMType._create)
+_intern_signature = lru_cache(maxsize=INTERN_CACHE_SIZE)(Signature._create)
+
+
+@lru_cache(maxsize=4096)
 def smali_value(value: str) -> int | float | str | SVMType | bool:
     """Parses the given string and returns its Smali value representation.
 
+    The literal is classified by its first and last character and then
+    converted in one step. Results are kept in a bounded LRU cache, which
+    can be reset with ``smali_value.cache_clear()``.
+
+    >>> smali_value("0x7ft")
+    127
+    >>> smali_value("-1.5f")
+    -1.5
+    >>> smali_value("Ljava/lang/String;")
+    SVMType("Ljava/lang/String;")
+
     :param value: the value as a string
     :type value: str
     :raises ValueError: if it has no valid Smali type
     :return: the Smali value representation
     :rtype: int | float | str | SVMType | bool
     """
-    actual_value = None
-    for i, entry in enumerate(TYPE_MAP):
-        matcher, wrapper = entry
-        if matcher.match(value):
-            if i <= 3:  # hex value possible
-                hex_val = RE_HEX_VALUE.match(value) is not None
-                if not hex_val:
-                    actual_value = wrapper(value)
-                else:
-                    actual_value = wrapper(value, base=16)
-            else:
-                actual_value = wrapper(value)
-            break
-
     # Handling of null values is not implemented yet
-    if actual_value is None:
-        raise ValueError(f"Could not find any matching primitive type for {value}")
+    decoder = LITERAL_DECODERS.get(value[:1])
+    if decoder is not None:
+        try:
+            actual_value = decoder(value)
+        except ValueError:
+            actual_value = None
+
+        if actual_value is not None:
+            return actual_value
+
+    raise ValueError(f"Could not find any matching primitive type for {value}")
+
 
-    return actual_value
+def smali_values(values: list) -> list:
+    """Parses all given strings, e.g. the elements of an ``.array-data`` block.
+
+    >>> smali_values(["0x1t", "0x2t", "-0x3t"])
+    [1, 2, -3]
+
+    :param values: the values as strings
+    :type values: list
+    :raises ValueError: if one value has no valid Smali type
+    :return: the Smali value representations in the same order
+    :rtype: list
+    """
+    return list(map(smali_value, values))
 
 
 RE_INT_VALUE = re.compile(r"[\-\+]?(0x)?[\dabcdefABCDEF]+$")
@@ -768,6 +1078,71 @@ TYPE_MAP: list = [
 """
 
 
+def _decode_number(value: str) -> int | float:
+    last = value[-1]
+    if "x" in value or "X" in value:
+        if last in "lLsStT":
+            return int(value[:-1], 16)
+        return int(value, 16)
+
+    if last in "lLsStT":
+        return int(value[:-1])
+
+    if last in "fFdD":
+        return float(value[:-1])
+
+    if "." in value or "e" in value or "E" in value or value[-1] in "yN":
+        # doubles don't need a suffix (this includes Infinity and NaN)
+        return float(value)
+
+    return int(value)
+
+
+def _decode_word(value: str) -> float | bool | SVMType | None:
+    if value == "true":
+        return True
+    if value == "false":
+        return False
+    if len(value) == 1:
+        return SVMType(value) if value in "ZCBSIFVJD" else None
+    if value.startswith(("Infinity", "NaN")):
+        return float(value.rstrip("fFdD"))
+    return None
+
+
+def _decode_type(value: str) -> SVMType | None:
+    return SVMType(value) if RE_TYPE_VALUE.match(value) else None
+
+
+def _decode_string(value: str) -> str | None:
+    if len(value) < 2 or value[-1] != '"':
+        return None
+    # support unicode
+    return value[1:-1].encode().decode("unicode_escape")
+
+
+def _decode_char(value: str) -> str | None:
+    if len(value) < 2 or value[-1] != "'":
+        return None
+    return value[1:-1]
+
+
+LITERAL_DECODERS: dict = {
+    **{str(digit): _decode_number for digit in range(10)},
+    "-": _decode_number,
+    "+": _decode_number,
+    '"': _decode_string,
+    "'": _decode_char,
+    "L": _decode_type,
+    "[": _decode_type,
+    **{char: _decode_word for char in "tfINZCBSFVJD"},
+}
+"""Maps the first character of a literal to the function that converts it.
+
+:meta private:
+"""
+
+
 def is_type_descriptor(value: str) -> bool:
     """Returns whether the given value is a valid type descriptor.
 
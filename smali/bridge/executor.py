@@ -28,9 +28,19 @@ class Executor:
     kwargs: dict
     """The current execution"""
 
-    def __init__(self, action, name=None, map_to: list = None) -> None:
+    decoder = None
+    """Optional function that converts the source arguments of an instruction
+    before it is executed.
+
+    It will be called with the frame and all arguments and returns the values
+    passed to :attr:`action`, for instance with resolved labels or parsed
+    literals.
+    """
+
+    def __init__(self, action, name=None, map_to: list = None, decoder=None) -> None:
         self.opcode = name
         self.action = action
+        self.decoder = decoder
         self.frame = None
         if self.action:
             self.opcode = str(action.__name__).replace("__", "/").replace("_", "-")
@@ -44,9 +54,29 @@ class Executor:
 
     def __call__(self, frame: Frame):
         self.frame = frame
-        self.args = self.args or ()
-        if self.action:
-            self.action(self, *self.args)
+        action = self.action
+        if action:
+            action(self, *(self.args or ()))
+
+    def decode(self, frame: Frame, args) -> tuple:
+        """Converts the source arguments of an instruction into the arguments
+        of this executor.
+
+        Decoding is done once when a method is loaded, so the executor doesn't
+        have to process strings on every execution. Labels must be defined in
+        the given frame.
+
+        :param frame: the frame storing labels, switch and array data
+        :type frame: Frame
+        :param args: the arguments as parsed by the reader
+        :type args: list
+        :raises ExecutionError: if a referenced label is not defined
+        :return: the arguments to execute this instruction with
+        :rtype: tuple
+        """
+        if self.decoder:
+            return self.decoder(frame, *args)
+        return tuple(args)
 
     def __repr__(self) -> str:
         return f"<{self.opcode} at {id(self):#x}>"
@@ -63,9 +93,9 @@ class Executor:
         return value
 
 
-def opcode_executor(map_to: list = None):
+def opcode_executor(map_to: list = None, decoder=None):
     def wrapper(func):
-        return Executor(func, map_to=map_to if map_to else [])
+        return Executor(func, map_to=map_to if map_to else [], decoder=decoder)
 
     return wrapper
 
@@ -82,6 +112,78 @@ def nop(self, *Args):
     pass
 
 
+################################################################################
+# DECODERS
+################################################################################
+
+
+def label_target(frame: Frame, label: str) -> int:
+    """Returns the position of the instruction following the given label.
+
+    :param frame: the frame defining the label
+    :type frame: Frame
+    :param label: the label name with or without a leading ``:``
+    :type label: str
+    :raises ExecutionError: if the label is not defined
+    :return: the position in :attr:`Frame.opcodes`
+    :rtype: int
+    """
+    name = label.lstrip(":")
+    if name not in frame.labels:
+        raise ExecutionError("NoSuchLabelError", name)
+    return frame.labels[name]
+
+
+def _decode_goto(frame: Frame, label: str) -> tuple:
+    return label.lstrip(":"), label_target(frame, label)
+
+
+def _decode_branch(frame: Frame, *args) -> tuple:
+    # The label is always the last argument
+    return (*args[:-1], label_target(frame, args[-1]))
+
+
+def _decode_literal(frame: Frame, register: str, value: str) -> tuple:
+    return register, SmaliValue(value)
+
+
+def _decode_lit8(frame: Frame, dest: str, left: str, right: str) -> tuple:
+    return dest, left, SmaliValue(right) & 0xFF
+
+
+def _decode_lit16(frame: Frame, dest: str, left: str, right: str) -> tuple:
+    return dest, left, SmaliValue(right) & 0xFFFF
+
+
+def _decode_static_field(frame: Frame, register: str, info: str) -> tuple:
+    # The reference contains the owner class name, field name and field type.
+    owner, name_type = info.split("->")
+    name, _ = name_type.split(":")
+    return register, owner, name
+
+
+def _decode_instance_field(frame: Frame, value: str, obj: str, info: str) -> tuple:
+    _, name_type = info.split("->")
+    name, _ = name_type.split(":")
+    return value, obj, name
+
+
+def _decode_packed_switch(frame: Frame, register: str, data: str) -> tuple:
+    first_key, cases = frame.switch_data[data.lstrip(":")]
+    return register, SmaliValue(first_key), [label_target(frame, x) for x in cases]
+
+
+def _decode_sparse_switch(frame: Frame, register: str, data: str) -> tuple:
+    branches = frame.switch_data[data.lstrip(":")]
+    return register, {
+        SmaliValue(key): label_target(frame, label) for key, label in branches.items()
+    }
+
+
+def _decode_array_data(frame: Frame, dest: str, data: str) -> tuple:
+    return dest, frame.array_data[data.lstrip(":")]
+
+
 ################################################################################
 # RETURN
 ################################################################################
@@ -104,13 +206,10 @@ def return_object(self: Executor, register: str):
 ################################################################################
 
 
-@opcode_executor(map_to=[GOTO_16, GOTO_32])
-def goto(self: Executor, label: str):
-    if label not in self.frame.labels:
-        raise ExecutionError("NoSuchLabelError", label)
-
+@opcode_executor(map_to=[GOTO_16, GOTO_32], decoder=_decode_goto)
+def goto(self: Executor, label: str, target: int):
     self.frame.label = label
-    self.frame.pos = self.frame.labels[label]
+    self.frame.pos = target
 
 
 ################################################################################
@@ -206,16 +305,12 @@ def int_to_float(self: Executor, dest: str, src: str):
         SPUT_OBJECT_VOLATILE,
         SPUT_WIDE,
         SPUT_WIDE_VOLATILE,
-    ]
+    ],
+    decoder=_decode_static_field,
 )
-def sput_object(self: Executor, register: str, dest: str):
-    # The destination string contains the owner class name, field name and
-    # field type.
+def sput_object(self: Executor, register: str, owner: str, name: str):
     value = self.frame[register]
 
-    owner, name_type = dest.split("->")
-    name, _ = name_type.split(":")
-
     cls = self.frame.vm.get_class(owner)
     field = cls.field(name)
     field.value = value
@@ -231,14 +326,10 @@ def sput_object(self: Executor, register: str, dest: str):
         SGET_WIDE,
         SGET_WIDE_VOLATILE,
         SGET_CHAR,
-    ]
+    ],
+    decoder=_decode_static_field,
 )
-def sget_object(self: Executor, register: str, dest: str):
-    # The destination string contains the owner class name, field name and
-    # field type.
-    owner, name_type = dest.split("->")
-    name, _ = name_type.split(":")
-
+def sget_object(self: Executor, register: str, owner: str, name: str):
     cls = self.frame.vm.get_class(owner)
     field = cls.field(name)
     self.frame[register] = field.value
@@ -254,13 +345,11 @@ def sget_object(self: Executor, register: str, dest: str):
         IGET_WIDE,
         IGET,
         IGET_OBJECT_VOLATILE,
-    ]
+    ],
+    decoder=_decode_instance_field,
 )
-def iget_object(self: Executor, dest: str, src: str, info: str):
+def iget_object(self: Executor, dest: str, src: str, field_name: str):
     smali_object = self.cast(self.frame[src], SmaliObject)
-    _, field = info.split("->")
-    field_name, _ = field.split(":")
-
     self.frame[dest] = smali_object[field_name]
 
 
@@ -274,13 +363,11 @@ def iget_object(self: Executor, dest: str, src: str, info: str):
         IPUT_OBJECT_VOLATILE,
         IPUT_VOLATILE,
         IPUT_WIDE,
-    ]
+    ],
+    decoder=_decode_instance_field,
 )
-def iput_object(self: Executor, src: str, obj: str, info: str):
+def iput_object(self: Executor, src: str, obj: str, field_name: str):
     smali_object = self.cast(self.frame[obj], SmaliObject)
-    _, field = info.split("->")
-    field_name, _ = field.split(":")
-
     smali_object[field_name] = self.frame[src]
 
 
@@ -299,10 +386,11 @@ def iput_object(self: Executor, src: str, obj: str, info: str):
         CONST_WIDE_HIGH16,
         CONST_WIDE_32,
         CONST_STRING_JUMBO,
-    ]
+    ],
+    decoder=_decode_literal,
 )
-def const(self: Executor, register: str, value: str):
-    self.frame[register] = SmaliValue(value)
+def const(self: Executor, register: str, value):
+    self.frame[register] = value
 
 
 @opcode_executor(map_to=[CONST_CLASS])
@@ -408,33 +496,22 @@ def check_cast(self: Executor, dest: str, descriptor: str):
 ################################################################################
 
 
-@opcode_executor()
-def packed_switch(self: Executor, register: str, data: str):
-    switch_value, cases = self.frame.switch_data[data]
-    value = self.frame[register]
-
-    # We must convert the switch_value into a SmaliValue object
-    # as it is of type string and we need an integer
-    idx = value - SmaliValue(switch_value)
+@opcode_executor(decoder=_decode_packed_switch)
+def packed_switch(self: Executor, register: str, first_key: int, targets: list):
+    idx = self.frame[register] - first_key
 
-    if idx < 0 or idx >= len(cases):
+    if idx < 0 or idx >= len(targets):
         # Default branch does nothing
         return
 
-    # Call GOTO-instruction directly
-    goto.action(self, cases[idx])
+    self.frame.pos = targets[idx]
 
 
-@opcode_executor()
-def sparse_switch(self: Executor, register: str, label_name: str):
-    branches = self.frame.switch_data[label_name]
-    value = self.frame[register]
-
-    # The iteration is needed as the branch values are strings
-    for key, label in branches.items():
-        if SmaliValue(key) == value:
-            goto.action(self, label)
-            break
+@opcode_executor(decoder=_decode_sparse_switch)
+def sparse_switch(self: Executor, register: str, targets: dict):
+    target = targets.get(self.frame[register])
+    if target is not None:
+        self.frame.pos = target
 
 
 ################################################################################
@@ -442,70 +519,70 @@ def sparse_switch(self: Executor, register: str, label_name: str):
 ################################################################################
 
 
-@opcode_executor()
-def if_le(self: Executor, left: str, right: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_le(self: Executor, left: str, right: str, target: int):
     if self.frame[left] <= self.frame[right]:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_ge(self: Executor, left: str, right: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_ge(self: Executor, left: str, right: str, target: int):
     if self.frame[left] >= self.frame[right]:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_gez(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_gez(self: Executor, left: str, target: int):
     if self.frame[left] >= 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_ltz(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_ltz(self: Executor, left: str, target: int):
     if self.frame[left] < 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_gt(self: Executor, left: str, right: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_gt(self: Executor, left: str, right: str, target: int):
     if self.frame[left] > self.frame[right]:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_lt(self: Executor, left: str, right: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_lt(self: Executor, left: str, right: str, target: int):
     if self.frame[left] < self.frame[right]:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_gtz(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_gtz(self: Executor, left: str, target: int):
     if self.frame[left] > 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_ne(self: Executor, left: str, right: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_ne(self: Executor, left: str, right: str, target: int):
     if self.frame[left] != self.frame[right]:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_lez(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_lez(self: Executor, left: str, target: int):
     if self.frame[left] <= 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_nez(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_nez(self: Executor, left: str, target: int):
     if self.frame[left] != 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
-@opcode_executor()
-def if_eqz(self: Executor, left: str, label: str):
+@opcode_executor(decoder=_decode_branch)
+def if_eqz(self: Executor, left: str, target: int):
     if self.frame[left] == 0:
-        goto.action(self, label)
+        self.frame.pos = target
 
 
 ################################################################################
@@ -518,9 +595,9 @@ def array_length(self: Executor, dest: str, array: str):
     self.frame[dest] = len(self.frame[array])
 
 
-@opcode_executor()
-def fill_array_data(self: Executor, dest: str, label: str):
-    self.frame[dest] = self.frame.array_data[label]
+@opcode_executor(decoder=_decode_array_data)
+def fill_array_data(self: Executor, dest: str, values: list):
+    self.frame[dest] = list(values)
 
 
 @opcode_executor(
@@ -529,7 +606,7 @@ def fill_array_data(self: Executor, dest: str, label: str):
 def aget(self: Executor, dest: str, array: str, index: str):
     idx_value = self.frame[index]
     array_data = self.frame[array]
-    if idx_value < 0 or idx_value >= len(array):
+    if idx_value < 0 or idx_value >= len(array_data):
         raise ExecutionError(
             "IndexOutOfBoundsError",
             f"Index {idx_value} is out of bounds for length {len(array_data)}",
@@ -544,13 +621,13 @@ def aget(self: Executor, dest: str, array: str, index: str):
 def aput(self: Executor, src: str, array: str, index: str):
     idx_value = self.frame[index]
     array_data = self.frame[array]
-    if idx_value < 0 or idx_value > len(array):
+    if idx_value < 0 or idx_value > len(array_data):
         raise ExecutionError(
             "IndexOutOfBoundsError",
             f"Index {idx_value} is out of bounds for length {len(array_data)}",
         )
 
-    if len(array) == idx_value:
+    if len(array_data) == idx_value:
         array_data.append(self.frame[src])
     else:
         array_data[idx_value] = self.frame[src]
@@ -632,109 +709,109 @@ def mul_int__2addr(self: Executor, dest: str, src: str):
 ################################################################################
 
 
-@opcode_executor()
-def div_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] // (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def div_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] // right
 
 
-@opcode_executor()
-def div_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] // (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def div_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] // right
 
 
-@opcode_executor()
-def add_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] + (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def add_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] + right
 
 
-@opcode_executor()
-def add_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] + (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def add_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] + right
 
 
-@opcode_executor()
-def sub_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] - (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def sub_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] - right
 
 
-@opcode_executor()
-def sub_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] - (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def sub_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] - right
 
 
-@opcode_executor()
-def mul_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] * (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def mul_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] * right
 
 
-@opcode_executor()
-def mul_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] * (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def mul_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] * right
 
 
-@opcode_executor()
-def rem_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] % (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def rem_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] % right
 
 
-@opcode_executor()
-def rem_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] % (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def rem_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] % right
 
 
-@opcode_executor()
-def and_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] & (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def and_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] & right
 
 
-@opcode_executor()
-def and_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] & (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def and_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] & right
 
 
-@opcode_executor()
-def or_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] | (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def or_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] | right
 
 
-@opcode_executor()
-def or_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] | (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def or_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] | right
 
 
-@opcode_executor()
-def xor_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] ^ (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def xor_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] ^ right
 
 
-@opcode_executor()
-def xor_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] ^ (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def xor_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] ^ right
 
 
-@opcode_executor()
-def shl_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] << (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def shl_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] << right
 
 
-@opcode_executor()
-def shl_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] << (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def shl_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] << right
 
 
-@opcode_executor()
-def shr_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] >> (SmaliValue(right) & 0xFF)
+@opcode_executor(decoder=_decode_lit8)
+def shr_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] >> right
 
 
-@opcode_executor()
-def shr_int__lit16(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = self.frame[left] >> (SmaliValue(right) & 0xFFFF)
+@opcode_executor(decoder=_decode_lit16)
+def shr_int__lit16(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = self.frame[left] >> right
 
 
-@opcode_executor()
-def rsub_int__lit8(self: Executor, dest: str, left: str, right: str):
-    self.frame[dest] = (SmaliValue(right) & 0xFF) - self.frame[left]
+@opcode_executor(decoder=_decode_lit8)
+def rsub_int__lit8(self: Executor, dest: str, left: str, right: int):
+    self.frame[dest] = right - self.frame[left]
 
 
 ################################################################################
@@ -41,22 +41,44 @@ class Frame:
     ...     value = frame[register_name]
     """
 
-    labels: dict = {}
-    """A mapping with labels to their execution position."""
-
-    return_value: object = None
+    __slots__ = (
+        "labels",
+        "return_value",
+        "method_return",
+        "opcodes",
+        "finished",
+        "pos",
+        "label",
+        "error",
+        "registers",
+        "catch",
+        "array_data",
+        "vm",
+        "switch_data",
+        "parent",
+    )
+
+    labels: dict
+    """A mapping with label names (without ``:``) to the position of the
+    instruction that follows them."""
+
+    return_value: object
     """Stores a return value of the current method."""
 
-    method_return: object = None
+    method_return: object
     """Stores the latest method return value"""
 
-    opcodes: list = []
-    """Stores all parsed opcodes with their arguments"""
+    opcodes: list
+    """Stores all parsed opcodes with their arguments.
+
+    Arguments are decoded by :meth:`Executor.decode` once the method has been
+    parsed, e.g. jump targets are positions in this list and literals are
+    stored as Python values."""
 
-    finished: bool = False
+    finished: bool
     """Stores whether te current frame has been executed."""
 
-    pos: int = 0
+    pos: int
     """The current position in opcode list"""
 
     label: str
@@ -77,13 +99,13 @@ class Frame:
     array_data: dict
     """Stores all array-data objecs mapped to their label."""
 
-    vm = None
+    vm: object
     """VM reference"""
 
     switch_data: dict
     """Stores packed and sparse-switch data"""
 
-    parent: "Frame" = None
+    parent: "Frame"
     """Parent execution context (mainly used for backtracking)"""
 
     def __init__(self):
@@ -93,6 +115,8 @@ class Frame:
         self.catch = {}
         self.array_data = {}
         self.switch_data = {}
+        self.method_return = None
+        self.vm = None
         self.reset()
 
     def reset(self) -> None:
@@ -106,10 +130,10 @@ class Frame:
         self.registers.clear()
 
     def __getitem__(self, key: str):
-        if key not in self.registers:
-            raise NoSuchRegisterError(f"Register with name {key} not found!")
-
-        return self.registers[key]
+        try:
+            return self.registers[key]
+        except KeyError:
+            raise NoSuchRegisterError(f"Register with name {key} not found!") from None
 
     def __setitem__(self, key: str, value):
         self.registers[key] = value
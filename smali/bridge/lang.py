@@ -59,6 +59,8 @@ class SmaliMember:
     All members must provide a signature to be identified with.
     """
 
+    __slots__ = ("__parent", "__signature", "__type", "__modifiers", "__annotations")
+
     __parent: "SmaliMember"
     """The parent of this member."""
 
@@ -221,6 +223,8 @@ class SmaliAnnotation(SmaliMember):
     :type attr: dict, optional
     """
 
+    __slots__ = ("attr",)
+
     attr: dict
     """The attributes of this annotation (key-value map)."""
 
@@ -260,6 +264,8 @@ class SmaliField(SmaliMember):
     :type value: int | float | str | SVMType | bool, optional
     """
 
+    __slots__ = ("__name", "__value")
+
     __name: str
     """The field's name"""
 
@@ -329,7 +335,9 @@ class SmaliMethod(SmaliMember):
     ``None`` as the instance parameter.
     """
 
-    __smali_params: list = []
+    __slots__ = ("__smali_params", "__smali_return", "__name", "__vm", "__locals")
+
+    __smali_params: list
     """The smali parameter types (:class:`SVMType`)"""
 
     __smali_return: SVMType
@@ -338,7 +346,7 @@ class SmaliMethod(SmaliMember):
     __name: str
     """The method's name"""
 
-    __vm = None
+    __vm: object
     """The VM that delegates the execution of this method."""
 
     __locals: int
@@ -364,9 +372,9 @@ class SmaliMethod(SmaliMember):
         sig_type = self.type.signature
         if not sig_type:
             raise ValueError(f"Expected a method signature - got {self.type}")
-        self.name = sig_type.name
-        self.smali_params = sig_type.parameter_types
-        self.smali_return = sig_type.return_type
+        self.__name = sig_type.name
+        self.__smali_params = sig_type.parameter_types
+        self.__smali_return = sig_type.return_type
 
     def __call__(self, instance, *args, **kwds) -> object:
         if not self.__vm:
@@ -443,6 +451,8 @@ class _MethodBroker:
     same module.
     """
 
+    __slots__ = ("__name", "__methods")
+
     __name: str
     """The method's name"""
 
@@ -614,6 +624,16 @@ class SmaliClass(SmaliMember):
     >>> smali_class["LMyInnerClass;"] = SmaliClass(...)
     """
 
+    __slots__ = (
+        "__simple_name",
+        "__name",
+        "__methods",
+        "__fields",
+        "__classes",
+        "__super",
+        "__implements",
+    )
+
     __simple_name: str
     """The simple name of this class"""
 
@@ -861,6 +881,8 @@ class SmaliObject:
         Smali objects of interfaces or abstract classes can't be created.
     """
 
+    __slots__ = ("__field_values", "__class")
+
     __field_values: dict
     """The object's field values.
 
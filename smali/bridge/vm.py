@@ -26,11 +26,13 @@ debug-option wihtin the VM object. It is also possible to use a custom
 ``ClassLoader`` to load or define new classes.
 """
 
+import os
+
 from io import IOBase
 from abc import ABCMeta, abstractmethod
 
 from smali import SmaliValue, opcode
-from smali.base import AccessType, SVMType
+from smali.base import AccessType, SVMType, smali_values
 from smali.reader import SmaliReader
 from smali.visitor import ClassVisitor, MethodVisitor, FieldVisitor, AnnotationVisitor
 from smali.bridge.lang import (
@@ -44,6 +46,7 @@ from smali.bridge.frame import Frame
 from smali.bridge.errors import (
     ExecutionError,
     NoSuchMethodError,
+    NoSuchOpcodeError,
     InvalidOpcodeError,
     NoSuchClassError,
 )
@@ -65,21 +68,23 @@ class ClassLoader(metaclass=ABCMeta):
     """Abstract base class for SmaliClassLoader"""
 
     @abstractmethod
-    def define_class(self, source: bytes | str | IOBase) -> SmaliClass:
+    def define_class(self, source: bytes | str | IOBase | os.PathLike) -> SmaliClass:
         """Defines a new SmaliClass by parsing the given source file.
 
-        :param source: the source code
-        :type source: bytes | str
+        Paths are mapped into memory instead of being read (see :func:`smali.reader.map_file`).
+
+        :param source: the source code or the path of a source file
+        :type source: bytes | str | IOBase | os.PathLike
         :return: the parsed class definition
         :rtype: SmaliClass
         """
 
     @abstractmethod
-    def load_class(self, source: str | bytes | IOBase, init=True, lookup_missing=False) -> SmaliClass:
+    def load_class(self, source: str | bytes | IOBase | os.PathLike, init=True, lookup_missing=False) -> SmaliClass:
         """Parses the given source code and initializes the given class if enabled.
 
-        :param source: the source code
-        :type source: str | bytes | IOBase
+        :param source: the source code or the path of a source file
+        :type source: str | bytes | IOBase | os.PathLike
         :param init: whether ``<clinit>`` should be executed, defaults to True
         :type init: bool, optional
         :param lookup_missing: whether missing classes should be searched before parsing
@@ -121,13 +126,13 @@ class SmaliVM:
     use_strict: bool = False
     """Tells the VM to throw exceptions on unkown opcodes."""
 
-    __classes: dict[str, SmaliClass] = {}
+    __classes: dict[str, SmaliClass]
     """All classes are stored in a dict
 
     :meta public:
     """
 
-    __frames: dict[int, Frame] = {}
+    __frames: dict[int, Frame]
     """Stores all execution frames mapped to their method object
 
     :meta public:
@@ -161,6 +166,8 @@ class SmaliVM:
         self.executors = executors or executor.cache
         self.use_strict = use_strict
         self.debug_handler = None
+        self.__classes = {}
+        self.__frames = {}
 
     def new_class(self, __class: SmaliClass):
         """Defines a new class that can be accessed globally.
@@ -243,17 +250,21 @@ class SmaliVM:
 
         # validate method and set parameter values
         self._validate_call(method, frame, args, kwargs)
+        opcodes = frame.opcodes
+        debug_handler = self.debug_handler
         while not frame.finished:
-            opcode_exec, args = frame.opcodes[frame.pos]
+            # Arguments were decoded when the method has been loaded and
+            # jumps set the position of their target directly.
+            opcode_exec, args = opcodes[frame.pos]
+            frame.pos += 1
             opcode_exec.args = args
-            if self.debug_handler:
-                self.debug_handler.precall(self, method, opcode_exec)
+            if debug_handler:
+                debug_handler.precall(self, method, opcode_exec)
 
             opcode_exec(frame)
             opcode_exec.args = None
-            frame.pos += 1
-            if self.debug_handler:
-                self.debug_handler.postcall(self, method, opcode_exec)
+            if debug_handler:
+                debug_handler.postcall(self, method, opcode_exec)
 
         if frame.error:
             if isinstance(frame.error, ExecutionError):
@@ -286,14 +297,21 @@ class SmaliVM:
         for param, register in zip(parameters, registers):
             param_type: SVMType = param
             # Lookup primitive types
+            mapped = False
             for primitive, ptypes in self.__type_map.items():
                 if param_type.full_name in ptypes:
+                    mapped = True
                     if not isinstance(registers[register], primitive):
                         raise TypeError(
                             "Invalid type for parameter, expected %s - got %s"
                             % (param, type(registers[register]))
                         )
 
+            # Primitives, arrays and mapped classes (e.g. String) don't
+            # have to be defined in this VM
+            if mapped or param_type.svm_type != SVMType.TYPES.CLASS:
+                continue
+
             if param_type.full_name not in self.__classes:
                 raise NoSuchClassError(f'Class "{param_type}" not defined!')
 
@@ -317,7 +335,7 @@ class _SourceAnnotationVisitor(AnnotationVisitor):
         self.annotation[name] = SmaliValue(value)
 
     def visit_array(self, name: str, values: list) -> None:
-        self.annotation[name] = [SmaliValue(x) for x in values]
+        self.annotation[name] = smali_values(values)
 
     def visit_enum(self, name: str, owner: str, const: str, value_type: str) -> None:
         # TODO: handle enum values
@@ -361,8 +379,8 @@ class _SourceMethodVisitor(MethodVisitor):
         return SmaliVMAnnotationReader(annotation)
 
     def visit_block(self, name: str) -> None:
+        # Labels point to the next instruction
         self.frame.labels[name] = self.pos
-        self.pos += 1
         self._last_label = name
 
     def visit_locals(self, local_count: int) -> None:
@@ -379,7 +397,7 @@ class _SourceMethodVisitor(MethodVisitor):
         self.visit_catch(exc_name, blocks)
 
     def visit_goto(self, block_name: str) -> None:
-        self.frame.opcodes.append((executor.goto, block_name))
+        self.frame.opcodes.append((executor.goto, (block_name,)))
         self.pos += 1
 
     def visit_array_data(self, length: str, value_list: list) -> None:
@@ -396,29 +414,22 @@ class _SourceMethodVisitor(MethodVisitor):
             self.visit_instruction("return", args)
 
     def visit_instruction(self, ins_name: str, args: list) -> None:
-        cache: dict = self.frame.vm.executors
-        for _, value in opcode.__dict__.items():
-            # If the value of an attribute is equal to the given instruction
-            # name,
-            if value == ins_name:
-                # Check if the instruction name is not in the list of executors
-                # in the current frame's virtual machine
-                if ins_name not in cache and not self.frame.vm.use_strict:
-                    if "*" in cache:
-                        func = cache["*"]
-                    else:
-                        # If not, add a tuple of the "nop" opcode function and the
-                        # instruction arguments to the frame's opcodes list.
-                        func = cache["nop"] if "nop" in cache else executor.nop
-                    self.frame.opcodes.append((func, args))
-                else:
-                    # If yes, add a tuple of the executor function for the instruction
-                    # name and the instruction arguments to the frame's opcodes list.
-                    self.frame.opcodes.append((self.frame.vm.executors[ins_name], args))
-                self.pos += 1
-                return
-
-        raise InvalidOpcodeError(f"Invalid OpCode: {ins_name}")
+        if ins_name not in opcode.REGISTRY:
+            raise InvalidOpcodeError(f"Invalid OpCode: {ins_name}")
+
+        vm = self.frame.vm
+        cache: dict = vm.executors
+        func = cache.get(ins_name)
+        if func is None:
+            if vm.use_strict:
+                raise NoSuchOpcodeError(f"No executor for opcode: {ins_name}")
+
+            # Unsupported instructions are executed by the wildcard executor
+            # or skipped
+            func = cache.get("*") or cache.get("nop") or executor.nop
+
+        self.frame.opcodes.append((func, args))
+        self.pos += 1
 
     def visit_packed_switch(self, value: str, blocks: list) -> None:
         self.frame.switch_data[self._last_label] = (value, blocks)
@@ -426,6 +437,15 @@ class _SourceMethodVisitor(MethodVisitor):
     def visit_sparse_switch(self, branches: dict) -> None:
         self.frame.switch_data[self._last_label] = branches
 
+    def visit_end(self) -> None:
+        # Labels, literals and member references are resolved once, as
+        # switch and array data is defined after the referencing instruction.
+        frame = self.frame
+        frame.opcodes = [
+            (opcode_exec, opcode_exec.decode(frame, args))
+            for opcode_exec, args in frame.opcodes
+        ]
+
 
 class _SourceClassVisitor(ClassVisitor):
     smali_class: SmaliClass
@@ -490,7 +510,7 @@ class _SmaliClassLoader(ClassLoader):
     def __init__(self, vm: SmaliVM) -> None:
         self.vm = vm
 
-    def define_class(self, source: bytes) -> SmaliClass:
+    def define_class(self, source: bytes | str | IOBase | os.PathLike) -> SmaliClass:
         reader = SmaliReader(validate=True, comments=False)
 
         visitor = SmaliVMClassReader(self.vm)
@@ -502,7 +522,7 @@ class _SmaliClassLoader(ClassLoader):
         self.vm.new_class(smali_class)
         return smali_class
 
-    def load_class(self, source: str, init=True, lookup_missing=False) -> SmaliClass:
+    def load_class(self, source: str | bytes | IOBase | os.PathLike, init=True, lookup_missing=False) -> SmaliClass:
         smali_class = self.define_class(source)
         if init:
             smali_class.clinit()
@@ -0,0 +1,286 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Persistent cache of parsed Smali files.
+
+The :class:`ParseCache` stores the recorded event stream (see
+:func:`smali.events.record_events`) of each parsed source in a local
+directory. Entries are keyed by the hash of the source code and the
+reader options, so shared library classes are parsed only once:
+
+.. code-block:: python
+
+    from smali.cache import ParseCache
+
+    cache = ParseCache("~/.cache/pysmali", max_size=512 * 1024 * 1024)
+    with open("Lib.smali", "r", encoding="utf-8") as fp:
+        cache.visit(fp, MyClassVisitor())
+
+Entries are written to a temporary file first and renamed afterwards, so
+multiple processes can use the same directory at the same time.
+"""
+
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+import zlib
+
+from typing import Optional
+
+from smali import VERSION
+from smali.events import record_events, replay_events
+from smali.reader import SmaliReader
+from smali.visitor import ClassVisitor
+
+__all__ = ["ParseCache"]
+
+CACHE_FORMAT = 1
+"""Version of the stored entries. Changing it invalidates all existing entries."""
+
+ENTRY_SUFFIX = ".events"
+"""Suffix of all cache entries."""
+
+
+class ParseCache:
+    """On-disk cache around a :class:`SmaliReader`.
+
+    :param directory: the cache directory (will be created if needed)
+    :type directory: str
+    :param max_size: the maximum size of all entries in bytes, defaults to 256 MiB
+    :type max_size: int, optional
+    :param reader: the reader used on cache misses, defaults to a new
+                   :class:`SmaliReader`
+    :type reader: SmaliReader, optional
+    """
+
+    directory: str
+    """The cache directory"""
+
+    max_size: int
+    """The maximum size of all entries in bytes. The least recently used
+    entries are removed if the limit is exceeded."""
+
+    reader: SmaliReader
+    """The reader that parses sources on a cache miss"""
+
+    hits: int
+    """The amount of cache hits of this instance"""
+
+    misses: int
+    """The amount of cache misses of this instance"""
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 256 * 1024 * 1024,
+        reader: Optional[SmaliReader] = None,
+    ) -> None:
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_size = max_size
+        self.reader = reader or SmaliReader()
+        self.hits = self.misses = 0
+        self._size = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, source: str | bytes) -> str:
+        """Returns the cache key of the given source code.
+
+        The key includes all reader options that have an effect on the
+        produced events.
+
+        :param source: the Smali source code
+        :type source: str | bytes
+        :return: the hex digest identifying the cache entry
+        :rtype: str
+        """
+        if isinstance(source, str):
+            source = source.encode("utf-8")
+
+        reader = self.reader
+        options = (
+            CACHE_FORMAT,
+            VERSION,
+            reader.__class__.__qualname__,
+            reader.validate,
+            reader.comments,
+            reader.snippet,
+            reader.errors,
+            reader.encoding,
+            reader.lazy_methods,
+        )
+        digest = hashlib.sha256(repr(options).encode())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def visit(
+        self, source: io.IOBase | str | bytes | os.PathLike, visitor: ClassVisitor
+    ) -> bool:
+        """Notifies the visitor about all events of the given source.
+
+        The events are taken from the cache if possible. Otherwise, the source
+        is parsed and its events will be stored for later use. In both cases,
+        the visitor receives the same events as from :meth:`SmaliReader.visit`.
+
+        :param source: the Smali source code or the path of a source file
+        :type source: io.IOBase | str | bytes | os.PathLike
+        :param visitor: the visitor to notify
+        :type visitor: ClassVisitor
+        :raises ValueError: if the visitor is null
+        :return: whether the events were taken from the cache
+        :rtype: bool
+        """
+        if not visitor:
+            raise ValueError("Invalid visitor (nullptr)")
+
+        if isinstance(source, os.PathLike):
+            # The whole content is needed for the key anyway
+            with open(source, "rb") as fp:
+                source = fp.read()
+
+        elif isinstance(source, io.IOBase):
+            source = source.read()
+
+        key = self.key(source)
+        records = self.load(key)
+        hit = records is not None
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+            records = record_events(source, self.reader)
+            self.store(key, records)
+
+        replay_events(records, visitor)
+        return hit
+
+    def load(self, key: str) -> Optional[list]:
+        """Returns the recorded events of the given key (if present).
+
+        :param key: the cache key
+        :type key: str
+        :return: the recorded events or None on a cache miss
+        :rtype: list | None
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fp:
+                data = fp.read()
+            # The modification time is used as the access time for eviction, as
+            # most file systems don't update atime reliably.
+            os.utime(path)
+        except OSError:
+            return None
+
+        try:
+            return pickle.loads(zlib.decompress(data))
+        except Exception:  # noqa
+            # Corrupted entries will be replaced on the next store
+            return None
+
+    def store(self, key: str, records: list) -> None:
+        """Stores the recorded events under the given key.
+
+        :param key: the cache key
+        :type key: str
+        :param records: the recorded events
+        :type records: list
+        """
+        data = zlib.compress(pickle.dumps(records, pickle.HIGHEST_PROTOCOL), 1)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Other processes must never see partially written entries
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += len(data)
+        if self._size > self.max_size:
+            self.evict()
+
+    def size(self) -> int:
+        """Returns the total size of all cache entries in bytes.
+
+        :return: the size in bytes
+        :rtype: int
+        """
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, target: Optional[int] = None) -> None:
+        """Removes the least recently used entries.
+
+        Entries are removed until the total size is less than or equal to the
+        given target, which defaults to 90% of :attr:`max_size`.
+
+        :param target: the size limit in bytes, defaults to None
+        :type target: int, optional
+        """
+        if target is None:
+            target = self.max_size * 9 // 10
+
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # Another process may have removed it already
+                pass
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        """Removes all cache entries."""
+        self.evict(0)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def _entries(self) -> list:
+        """Returns ``(path, size, mtime)`` of all cache entries.
+
+        :meta private:
+        """
+        entries = []
+        for dirpath, _, filenames in os.walk(self.directory):
+            for name in filenames:
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
@@ -0,0 +1,278 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Pull-based alternative to the visitor API.
+
+:func:`iter_events` returns a generator that yields one :class:`Event` per
+visitor callback. The source is read lazily, so leaving the loop early stops
+reading:
+
+.. code-block:: python
+
+    from smali.events import iter_events
+
+    for kind, args in iter_events(source):
+        if kind == "invoke":
+            inv_type, registers, owner, method = args
+            ...
+        elif kind == "method" and args[0] == "onCreate":
+            break
+
+Each event kind is the name of the corresponding ``visit_*`` method without
+the prefix and the arguments are the same as for that method. Events that
+open a scope (``class`` for inner classes, ``field``, ``method``, ``annotation``
+and ``subannotation``) are closed by an ``end`` event storing the scope name,
+e.g. ``Event("end", ("method",))``. Fields without annotations are the only
+exception, as their source does not contain an ``.end field`` directive.
+
+Complete event streams can be stored with :func:`record_events` and fed into
+other visitors later on with :func:`replay_events`.
+"""
+
+import io
+
+from typing import Iterator, NamedTuple, Optional
+
+from smali.reader import SmaliReader
+from smali.visitor import (
+    VisitorBase,
+    ClassVisitor,
+    FieldVisitor,
+    AnnotationVisitor,
+    MethodVisitor,
+)
+
+__all__ = ["Event", "iter_events", "record_events", "replay_events"]
+
+
+class Event(NamedTuple):
+    """A single parsing event."""
+
+    kind: str
+    """The event name, e.g. ``"method"`` for :meth:`ClassVisitor.visit_method`"""
+
+    args: tuple
+    """The arguments that would have been passed to the visitor"""
+
+
+class _Recorder:
+    """Mixin for visitors that append all events to a shared list.
+
+    Events are stored as ``(depth, kind, args)``, where *depth* is the
+    position of the recording visitor in the reader's stack.
+
+    :meta private:
+    """
+
+    scope: str
+
+    def __init__(self, events: list, depth: int = 0) -> None:
+        VisitorBase.__init__(self)
+        self.events = events
+        self.depth = depth
+
+    def visit_end(self) -> None:
+        self.events.append((self.depth, "end", (self.scope,)))
+
+
+def _record(kind: str, child: Optional[type] = None):
+    """Creates a visitor method that records the event named *kind*.
+
+    If a child type is given, the method returns a new recorder of that type.
+
+    :meta private:
+    """
+    if child is None:
+
+        def visit(self, *args) -> None:
+            self.events.append((self.depth, kind, args))
+
+    else:
+
+        def visit(self, *args) -> VisitorBase:
+            self.events.append((self.depth, kind, args))
+            return child(self.events, self.depth + 1)
+
+    visit.__name__ = f"visit_{kind}"
+    return visit
+
+
+def _install(recorder: type, base: type, children: dict) -> None:
+    """Records all ``visit_*`` events of the given visitor base class.
+
+    :meta private:
+    """
+    for name in dir(base):
+        if name.startswith("visit_") and name != "visit_end":
+            kind = name[6:]
+            setattr(recorder, name, _record(kind, children.get(kind)))
+
+
+class _AnnotationRecorder(_Recorder, AnnotationVisitor):
+    scope = "annotation"
+
+
+class _SubAnnotationRecorder(_AnnotationRecorder):
+    scope = "subannotation"
+
+
+class _FieldRecorder(_Recorder, FieldVisitor):
+    scope = "field"
+
+
+class _MethodRecorder(_Recorder, MethodVisitor):
+    scope = "method"
+
+
+class _ClassRecorder(_Recorder, ClassVisitor):
+    scope = "class"
+
+
+for _recorder in (_AnnotationRecorder, _SubAnnotationRecorder):
+    _install(
+        _recorder, AnnotationVisitor, {"subannotation": _SubAnnotationRecorder}
+    )
+_install(_FieldRecorder, FieldVisitor, {"annotation": _AnnotationRecorder})
+_install(_MethodRecorder, MethodVisitor, {"annotation": _AnnotationRecorder})
+_install(
+    _ClassRecorder,
+    ClassVisitor,
+    {
+        "annotation": _AnnotationRecorder,
+        "field": _FieldRecorder,
+        "method": _MethodRecorder,
+        "inner_class": _ClassRecorder,
+    },
+)
+
+
+def iter_events(
+    source: io.IOBase | str | bytes, reader: Optional[SmaliReader] = None
+) -> Iterator[Event]:
+    """Parses the given source and yields all events in source order.
+
+    Lines are read on demand, i.e. only as many lines as needed to produce
+    the next event.
+
+    :param source: the Smali source code
+    :type source: io.IOBase | str | bytes
+    :param reader: the reader whose options should be used, defaults to a
+                   new :class:`SmaliReader`
+    :type reader: SmaliReader, optional
+    :raises SyntaxError: if the source is malformed
+    :yield: the parsed events
+    :rtype: Iterator[Event]
+    """
+    reader = reader or SmaliReader()
+    events = []
+    context = reader._new_context(reader._open_source(source), _ClassRecorder(events))
+    try:
+        if not context.snippet:
+            context._class_def()
+            yield from _to_events(events)
+
+        handle = context._statement_handler()
+        while True:
+            context._next_line()
+            handle()
+            yield from _to_events(events)
+
+    except UnicodeError:
+        # Decoding errors are ValueErrors, but must not end the class silently
+        raise
+
+    except (EOFError, ValueError):
+        # Same as SmaliReader._do_visit: the end of the class is
+        # reported at EOF
+        while not isinstance(context._visitor, ClassVisitor):
+            context.stack.pop()
+        context._visitor.visit_end()
+        yield from _to_events(events)
+
+    except StopIteration as err:
+        raise SyntaxError("Unexpected EOL (end of line)") from err
+
+
+def _to_events(records: list) -> Iterator[Event]:
+    """Converts and removes all recorded events.
+
+    :meta private:
+    """
+    for _, kind, args in records:
+        yield Event(kind, args)
+    records.clear()
+
+
+def record_events(
+    source: io.IOBase | str | bytes, reader: Optional[SmaliReader] = None
+) -> list:
+    """Parses the given source and records all events for :func:`replay_events`.
+
+    In contrast to :class:`Event` objects, the recording also stores the
+    nesting of all events, so it can be replayed into any visitor. The
+    recording consists of built-in types only and can be pickled.
+
+    :param source: the Smali source code
+    :type source: io.IOBase | str | bytes
+    :param reader: the reader whose options should be used, defaults to a
+                   new :class:`SmaliReader`
+    :type reader: SmaliReader, optional
+    :return: the recorded events
+    :rtype: list
+    """
+    records = []
+    (reader or SmaliReader()).visit(source, _ClassRecorder(records))
+    return records
+
+
+def replay_events(records: list, visitor: ClassVisitor) -> None:
+    """Notifies the given visitor about all recorded events.
+
+    The visitor receives the same calls as if the source had been parsed
+    again, i.e. events of nested visitors are dropped if the parent visitor
+    returns None.
+
+    :param records: the recording created by :func:`record_events`
+    :type records: list
+    :param visitor: the visitor to notify
+    :type visitor: ClassVisitor
+    """
+    stack = [visitor]
+    for depth, kind, args in records:
+        if kind == "diagnostic":
+            # Diagnostics are reported to the class while nested
+            # visitors are still open
+            if stack[depth]:
+                stack[depth].visit_diagnostic(*args)
+            continue
+
+        # Fields are closed implicitly by the next statement
+        del stack[depth + 1 :]
+        target = stack[depth]
+        if kind == "end":
+            if target:
+                target.visit_end()
+            stack.pop()
+            continue
+
+        child = getattr(target, f"visit_{kind}")(*args) if target else None
+        if kind in _SCOPES:
+            stack.append(child)
+
+
+_SCOPES = frozenset(("annotation", "subannotation", "field", "method", "inner_class"))
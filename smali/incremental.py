@@ -0,0 +1,317 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Incremental parsing of Smali files that are edited repeatedly.
+
+A :class:`ParsedSource` splits the source into regions, one for the class
+header and one per ``.method`` or ``.field`` directive, and records the
+events of each region separately. After an edit, only regions whose text
+has changed are parsed again:
+
+.. code-block:: python
+
+    from smali.incremental import ParsedSource
+
+    parsed = ParsedSource(source)
+    parsed.replay(MyClassVisitor())
+
+    # ... patch some methods ...
+    for change in parsed.update(patched_source):
+        if change.kind != "removed":
+            replay_events(change.new.records, MyClassVisitor())
+
+Recorded events use the format of :func:`smali.events.record_events`.
+"""
+
+import io
+import os
+import re
+
+from typing import NamedTuple, Optional
+
+from smali.events import _SCOPES, _ClassRecorder, replay_events
+from smali.reader import SmaliReader
+from smali.visitor import ClassVisitor
+
+__all__ = ["SourceRegion", "RegionChange", "ParsedSource"]
+
+RE_MEMBER = re.compile(r"^[ \t]*\.(?:method|field)[ \t]", re.MULTILINE)
+"""Pattern for the first line of a member region."""
+
+RE_CLASS = re.compile(r"^[ \t]*\.class[ \t]", re.MULTILINE)
+"""Pattern for class definitions."""
+
+HEADER_KEY = ".class"
+"""Key of the region storing the class definition."""
+
+
+class SourceRegion(NamedTuple):
+    """A part of the source code that is parsed on its own."""
+
+    key: str
+    """Identifies the region, e.g. ``".method getName()Ljava/lang/String;"``"""
+
+    text: str
+    """The source code of this region"""
+
+    records: list
+    """The recorded events of this region (see :func:`smali.events.record_events`)"""
+
+
+class RegionChange(NamedTuple):
+    """Describes how a region differs from the previous version."""
+
+    old: Optional[SourceRegion]
+    """The previous region or None if the region has been added"""
+
+    new: Optional[SourceRegion]
+    """The current region or None if the region has been removed"""
+
+    @property
+    def kind(self) -> str:
+        """Returns the type of this change.
+
+        :return: ``"added"``, ``"removed"`` or ``"changed"``
+        :rtype: str
+        """
+        if self.old is None:
+            return "added"
+        if self.new is None:
+            return "removed"
+        return "changed"
+
+
+def _region_key(line: str) -> str:
+    """Returns the key of the member region starting with the given line.
+
+    Methods are identified by their signature and fields by their name and
+    type, so changed modifiers or values don't result in a new member.
+
+    :meta private:
+    """
+    directive, _, rest = line.strip().partition(" ")
+    if directive == ".field":
+        # The initial value may contain any character
+        rest = rest.split(" = ", 1)[0]
+    else:
+        rest = rest.split("#", 1)[0]
+
+    tokens = rest.split()
+    return f"{directive} {tokens[-1]}" if tokens else directive
+
+
+def _open_class_depth(records: list) -> int:
+    """Returns the depth of the innermost class that is still open after the
+    given events.
+
+    :meta private:
+    """
+    scopes = ["class"]
+    for depth, kind, _ in records:
+        if kind == "diagnostic":
+            # Reported to the outer class without closing anything
+            continue
+
+        # Fields are closed implicitly by the next statement
+        del scopes[depth + 1 :]
+        if kind == "end":
+            scopes.pop()
+        elif kind in _SCOPES:
+            scopes.append(kind)
+
+    while len(scopes) > 1 and scopes[-1] not in ("class", "inner_class"):
+        scopes.pop()
+    # Closing the last inner class ends at the outer class, like the reader at EOF
+    return max(len(scopes) - 1, 0)
+
+
+class ParsedSource:
+    """Parse result of one Smali file that can be updated incrementally.
+
+    :param source: the Smali source code or the path of a source file
+    :type source: io.IOBase | str | bytes | os.PathLike
+    :param reader: the reader whose options should be used, defaults to a
+                   new :class:`SmaliReader`
+    :type reader: SmaliReader, optional
+    :raises SyntaxError: if the source is malformed
+    """
+
+    reader: SmaliReader
+    """The reader used to parse changed regions"""
+
+    regions: list
+    """All regions of the current source in source order"""
+
+    def __init__(
+        self,
+        source: io.IOBase | str | bytes | os.PathLike,
+        reader: Optional[SmaliReader] = None,
+    ) -> None:
+        self.reader = reader or SmaliReader()
+        self.regions = []
+        self.update(source)
+
+    def update(self, source: io.IOBase | str | bytes | os.PathLike) -> list:
+        """Replaces the parsed source with the given one.
+
+        Regions whose text hasn't changed keep their recorded events, all other
+        regions are parsed again. Regions are matched by their key, i.e. by the
+        method signature or the field name and type, and only regions with
+        different events are reported.
+
+        .. note::
+            Events of unchanged regions are not updated, so line numbers of
+            recorded diagnostics may refer to the old source.
+
+        :param source: the new source code or the path of a source file
+        :type source: io.IOBase | str | bytes | os.PathLike
+        :raises SyntaxError: if a changed region is malformed
+        :return: the changed regions in source order, followed by all
+                 removed regions
+        :rtype: list[RegionChange]
+        """
+        text = self._read(source)
+        by_text = {region.text: region for region in self.regions}
+        by_key = {region.key: region for region in self.regions}
+        matched = set()
+
+        regions = []
+        changes = []
+        for key, region_text, lineno in self._split(text):
+            region = by_text.get(region_text)
+            if region is not None and region.key == key and id(region) not in matched:
+                matched.add(id(region))
+                regions.append(region)
+                continue
+
+            records = self._record(region_text, lineno, key == HEADER_KEY)
+            region = SourceRegion(key, region_text, records)
+            regions.append(region)
+
+            old = by_key.get(key)
+            if old is not None and id(old) not in matched:
+                matched.add(id(old))
+                # Edits of blank lines or comments may not change any event
+                if old.records != records:
+                    changes.append(RegionChange(old, region))
+            else:
+                changes.append(RegionChange(None, region))
+
+        for old in self.regions:
+            if id(old) not in matched:
+                changes.append(RegionChange(old, None))
+
+        self.regions = regions
+        return changes
+
+    def records(self) -> list:
+        """Returns the recorded events of the whole source.
+
+        The result is equal to the recording of :func:`smali.events.record_events`.
+
+        :return: the recorded events
+        :rtype: list
+        """
+        records = []
+        for region in self.regions:
+            records.extend(region.records)
+
+        # The reader closes the innermost class at EOF, which is the last
+        # class left open by the final region.
+        depth = _open_class_depth(self.regions[-1].records) if self.regions else 0
+        records.append((depth, "end", ("class",)))
+        return records
+
+    def replay(self, visitor: ClassVisitor) -> None:
+        """Notifies the given visitor about all events of the current source.
+
+        :param visitor: the visitor to notify
+        :type visitor: ClassVisitor
+        """
+        replay_events(self.records(), visitor)
+
+    def _read(self, source: io.IOBase | str | bytes | os.PathLike) -> str:
+        if isinstance(source, os.PathLike):
+            with open(source, "rb") as fp:
+                source = fp.read()
+
+        elif isinstance(source, io.IOBase):
+            source = source.read()
+
+        if not isinstance(source, str):
+            source = str(source, self.reader.encoding)
+        return source
+
+    def _split(self, text: str):
+        """Yields ``(key, text, lineno)`` of all regions in the given source.
+
+        The lineno is the number of lines before the region.
+
+        :meta private:
+        """
+        # Members of inner classes depend on the visitor of their class, so
+        # everything behind the first nested class definition forms one region.
+        classes = RE_CLASS.finditer(text)
+        if not self.reader.snippet:
+            next(classes, None)
+        nested = next(classes, None)
+        limit = nested.start() if nested else len(text)
+
+        bounds = [match.start() for match in RE_MEMBER.finditer(text, 0, limit)]
+        if limit < len(text):
+            bounds.append(limit)
+
+        start = lineno = 0
+        key = HEADER_KEY
+        for end in bounds:
+            yield key, text[start:end], lineno
+            lineno += text.count("\n", start, end)
+            start = end
+            line_end = text.find("\n", start)
+            key = _region_key(text[start:line_end] if line_end >= 0 else text[start:])
+
+        yield key, text[start:], lineno
+
+    def _record(self, text: str, lineno: int, header: bool) -> list:
+        """Parses one region and returns its events.
+
+        :meta private:
+        """
+        records = []
+        context = self.reader._new_context(io.StringIO(text), _ClassRecorder(records))
+        context.lineno = lineno
+        handle = context._statement_handler()
+        try:
+            if header and not context.snippet:
+                context._class_def()
+
+            while True:
+                context._next_line()
+                handle()
+
+        except UnicodeError:
+            raise
+
+        except (EOFError, ValueError):
+            # Same as SmaliReader._do_visit, but the class is closed
+            # in records()
+            pass
+
+        except StopIteration as err:
+            raise SyntaxError("Unexpected EOL (end of line)") from err
+        return records
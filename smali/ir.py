@@ -0,0 +1,393 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Compact representation of method bodies.
+
+A :class:`MethodIR` stores all events of a method body in a few arrays
+instead of Python objects per instruction:
+
+- ``code`` (``array('H')``) stores one id per event. Instructions use the id
+  of their opcode (see :data:`OPCODES`), all other events use the id of
+  their visitor method (see :data:`EVENTS`).
+- ``operands`` (``array('I')``) stores indices into an :class:`OperandPool`
+  that is usually shared by all methods, so registers, types and member
+  references are stored only once. Lists (e.g. registers) are stored as
+  the trailing operands of an event.
+- ``labels`` maps each label to the index of the event that follows it.
+
+Method bodies are converted with a :class:`MethodIRBuilder` and can be replayed
+into any :class:`MethodVisitor`:
+
+.. code-block:: python
+
+    pool = OperandPool()
+
+    class Loader(ClassVisitor):
+        def visit_method(self, name, access_flags, parameters, return_type):
+            builder = MethodIRBuilder(pool)
+            methods[name] = builder
+            return builder
+
+    ...
+    methods["onCreate"].ir.visit(MyMethodVisitor())
+"""
+
+from array import array
+from typing import Optional
+
+from smali import opcode
+from smali.events import replay_events, _AnnotationRecorder
+from smali.visitor import MethodVisitor, AnnotationVisitor
+
+__all__ = ["OperandPool", "MethodIR", "MethodIRBuilder", "EVENTS", "OPCODES"]
+
+EVENTS = (
+    "instruction",
+    "invoke",
+    "return",
+    "goto",
+    "block",
+    "line",
+    "locals",
+    "registers",
+    "param",
+    "local",
+    "restart",
+    "prologue",
+    "catch",
+    "catchall",
+    "packed_switch",
+    "sparse_switch",
+    "array_data",
+    "annotation",
+    "comment",
+    "eol_comment",
+)
+"""Ids of all :class:`MethodVisitor` events except ``visit_end``.
+
+The ``instruction`` id is only used for opcodes that are not listed in
+:data:`OPCODES`; its first operand is the opcode name.
+"""
+
+OPCODES = tuple(opcode.REGISTRY)
+"""All known opcode names. The id of an opcode is its index plus ``len(EVENTS)``."""
+
+_EVENT_IDS = {name: index for index, name in enumerate(EVENTS)}
+_OPCODE_IDS = {name: index + len(EVENTS) for index, name in enumerate(OPCODES)}
+_INSTRUCTION = _EVENT_IDS["instruction"]
+_ANNOTATION = _EVENT_IDS["annotation"]
+
+# Lists are stored as the trailing operands of an event, so the visitor
+# arguments have to be restored from the flat operand list.
+_DECODERS = {
+    "instruction": lambda v: (v[0], v[1:]),
+    "invoke": lambda v: (v[0], v[3:], v[1], v[2]),
+    "return": lambda v: (v[0], v[1:]),
+    "packed_switch": lambda v: (v[0], v[1:]),
+    "array_data": lambda v: (v[0], v[1:]),
+    "catch": lambda v: (v[0], tuple(v[1:])),
+    "catchall": lambda v: (v[0], tuple(v[1:])),
+    "sparse_switch": lambda v: (dict(zip(v[::2], v[1::2])),),
+}
+
+
+class OperandPool:
+    """Interns operands, so each distinct value is stored only once.
+
+    Values are distinguished by their type as well, i.e. ``1`` and ``1.0``
+    get different indices.
+    """
+
+    values: list
+    """All stored values (the index of a value is its pool index)"""
+
+    def __init__(self) -> None:
+        self.values = []
+        self._indices = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int):
+        return self.values[index]
+
+    def add(self, value) -> int:
+        """Returns the index of the given value and adds it if needed.
+
+        :param value: the value (unhashable values are never shared)
+        :type value: Any
+        :return: the pool index
+        :rtype: int
+        """
+        # Strings and integers are the most common operands and don't need
+        # the type to be distinguished
+        cls = value.__class__
+        key = value if cls is str or cls is int else (cls, value)
+        try:
+            index = self._indices.get(key)
+        except TypeError:
+            key = index = None
+
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            if key is not None:
+                self._indices[key] = index
+        return index
+
+
+class MethodIR:
+    """Array-backed method body.
+
+    :param pool: the pool storing all operands
+    :type pool: OperandPool
+    """
+
+    code: array
+    """Event and opcode ids (``array('H')``)"""
+
+    offsets: array
+    """Start index of each event's operands in :attr:`operands`, the last
+    element stores the total amount of operands (``array('I')``)"""
+
+    operands: array
+    """Pool indices of all operands (``array('I')``)"""
+
+    labels: dict
+    """Maps label names (without the leading ``:``) to the index of the
+    following event"""
+
+    pool: OperandPool
+    """The pool storing all operand values"""
+
+    __slots__ = ("code", "offsets", "operands", "labels", "pool")
+
+    def __init__(self, pool: OperandPool) -> None:
+        self.code = array("H")
+        self.offsets = array("I", [0])
+        self.operands = array("I")
+        self.labels = {}
+        self.pool = pool
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def name(self, index: int) -> str:
+        """Returns the opcode or event name at the given index.
+
+        :param index: the event index
+        :type index: int
+        :return: the opcode name for instructions, the event name otherwise
+        :rtype: str
+        """
+        ident = self.code[index]
+        if ident >= len(EVENTS):
+            return OPCODES[ident - len(EVENTS)]
+        if ident == _INSTRUCTION:
+            return self.pool[self.operands[self.offsets[index]]]
+        return EVENTS[ident]
+
+    def args(self, index: int) -> list:
+        """Returns the raw operand values of the event at the given index.
+
+        :param index: the event index
+        :type index: int
+        :return: the operand values
+        :rtype: list
+        """
+        values = self.pool.values
+        operands = self.operands
+        return [
+            values[operands[i]]
+            for i in range(self.offsets[index], self.offsets[index + 1])
+        ]
+
+    def target(self, label: str) -> int:
+        """Returns the index of the event a label refers to.
+
+        :param label: the label name with or without the leading ``:``
+        :type label: str
+        :raises KeyError: if the label is not defined
+        :return: the event index
+        :rtype: int
+        """
+        return self.labels[label.lstrip(":")]
+
+    def visit(self, visitor: MethodVisitor) -> None:
+        """Notifies the given visitor about all stored events.
+
+        :param visitor: the visitor to notify
+        :type visitor: MethodVisitor
+        """
+        events = len(EVENTS)
+        for index, ident in enumerate(self.code):
+            args = self.args(index)
+            if ident >= events:
+                visitor.visit_instruction(OPCODES[ident - events], args)
+                continue
+
+            kind = EVENTS[ident]
+            if ident == _ANNOTATION:
+                # The recorded annotation is stored as the last operand
+                access_flags, signature, records = args
+                a_visitor = visitor.visit_annotation(access_flags, signature)
+                if a_visitor:
+                    replay_events(records, a_visitor)
+                continue
+
+            decode = _DECODERS.get(kind)
+            if decode:
+                args = decode(args)
+            getattr(visitor, f"visit_{kind}")(*args)
+
+        visitor.visit_end()
+
+
+class MethodIRBuilder(MethodVisitor):
+    """Builds a :class:`MethodIR` from method events.
+
+    :param pool: the operand pool to use, defaults to a new pool
+    :type pool: OperandPool, optional
+    :param delegate: A delegate visitor, defaults to None
+    :type delegate: MethodVisitor, optional
+    """
+
+    ir: MethodIR
+    """The built representation"""
+
+    def __init__(
+        self, pool: Optional[OperandPool] = None, delegate: Optional[MethodVisitor] = None
+    ) -> None:
+        super().__init__(delegate)
+        self.ir = MethodIR(pool if pool is not None else OperandPool())
+        self._annotations = []
+
+    def _add(self, ident: int, args) -> None:
+        ir = self.ir
+        add = ir.pool.add
+        ir.code.append(ident)
+        ir.operands.extend([add(value) for value in args])
+        ir.offsets.append(len(ir.operands))
+
+    def visit_instruction(self, ins_name: str, args: list) -> None:
+        ident = _OPCODE_IDS.get(ins_name)
+        if ident is None:
+            self._add(_INSTRUCTION, (ins_name, *args))
+        else:
+            self._add(ident, args)
+        super().visit_instruction(ins_name, args)
+
+    def visit_invoke(self, inv_type: str, args: list, owner: str, method: str) -> None:
+        self._add(_EVENT_IDS["invoke"], (inv_type, owner, method, *args))
+        super().visit_invoke(inv_type, args, owner, method)
+
+    def visit_return(self, ret_type: str, args: list) -> None:
+        self._add(_EVENT_IDS["return"], (ret_type, *args))
+        super().visit_return(ret_type, args)
+
+    def visit_goto(self, block_name: str) -> None:
+        self._add(_EVENT_IDS["goto"], (block_name,))
+        super().visit_goto(block_name)
+
+    def visit_block(self, name: str) -> None:
+        self.ir.labels[name] = len(self.ir.code) + 1
+        self._add(_EVENT_IDS["block"], (name,))
+        super().visit_block(name)
+
+    def visit_line(self, number: int) -> None:
+        self._add(_EVENT_IDS["line"], (number,))
+        super().visit_line(number)
+
+    def visit_locals(self, local_count: int) -> None:
+        self._add(_EVENT_IDS["locals"], (local_count,))
+        super().visit_locals(local_count)
+
+    def visit_registers(self, registers: int) -> None:
+        self._add(_EVENT_IDS["registers"], (registers,))
+        super().visit_registers(registers)
+
+    def visit_param(self, register: str, name: str) -> None:
+        self._add(_EVENT_IDS["param"], (register, name))
+        super().visit_param(register, name)
+
+    def visit_local(
+        self, register: str, name: str, descriptor: str, full_descriptor: str
+    ) -> None:
+        self._add(_EVENT_IDS["local"], (register, name, descriptor, full_descriptor))
+        super().visit_local(register, name, descriptor, full_descriptor)
+
+    def visit_restart(self, register: str) -> None:
+        self._add(_EVENT_IDS["restart"], (register,))
+        super().visit_restart(register)
+
+    def visit_prologue(self) -> None:
+        self._add(_EVENT_IDS["prologue"], ())
+        super().visit_prologue()
+
+    def visit_catch(self, exc_name: str, blocks: tuple) -> None:
+        self._add(_EVENT_IDS["catch"], (exc_name, *blocks))
+        super().visit_catch(exc_name, blocks)
+
+    def visit_catchall(self, exc_name: str, blocks: tuple) -> None:
+        self._add(_EVENT_IDS["catchall"], (exc_name, *blocks))
+        super().visit_catchall(exc_name, blocks)
+
+    def visit_packed_switch(self, value: str, blocks: list) -> None:
+        self._add(_EVENT_IDS["packed_switch"], (value, *blocks))
+        super().visit_packed_switch(value, blocks)
+
+    def visit_sparse_switch(self, branches: dict) -> None:
+        self._add(_EVENT_IDS["sparse_switch"], [x for item in branches.items() for x in item])
+        super().visit_sparse_switch(branches)
+
+    def visit_array_data(self, length: str, value_list: list) -> None:
+        self._add(_EVENT_IDS["array_data"], (length, *value_list))
+        super().visit_array_data(length, value_list)
+
+    def visit_comment(self, text: str) -> None:
+        self._add(_EVENT_IDS["comment"], (text,))
+        super().visit_comment(text)
+
+    def visit_eol_comment(self, text: str) -> None:
+        self._add(_EVENT_IDS["eol_comment"], (text,))
+        super().visit_eol_comment(text)
+
+    def visit_annotation(
+        self, access_flags: int, signature: str
+    ) -> Optional[AnnotationVisitor]:
+        # Annotations are rare within methods and are stored as a
+        # recording (see smali.events.record_events)
+        records = []
+        self._add(_ANNOTATION, (access_flags, signature, records))
+        a_visitor = super().visit_annotation(access_flags, signature)
+        if a_visitor:
+            self._annotations.append((records, a_visitor))
+        return _AnnotationRecorder(records)
+
+    def visit_end(self) -> None:
+        # The delegate receives the annotation values at the end
+        for records, a_visitor in self._annotations:
+            replay_events(records, a_visitor)
+        self._annotations.clear()
+
+        # Copies don't contain the spare capacity of appended arrays
+        ir = self.ir
+        ir.code = array("H", ir.code)
+        ir.offsets = array("I", ir.offsets)
+        ir.operands = array("I", ir.operands)
+        super().visit_end()
@@ -13,6 +13,20 @@
 
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Names of all Dalvik opcodes and a registry with their metadata.
+
+Each opcode is available as a constant (e.g. ``CONST_4``) and as an
+:class:`OpcodeInfo` in :data:`REGISTRY`:
+
+>>> REGISTRY["if-eqz"]
+OpcodeInfo(name='if-eqz', id=56, format='21t', operands=('register', 'label'), wide=False, object=False, branch=True, terminator=False)
+"""
+
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional
 
 
 NOP = "nop"
@@ -287,3 +301,237 @@ INVOKE_CUSTOM_RANGE = "invoke-custom/range"
 
 CONST_METHOD_HANDLE = "const-method-handle"
 CONST_METHOD_TYPE = "const-method-type"
+
+
+class OpcodeInfo(NamedTuple):
+    """Metadata of a single opcode."""
+
+    name: str
+    """The opcode name as used in Smali source code, e.g. ``"const/4"``"""
+
+    id: int
+    """Unique number of this opcode (its position in :data:`REGISTRY`)"""
+
+    format: Optional[str]
+    """The Dalvik instruction format (e.g. ``"21t"``), None for payloads"""
+
+    operands: tuple
+    """The kind of each operand in source order.
+
+    Possible kinds are ``"register"``, ``"registers"`` (a register list or
+    range), ``"literal"``, ``"label"``, ``"string"``, ``"type"``, ``"field"``,
+    ``"method"``, ``"proto"``, ``"method_handle"`` and ``"call_site"``.
+    """
+
+    wide: bool
+    """Whether the opcode operates on register pairs (long or double values)"""
+
+    object: bool
+    """Whether the opcode is an ``*-object`` variant"""
+
+    branch: bool
+    """Whether the opcode may continue at a label"""
+
+    terminator: bool
+    """Whether the opcode never continues with the next instruction"""
+
+
+_FORMATS = {
+    "10x": (NOP, RETURN_VOID, RETURN_VOID_BARRIER, RETURN_VOID_NO_BARRIER),
+    "12x": (
+        MOVE, MOVE_WIDE, MOVE_OBJECT, ARRAY_LENGTH,
+        NEG_INT, NOT_INT, NEG_LONG, NOT_LONG, NEG_FLOAT, NEG_DOUBLE,
+        INT_TO_LONG, INT_TO_FLOAT, INT_TO_DOUBLE, LONG_TO_INT, LONG_TO_FLOAT,
+        LONG_TO_DOUBLE, FLOAT_TO_INT, FLOAT_TO_LONG, FLOAT_TO_DOUBLE,
+        DOUBLE_TO_INT, DOUBLE_TO_LONG, DOUBLE_TO_FLOAT, INT_TO_BYTE,
+        INT_TO_CHAR, INT_TO_SHORT,
+        ADD_INT_2ADDR, SUB_INT_2ADDR, MUL_INT_2ADDR, DIV_INT_2ADDR,
+        REM_INT_2ADDR, AND_INT_2ADDR, OR_INT_2ADDR, XOR_INT_2ADDR,
+        SHL_INT_2ADDR, SHR_INT_2ADDR, USHR_INT_2ADDR,
+        ADD_LONG_2ADDR, SUB_LONG_2ADDR, MUL_LONG_2ADDR, DIV_LONG_2ADDR,
+        REM_LONG_2ADDR, AND_LONG_2ADDR, OR_LONG_2ADDR, XOR_LONG_2ADDR,
+        SHL_LONG_2ADDR, SHR_LONG_2ADDR, USHR_LONG_2ADDR,
+        ADD_FLOAT_2ADDR, SUB_FLOAT_2ADDR, MUL_FLOAT_2ADDR, DIV_FLOAT_2ADDR,
+        REM_FLOAT_2ADDR, ADD_DOUBLE_2ADDR, SUB_DOUBLE_2ADDR, MUL_DOUBLE_2ADDR,
+        DIV_DOUBLE_2ADDR, REM_DOUBLE_2ADDR,
+    ),
+    "22x": (MOVE_FROM16, MOVE_WIDE_FROM16, MOVE_OBJECT_FROM16),
+    "32x": (MOVE_16, MOVE_WIDE_16, MOVE_OBJECT_16),
+    "11x": (
+        MOVE_RESULT, MOVE_RESULT_WIDE, MOVE_RESULT_OBJECT, MOVE_EXCEPTION,
+        RETURN, RETURN_WIDE, RETURN_OBJECT, MONITOR_ENTER, MONITOR_EXIT, THROW,
+    ),
+    "11n": (CONST_4,),
+    "21s": (CONST_16, CONST_WIDE_16),
+    "21h": (CONST_HIGH16, CONST_WIDE_HIGH16),
+    "31i": (CONST, CONST_WIDE_32),
+    "51l": (CONST_WIDE,),
+    "21c": (
+        CONST_STRING, CONST_CLASS, CHECK_CAST, NEW_INSTANCE,
+        SGET, SGET_WIDE, SGET_OBJECT, SGET_BOOLEAN, SGET_BYTE, SGET_CHAR, SGET_SHORT,
+        SPUT, SPUT_WIDE, SPUT_OBJECT, SPUT_BOOLEAN, SPUT_BYTE, SPUT_CHAR, SPUT_SHORT,
+        SGET_VOLATILE, SPUT_VOLATILE, SGET_WIDE_VOLATILE, SPUT_WIDE_VOLATILE,
+        SGET_OBJECT_VOLATILE, SPUT_OBJECT_VOLATILE,
+        CONST_METHOD_HANDLE, CONST_METHOD_TYPE,
+    ),
+    "31c": (CONST_STRING_JUMBO,),
+    "22c": (
+        INSTANCE_OF, NEW_ARRAY,
+        IGET, IGET_WIDE, IGET_OBJECT, IGET_BOOLEAN, IGET_BYTE, IGET_CHAR, IGET_SHORT,
+        IPUT, IPUT_WIDE, IPUT_OBJECT, IPUT_BOOLEAN, IPUT_BYTE, IPUT_CHAR, IPUT_SHORT,
+        IGET_VOLATILE, IPUT_VOLATILE, IGET_OBJECT_VOLATILE, IGET_WIDE_VOLATILE,
+        IPUT_WIDE_VOLATILE, IPUT_OBJECT_VOLATILE,
+    ),
+    "22cs": (
+        IGET_QUICK, IGET_WIDE_QUICK, IGET_OBJECT_QUICK, IGET_BOOLEAN_QUICK,
+        IGET_BYTE_QUICK, IGET_CHAR_QUICK, IGET_SHORT_QUICK,
+        IPUT_QUICK, IPUT_WIDE_QUICK, IPUT_OBJECT_QUICK, IPUT_BOOLEAN_QUICK,
+        IPUT_BYTE_QUICK, IPUT_CHAR_QUICK, IPUT_SHORT_QUICK,
+    ),
+    "35c": (
+        FILLED_NEW_ARRAY, INVOKE_VIRTUAL, INVOKE_SUPER, INVOKE_DIRECT,
+        INVOKE_STATIC, INVOKE_INTERFACE, INVOKE_CUSTOM, INVOKE_DIRECT_EMPTY,
+    ),
+    "3rc": (
+        FILLED_NEW_ARRAY_RANGE, INVOKE_VIRTUAL_RANGE, INVOKE_SUPER_RANGE,
+        INVOKE_DIRECT_RANGE, INVOKE_STATIC_RANGE, INVOKE_INTERFACE_RANGE,
+        INVOKE_CUSTOM_RANGE, INVOKE_OBJECT_INIT_RANGE,
+    ),
+    "35ms": (INVOKE_VIRTUAL_QUICK, INVOKE_SUPER_QUICK),
+    "3rms": (INVOKE_VIRTUAL_QUICK_RANGE, INVOKE_SUPER_QUICK_RANGE),
+    "35mi": (EXECUTE_INLINE,),
+    "3rmi": (EXECUTE_INLINE_RANGE,),
+    "45cc": (INVOKE_POLYMORPHIC,),
+    "4rcc": (INVOKE_POLYMORPHIC_RANGE,),
+    "31t": (FILL_ARRAY_DATA, PACKED_SWITCH, SPARSE_SWITCH),
+    "10t": (GOTO,),
+    "20t": (GOTO_16,),
+    "30t": (GOTO_32,),
+    "23x": (
+        CMPL_FLOAT, CMPG_FLOAT, CMPL_DOUBLE, CMPG_DOUBLE, CMP_LONG,
+        AGET, AGET_WIDE, AGET_OBJECT, AGET_BOOLEAN, AGET_BYTE, AGET_CHAR, AGET_SHORT,
+        APUT, APUT_WIDE, APUT_OBJECT, APUT_BOOLEAN, APUT_BYTE, APUT_CHAR, APUT_SHORT,
+        ADD_INT, SUB_INT, MUL_INT, DIV_INT, REM_INT, AND_INT, OR_INT, XOR_INT,
+        SHL_INT, SHR_INT, USHR_INT,
+        ADD_LONG, SUB_LONG, MUL_LONG, DIV_LONG, REM_LONG, AND_LONG, OR_LONG,
+        XOR_LONG, SHL_LONG, SHR_LONG, USHR_LONG,
+        ADD_FLOAT, SUB_FLOAT, MUL_FLOAT, DIV_FLOAT, REM_FLOAT,
+        ADD_DOUBLE, SUB_DOUBLE, MUL_DOUBLE, DIV_DOUBLE, REM_DOUBLE,
+    ),
+    "22t": (IF_EQ, IF_NE, IF_LT, IF_GE, IF_GT, IF_LE),
+    "21t": (IF_EQZ, IF_NEZ, IF_LTZ, IF_GEZ, IF_GTZ, IF_LEZ),
+    "22s": (
+        ADD_INT_LIT16, RSUB_INT, MUL_INT_LIT16, DIV_INT_LIT16, REM_INT_LIT16,
+        AND_INT_LIT16, OR_INT_LIT16, XOR_INT_LIT16,
+    ),
+    "22b": (
+        ADD_INT_LIT8, RSUB_INT_LIT8, MUL_INT_LIT8, DIV_INT_LIT8, REM_INT_LIT8,
+        AND_INT_LIT8, OR_INT_LIT8, XOR_INT_LIT8, SHL_INT_LIT8, SHR_INT_LIT8,
+        USHR_INT_LIT8,
+    ),
+    "20bc": (THROW_VERIFICATION_ERROR,),
+}
+"""Maps each instruction format to its opcodes, payloads are not listed.
+
+:meta private:
+"""
+
+_OPERANDS = {
+    "10x": (),
+    "12x": ("register", "register"),
+    "22x": ("register", "register"),
+    "32x": ("register", "register"),
+    "11x": ("register",),
+    "11n": ("register", "literal"),
+    "21s": ("register", "literal"),
+    "21h": ("register", "literal"),
+    "31i": ("register", "literal"),
+    "51l": ("register", "literal"),
+    "21c": ("register", None),
+    "31c": ("register", "string"),
+    "22c": ("register", "register", None),
+    "22cs": ("register", "register", "field"),
+    "35c": ("registers", None),
+    "3rc": ("registers", None),
+    "35ms": ("registers", "method"),
+    "3rms": ("registers", "method"),
+    "35mi": ("registers", "method"),
+    "3rmi": ("registers", "method"),
+    "45cc": ("registers", "method", "proto"),
+    "4rcc": ("registers", "method", "proto"),
+    "31t": ("register", "label"),
+    "10t": ("label",),
+    "20t": ("label",),
+    "30t": ("label",),
+    "23x": ("register", "register", "register"),
+    "22t": ("register", "register", "label"),
+    "21t": ("register", "label"),
+    "22s": ("register", "register", "literal"),
+    "22b": ("register", "register", "literal"),
+    "20bc": ("literal", "type"),
+    None: (),
+}
+"""Operand kinds of each format, None stands for the referenced item.
+
+:meta private:
+"""
+
+
+def _reference_kind(name: str) -> str:
+    """Returns the kind of item referenced by the given opcode.
+
+    :meta private:
+    """
+    if name.startswith("const-string"):
+        return "string"
+    if name == CONST_METHOD_HANDLE:
+        return "method_handle"
+    if name == CONST_METHOD_TYPE:
+        return "proto"
+    if name.startswith("invoke-custom"):
+        return "call_site"
+    if name.startswith("invoke"):
+        return "method"
+    if name[1:4] in ("get", "put"):
+        return "field"
+    return "type"
+
+
+def _opcode_info(name: str, id: int, format: Optional[str]) -> OpcodeInfo:
+    operands = tuple(kind or _reference_kind(name) for kind in _OPERANDS[format])
+    return OpcodeInfo(
+        name,
+        id,
+        format,
+        operands,
+        wide=any(x in name for x in ("wide", "long", "double")),
+        object="-object" in name,
+        # The label of fill-array-data points to its payload
+        branch="label" in operands and name != FILL_ARRAY_DATA,
+        terminator=name.startswith(("return", "goto", "throw")),
+    )
+
+
+def _build_registry() -> Mapping[str, OpcodeInfo]:
+    formats = {name: format for format, names in _FORMATS.items() for name in names}
+    names = dict.fromkeys(
+        value
+        for key, value in globals().items()
+        if key.isupper() and isinstance(value, str)
+    )
+    return MappingProxyType(
+        {
+            name: _opcode_info(name, index, formats.get(name))
+            for index, name in enumerate(names)
+        }
+    )
+
+
+REGISTRY = _build_registry()
+"""Read-only mapping of all opcode names to their :class:`OpcodeInfo`.
+
+Opcodes are stored in the order of their :attr:`OpcodeInfo.id`.
+"""
+
+BY_ID = tuple(REGISTRY.values())
+"""All opcodes indexed by their :attr:`OpcodeInfo.id`"""
@@ -0,0 +1,561 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Parsing of whole Smali source trees (for instance the output directory
+of *apktool*) using a pool of worker processes or threads.
+
+Each file is parsed by its own :class:`SmaliReader` into a visitor
+created by a user-supplied factory. Files are sent to the workers in
+chunks and errors are isolated per file, so one malformed class won't
+abort the whole run:
+
+.. code-block:: python
+
+    from smali.parallel import parse_files
+
+    def new_visitor(path: str) -> ClassVisitor:
+        return MyClassVisitor()
+
+    results = parse_files("./apktool-out", new_visitor)
+    for path, result in results.items():
+        if result.error:
+            print(path, result.error)
+
+Class hierarchies can be indexed without parsing whole files through
+:func:`read_headers`, which only reads the class definition of each file.
+
+Whole trees can be transformed with :func:`rewrite_files`, which writes the
+output of a :class:`SmaliWriter` for each file into a second directory.
+
+.. note::
+    When using processes (the default), the visitor factory and the result
+    function must be picklable, i.e. defined at module level.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from typing import Any, Callable, Iterable, Iterator, NamedTuple, Optional
+
+from smali.reader import SmaliReader, map_file, read_header
+from smali.visitor import ClassVisitor
+from smali.writer import SmaliWriter
+
+__all__ = [
+    "ParseResult",
+    "find_files",
+    "parse_files",
+    "iter_parse_files",
+    "read_headers",
+    "iter_read_headers",
+    "RewriteResult",
+    "rewrite_files",
+    "iter_rewrite_files",
+]
+
+SMALI_SUFFIX = ".smali"
+"""Default suffix of files that will be collected from a directory."""
+
+
+class ParseResult(NamedTuple):
+    """The outcome of parsing a single file."""
+
+    path: str
+    """The parsed file"""
+
+    value: Any
+    """The value returned by the result function (the visitor by default)"""
+
+    error: Optional[BaseException]
+    """The exception raised while parsing this file (if any)"""
+
+
+class RewriteResult(NamedTuple):
+    """The outcome of rewriting a single file."""
+
+    path: str
+    """The source file"""
+
+    target: str
+    """The output file"""
+
+    status: Optional[str]
+    """``"written"``, ``"unchanged"`` if the output file already stored the
+    same code, ``"skipped"`` if the source did not change since the last run
+    or None on errors"""
+
+    digest: Optional[str]
+    """The content hash of the source file (including the manifest key)"""
+
+    error: Optional[BaseException]
+    """The exception raised while rewriting this file (if any)"""
+
+
+def find_files(root: str, suffix: str = SMALI_SUFFIX) -> list:
+    """Collects all files with the given suffix below the root directory.
+
+    :param root: the directory to search
+    :type root: str
+    :param suffix: the file suffix, defaults to ``".smali"``
+    :type suffix: str, optional
+    :return: the sorted list of file paths
+    :rtype: list
+    """
+    paths = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if name.endswith(suffix):
+                paths.append(os.path.join(dirpath, name))
+    paths.sort()
+    return paths
+
+
+def _default_result(visitor: ClassVisitor) -> ClassVisitor:
+    return visitor
+
+
+def _parse_chunk(
+    paths: list,
+    visitor_factory: Callable[[str], ClassVisitor],
+    result: Callable[[ClassVisitor], Any],
+    reader_options: dict,
+) -> list:
+    """Parses all given files (executed within the worker).
+
+    :meta private:
+    """
+    results = []
+    reader = SmaliReader(**reader_options)
+    for path in paths:
+        try:
+            visitor = visitor_factory(path)
+            # Lines are decoded by the reader using its encoding
+            reader.visit(map_file(path), visitor)
+            results.append(ParseResult(path, result(visitor), None))
+        except Exception as err:  # noqa
+            results.append(ParseResult(path, None, err))
+    return results
+
+
+def _new_executor(executor: str | Executor, max_workers: Optional[int]) -> Executor:
+    if isinstance(executor, Executor):
+        return executor
+
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers)
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers)
+    raise ValueError(f"Invalid executor type: {executor!r}")
+
+
+def _read_header_chunk(paths: list) -> list:
+    """Reads the headers of all given files (executed within the worker).
+
+    :meta private:
+    """
+    results = []
+    for path in paths:
+        try:
+            header = read_header(map_file(path))
+            results.append(ParseResult(path, header, None))
+        except Exception as err:  # noqa
+            results.append(ParseResult(path, None, err))
+    return results
+
+
+def _iter_chunks(
+    task: Callable[..., list],
+    args: tuple,
+    paths: str | Iterable[str],
+    executor: str | Executor,
+    max_workers: Optional[int],
+    chunksize: Optional[int],
+    progress: Optional[Callable[[int, int, ParseResult], None]],
+) -> Iterator[ParseResult]:
+    """Runs the task on chunks of the given files and yields all results.
+
+    :meta private:
+    """
+    if isinstance(paths, str):
+        paths = find_files(paths)
+    else:
+        paths = list(paths)
+
+    total = len(paths)
+    if total == 0:
+        return
+
+    workers = max_workers or os.cpu_count() or 1
+    if not chunksize:
+        # Four tasks per worker leave enough room for load balancing
+        chunksize = max(1, min(64, total // (workers * 4)))
+
+    chunks = [paths[i : i + chunksize] for i in range(0, total, chunksize)]
+
+    done = 0
+    if workers == 1 and not isinstance(executor, Executor):
+        # Parsing within the current process is useful for debugging
+        finished = (task(chunk, *args) for chunk in chunks)
+        for chunk_results in finished:
+            for file_result in chunk_results:
+                done += 1
+                if progress:
+                    progress(done, total, file_result)
+                yield file_result
+        return
+
+    pool = _new_executor(executor, workers)
+    try:
+        futures = [pool.submit(task, chunk, *args) for chunk in chunks]
+        for future in as_completed(futures):
+            for file_result in future.result():
+                done += 1
+                if progress:
+                    progress(done, total, file_result)
+                yield file_result
+    finally:
+        # Only shut down executors that were created here
+        if pool is not executor:
+            pool.shutdown(cancel_futures=True)
+
+
+def iter_parse_files(
+    paths: str | Iterable[str],
+    visitor_factory: Callable[[str], ClassVisitor],
+    result: Optional[Callable[[ClassVisitor], Any]] = None,
+    executor: str | Executor = "process",
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    progress: Optional[Callable[[int, int, ParseResult], None]] = None,
+    errors: str = "ignore",
+    **reader_options,
+) -> Iterator[ParseResult]:
+    """Parses the given files in parallel and yields the results in completion order.
+
+    :param paths: a root directory or a list of file paths
+    :type paths: str | Iterable[str]
+    :param visitor_factory: called with the file path to create the visitor for it
+    :type visitor_factory: Callable[[str], ClassVisitor]
+    :param result: converts the visitor into the value to return; it runs within
+                   the worker, defaults to the visitor itself
+    :type result: Callable[[ClassVisitor], Any], optional
+    :param executor: ``"process"``, ``"thread"`` or an existing executor instance,
+                     defaults to ``"process"``
+    :type executor: str | Executor, optional
+    :param max_workers: the amount of workers, defaults to the CPU count
+    :type max_workers: int, optional
+    :param chunksize: the amount of files per task, defaults to a value based on
+                      the file and worker count
+    :type chunksize: int, optional
+    :param progress: called with ``(done, total, result)`` after each file
+    :type progress: Callable[[int, int, ParseResult], None], optional
+    :param errors: the error handling of each reader, defaults to ``"ignore"``
+    :type errors: str, optional
+    :raises ValueError: if the executor type is unknown
+    :yield: one :class:`ParseResult` per file
+    :rtype: Iterator[ParseResult]
+    """
+    result = result or _default_result
+    reader_options["errors"] = errors
+    yield from _iter_chunks(
+        _parse_chunk,
+        (visitor_factory, result, reader_options),
+        paths,
+        executor,
+        max_workers,
+        chunksize,
+        progress,
+    )
+
+
+def parse_files(
+    paths: str | Iterable[str],
+    visitor_factory: Callable[[str], ClassVisitor],
+    result: Optional[Callable[[ClassVisitor], Any]] = None,
+    **kwargs,
+) -> dict:
+    """Parses the given files in parallel and returns all results at once.
+
+    Takes the same arguments as :func:`iter_parse_files`.
+
+    :param paths: a root directory or a list of file paths
+    :type paths: str | Iterable[str]
+    :param visitor_factory: called with the file path to create the visitor for it
+    :type visitor_factory: Callable[[str], ClassVisitor]
+    :param result: converts the visitor into the value to return, defaults to None
+    :type result: Callable[[ClassVisitor], Any], optional
+    :return: a mapping of file paths to their :class:`ParseResult`
+    :rtype: dict
+    """
+    return {
+        file_result.path: file_result
+        for file_result in iter_parse_files(paths, visitor_factory, result, **kwargs)
+    }
+
+
+def iter_read_headers(
+    paths: str | Iterable[str],
+    executor: str | Executor = "thread",
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    progress: Optional[Callable[[int, int, ParseResult], None]] = None,
+) -> Iterator[ParseResult]:
+    """Reads the class headers of the given files and yields them in completion order.
+
+    Only the first lines of each file are read (see :func:`read_header`), so
+    threads are used by default.
+
+    :param paths: a root directory or a list of file paths
+    :type paths: str | Iterable[str]
+    :param executor: ``"process"``, ``"thread"`` or an existing executor instance,
+                     defaults to ``"thread"``
+    :type executor: str | Executor, optional
+    :param max_workers: the amount of workers, defaults to the CPU count
+    :type max_workers: int, optional
+    :param chunksize: the amount of files per task, defaults to a value based on
+                      the file and worker count
+    :type chunksize: int, optional
+    :param progress: called with ``(done, total, result)`` after each file
+    :type progress: Callable[[int, int, ParseResult], None], optional
+    :raises ValueError: if the executor type is unknown
+    :yield: one :class:`ParseResult` per file storing a :class:`ClassHeader`
+    :rtype: Iterator[ParseResult]
+    """
+    yield from _iter_chunks(
+        _read_header_chunk, (), paths, executor, max_workers, chunksize, progress
+    )
+
+
+def read_headers(paths: str | Iterable[str], **kwargs) -> dict:
+    """Reads the class headers of the given files and returns all results at once.
+
+    Takes the same arguments as :func:`iter_read_headers`.
+
+    :param paths: a root directory or a list of file paths
+    :type paths: str | Iterable[str]
+    :return: a mapping of file paths to their :class:`ParseResult`
+    :rtype: dict
+    """
+    return {
+        file_result.path: file_result
+        for file_result in iter_read_headers(paths, **kwargs)
+    }
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replaces the given file, so readers never see partially written files.
+
+    :meta private:
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _same_content(path: str, data: bytes) -> bool:
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as fp:
+            return fp.read() == data
+    except OSError:
+        return False
+
+
+def _rewrite_chunk(
+    tasks: list,
+    transform_factory: Callable[[str], Optional[ClassVisitor]],
+    verbatim: bool,
+    key: bytes,
+    reader_options: dict,
+) -> list:
+    """Rewrites all given ``(path, target, previous digest)`` tasks (executed
+    within the worker).
+
+    :meta private:
+    """
+    results = []
+    reader = SmaliReader(**reader_options)
+    for path, target, previous in tasks:
+        digest = None
+        try:
+            with open(path, "rb") as fp:
+                source = fp.read()
+
+            digest = hashlib.sha256(key + source).hexdigest()
+            if digest == previous and os.path.exists(target):
+                results.append(RewriteResult(path, target, "skipped", digest, None))
+                continue
+
+            writer = SmaliWriter(
+                reader, delegate=transform_factory(path), verbatim=verbatim
+            )
+            reader.visit(source, writer)
+            code = writer.code.encode(reader.encoding)
+            if _same_content(target, code):
+                status = "unchanged"
+            else:
+                _write_atomic(target, code)
+                status = "written"
+            results.append(RewriteResult(path, target, status, digest, None))
+        except Exception as err:  # noqa
+            results.append(RewriteResult(path, target, None, digest, err))
+    return results
+
+
+def iter_rewrite_files(
+    root: str,
+    dest: str,
+    transform_factory: Callable[[str], Optional[ClassVisitor]],
+    verbatim: bool = False,
+    manifest: Optional[str] = None,
+    key: str = "",
+    executor: str | Executor = "process",
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    progress: Optional[Callable[[int, int, RewriteResult], None]] = None,
+    errors: str = "strict",
+    **reader_options,
+) -> Iterator[RewriteResult]:
+    """Rewrites all Smali files below *root* in parallel and yields the results
+    in completion order.
+
+    Each file is read by a :class:`SmaliReader` into a :class:`SmaliWriter`
+    that forwards all events to the visitor returned by *transform_factory*.
+    The code is written to the same relative path below *dest*. Output files
+    are replaced atomically and only if their content changes.
+
+    With a *manifest*, the content hash of each source file is stored in the
+    given JSON file. Files whose hash matches the previous run are skipped
+    without parsing them. The *key* is included in each hash, so it should
+    change whenever the transformation does.
+
+    >>> def new_transform(path: str) -> ClassVisitor:
+    ...     return RemoveLogging()
+    >>> for result in iter_rewrite_files("./smali", "./smali-out", new_transform,
+    ...                                  verbatim=True, manifest="rewrite.json"):
+    ...     if result.error:
+    ...         print(result.path, result.error)
+
+    :param root: the source directory
+    :type root: str
+    :param dest: the output directory (will be created if needed)
+    :type dest: str
+    :param transform_factory: called with the file path to create the writer's
+                              delegate, which may be None
+    :type transform_factory: Callable[[str], ClassVisitor | None]
+    :param verbatim: whether members the transform doesn't visit should be
+                     copied unchanged (see :class:`SmaliWriter`), defaults to False
+    :type verbatim: bool, optional
+    :param manifest: the path of the manifest file, defaults to None
+    :type manifest: str, optional
+    :param key: identifies the transformation in the manifest, defaults to ""
+    :type key: str, optional
+    :param executor: ``"process"``, ``"thread"`` or an existing executor instance,
+                     defaults to ``"process"``
+    :type executor: str | Executor, optional
+    :param max_workers: the amount of workers, defaults to the CPU count
+    :type max_workers: int, optional
+    :param chunksize: the amount of files per task, defaults to a value based on
+                      the file and worker count
+    :type chunksize: int, optional
+    :param progress: called with ``(done, total, result)`` after each file
+    :type progress: Callable[[int, int, RewriteResult], None], optional
+    :param errors: the error handling of each reader, defaults to ``"strict"``
+    :type errors: str, optional
+    :raises ValueError: if the executor type is unknown
+    :yield: one :class:`RewriteResult` per file
+    :rtype: Iterator[RewriteResult]
+    """
+    previous = {}
+    if manifest:
+        try:
+            with open(manifest, "r", encoding="utf-8") as fp:
+                previous = json.load(fp)
+        except (OSError, ValueError):
+            # A missing or corrupted manifest only disables skipping
+            previous = {}
+
+    tasks = []
+    for path in find_files(root):
+        name = os.path.relpath(path, root)
+        tasks.append((path, os.path.join(dest, name), previous.get(name)))
+
+    reader_options["errors"] = errors
+    digests = {}
+    try:
+        for file_result in _iter_chunks(
+            _rewrite_chunk,
+            (transform_factory, verbatim, key.encode("utf-8"), reader_options),
+            tasks,
+            executor,
+            max_workers,
+            chunksize,
+            progress,
+        ):
+            if not file_result.error:
+                digests[os.path.relpath(file_result.path, root)] = file_result.digest
+            yield file_result
+    finally:
+        if manifest:
+            # Only files that have been rewritten successfully are stored
+            _write_atomic(manifest, json.dumps(digests, indent=0).encode("utf-8"))
+
+
+def rewrite_files(
+    root: str,
+    dest: str,
+    transform_factory: Callable[[str], Optional[ClassVisitor]],
+    **kwargs,
+) -> dict:
+    """Rewrites all Smali files below *root* and returns all results at once.
+
+    Takes the same arguments as :func:`iter_rewrite_files`.
+
+    :param root: the source directory
+    :type root: str
+    :param dest: the output directory
+    :type dest: str
+    :param transform_factory: called with the file path to create the writer's
+                              delegate, which may be None
+    :type transform_factory: Callable[[str], ClassVisitor | None]
+    :return: a mapping of source paths to their :class:`RewriteResult`
+    :rtype: dict
+    """
+    return {
+        file_result.path: file_result
+        for file_result in iter_rewrite_files(root, dest, transform_factory, **kwargs)
+    }
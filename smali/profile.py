@@ -0,0 +1,329 @@
+# This file is part of pysmali's Smali API
+# Copyright (C) 2023-2024 MatrixEditor
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from __future__ import annotations
+
+__doc__ = """
+Profiling of :class:`SmaliReader` runs.
+
+A :class:`ReaderProfile` passed to the reader collects line, directive and
+instruction counts as well as the time spent in each handler of the reader
+and in each visitor callback:
+
+.. code-block:: python
+
+    from smali.profile import ReaderProfile
+
+    profile = ReaderProfile()
+    reader = SmaliReader(profile=profile)
+    reader.visit(source, MyClassVisitor())
+    print(json.dumps(profile.as_dict(), indent=2))
+
+Readers without a profile are not affected at all. Profiled runs use a
+subclass of the reader with instrumented handlers, which is selected once
+per call to :meth:`SmaliReader.visit`.
+"""
+
+import functools
+
+from collections import Counter
+from time import perf_counter
+
+from smali.visitor import (
+    VisitorBase,
+    ClassVisitor,
+    FieldVisitor,
+    AnnotationVisitor,
+    MethodVisitor,
+)
+
+__all__ = ["ReaderProfile"]
+
+
+class ReaderProfile:
+    """Collects statistics of all profiled reader runs.
+
+    Times are measured inclusively, i.e. the time of a handler contains the
+    time of all handlers and visitor callbacks it has called. The time of
+    ``_next_line`` covers reading and tokenizing lines.
+
+    .. note::
+        Profiles are not thread-safe, each thread should use its own reader
+        and profile.
+    """
+
+    lines: int
+    """The amount of lines read"""
+
+    directives: Counter
+    """Counts all handled directives by name (e.g. ``".method"``)"""
+
+    instructions: Counter
+    """Counts all handled instructions by opcode name"""
+
+    handlers: dict
+    """Maps reader methods to ``[calls, seconds]``"""
+
+    visitors: dict
+    """Maps visitor callbacks (``<class>.<method>``) to ``[calls, seconds]``"""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Removes all collected values."""
+        self.lines = 0
+        self.directives = Counter()
+        self.instructions = Counter()
+        self.handlers = {}
+        self.visitors = {}
+
+    def as_dict(self) -> dict:
+        """Returns all collected values as a JSON serializable dictionary.
+
+        >>> profile.as_dict()
+        {'lines': 3029, 'directives': {'.method': 52, ...}, 'instructions': {...},
+         'handlers': {'_handle_method': {'calls': 52, 'seconds': 0.0123}, ...},
+         'visitors': {'SmaliWriter.visit_method': {'calls': 52, 'seconds': 0.0012}, ...}}
+
+        :return: the report
+        :rtype: dict
+        """
+        return {
+            "lines": self.lines,
+            "directives": dict(self.directives),
+            "instructions": dict(self.instructions),
+            "handlers": _timings(self.handlers),
+            "visitors": _timings(self.visitors),
+        }
+
+    def wrap(self, visitor: VisitorBase) -> VisitorBase:
+        """Returns a visitor that measures the callbacks of the given one.
+
+        :param visitor: the visitor to measure
+        :type visitor: VisitorBase
+        :return: the measuring visitor or the visitor itself if its type
+                 is unknown
+        :rtype: VisitorBase
+        """
+        if isinstance(visitor, _TimedVisitor):
+            return visitor
+
+        for base, timed in _TIMED_VISITORS:
+            if isinstance(visitor, base):
+                return timed(visitor, self)
+        return visitor
+
+    def reader_class(self, cls: type) -> type:
+        """Returns the instrumented subclass of the given reader class.
+
+        :param cls: the reader class
+        :type cls: type
+        :return: the subclass used for profiled runs
+        :rtype: type
+        """
+        return _profiled_reader(cls)
+
+
+def _timings(values: dict) -> dict:
+    return {
+        name: {"calls": calls, "seconds": seconds}
+        for name, (calls, seconds) in values.items()
+    }
+
+
+def _add_time(values: dict, name: str, seconds: float) -> None:
+    entry = values.get(name)
+    if entry is None:
+        values[name] = [1, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _timed_handler(func, count=None):
+    """Wraps a reader method to measure its calls.
+
+    :meta private:
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def handler(self, *args):
+        profile = self.profile
+        if count is not None:
+            count(self, profile, args)
+        start = perf_counter()
+        try:
+            return func(self, *args)
+        finally:
+            _add_time(profile.handlers, name, perf_counter() - start)
+
+    return handler
+
+
+def _count_directive(reader, profile: ReaderProfile, args: tuple) -> None:
+    profile.directives[reader.line.peek()] += 1
+
+
+def _count_instruction(reader, profile: ReaderProfile, args: tuple) -> None:
+    profile.instructions[args[0]] += 1
+
+
+def _timed_next_line(func):
+    """Wraps ``_next_line`` to count the lines read.
+
+    :meta private:
+    """
+
+    @functools.wraps(func)
+    def next_line(self, *args, **kwargs):
+        lineno = self.lineno
+        start = perf_counter()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            profile = self.profile
+            _add_time(profile.handlers, "_next_line", perf_counter() - start)
+            profile.lines += self.lineno - lineno
+
+    return next_line
+
+
+@functools.lru_cache(maxsize=None)
+def _profiled_reader(cls: type) -> type:
+    """Creates a subclass of the given reader with instrumented handlers.
+
+    :meta private:
+    """
+    if "_profiled" in cls.__dict__:
+        # Method handles create their context from a profiled one
+        return cls
+
+    instruction_readers = {func.__name__ for func in cls._instructions.values()}
+    namespace = {"_next_line": _timed_next_line(cls._next_line), "_profiled": True}
+    for name in dir(cls):
+        if not name.startswith(("_handle_", "_read_")):
+            continue
+
+        func = getattr(cls, name)
+        if name == "_handle_token":
+            namespace[name] = _timed_handler(func, _count_directive)
+        elif name in instruction_readers:
+            namespace[name] = _timed_handler(func, _count_instruction)
+        else:
+            namespace[name] = _timed_handler(func)
+
+    # Custom directives are stored in the dispatch table only
+    namespace["_custom_directives"] = {
+        directive: _timed_handler(func)
+        for directive, func in cls._custom_directives.items()
+    }
+    profiled = type(f"Profiled{cls.__name__}", (cls,), namespace)
+    # Instrumented handlers must not change which lines are skipped
+    profiled._line_events = cls._line_events
+    profiled._skip_cache = cls._skip_cache
+    return profiled
+
+
+class _TimedVisitor:
+    """Mixin for visitors that measure the callbacks of their delegate.
+
+    :meta private:
+    """
+
+    def __init__(self, visitor: VisitorBase, profile: ReaderProfile) -> None:
+        VisitorBase.__init__(self)
+        self.delegate = visitor
+        self.profile = profile
+        # Only the events of the delegate are of interest
+        self.interests = frozenset()
+
+
+def _timed_event(kind: str, child: type | None = None):
+    """Creates a visitor method that measures the event named *kind*.
+
+    :meta private:
+    """
+    name = f"visit_{kind}"
+
+    def visit(self, *args):
+        delegate = self.delegate
+        start = perf_counter()
+        try:
+            result = getattr(delegate, name)(*args)
+        finally:
+            _add_time(
+                self.profile.visitors,
+                f"{delegate.__class__.__name__}.{name}",
+                perf_counter() - start,
+            )
+        if child is not None and result:
+            return child(result, self.profile)
+        return result
+
+    visit.__name__ = name
+    return visit
+
+
+def _install(timed: type, base: type, children: dict) -> None:
+    for name in dir(base):
+        if name.startswith("visit_"):
+            kind = name[6:]
+            setattr(timed, name, _timed_event(kind, children.get(kind)))
+
+
+class _TimedAnnotationVisitor(_TimedVisitor, AnnotationVisitor):
+    pass
+
+
+class _TimedFieldVisitor(_TimedVisitor, FieldVisitor):
+    pass
+
+
+class _TimedMethodVisitor(_TimedVisitor, MethodVisitor):
+    pass
+
+
+class _TimedClassVisitor(_TimedVisitor, ClassVisitor):
+    pass
+
+
+_install(
+    _TimedAnnotationVisitor, AnnotationVisitor, {"subannotation": _TimedAnnotationVisitor}
+)
+_install(_TimedFieldVisitor, FieldVisitor, {"annotation": _TimedAnnotationVisitor})
+_install(_TimedMethodVisitor, MethodVisitor, {"annotation": _TimedAnnotationVisitor})
+_install(
+    _TimedClassVisitor,
+    ClassVisitor,
+    {
+        "annotation": _TimedAnnotationVisitor,
+        "field": _TimedFieldVisitor,
+        "method": _TimedMethodVisitor,
+        "inner_class": _TimedClassVisitor,
+    },
+)
+
+_TIMED_VISITORS = (
+    (ClassVisitor, _TimedClassVisitor),
+    (MethodVisitor, _TimedMethodVisitor),
+    (FieldVisitor, _TimedFieldVisitor),
+    (AnnotationVisitor, _TimedAnnotationVisitor),
+)
+"""Measuring visitor type for each visitor base class.
+
+:meta private:
+"""
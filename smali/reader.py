@@ -20,7 +20,10 @@ routine.
 """
 
 import io
-from typing import Optional
+import mmap
+import os
+
+from typing import NamedTuple, Optional
 
 from smali.visitor import (
     VisitorBase,
@@ -29,7 +32,17 @@ from smali.visitor import (
     AnnotationVisitor,
     MethodVisitor,
 )
-from smali.base import AccessType, Line, Token, SVMType, smali_value, is_type_descriptor
+from smali.base import (
+    AccessType,
+    Line,
+    LineTokenizer,
+    Token,
+    SVMType,
+    smali_values,
+    is_type_descriptor,
+)
+from smali import opcode
+from smali.profile import ReaderProfile, _TimedVisitor
 from smali.opcode import RETURN, GOTO
 
 
@@ -39,6 +52,19 @@ class SupportsCopy:
     Note that the context is used to distinguish the current visitor.
     """
 
+    verbatim: bool = False
+    """Whether members without a visitor should be passed to :meth:`copy_block`.
+
+    The reader copies such members (methods, fields and annotations) from
+    the source without parsing them. Otherwise, their lines are tokenized
+    and passed to :meth:`copy` one by one. Header directives (``.class``,
+    ``.super``, ``.source``, ...) and class-level comments are passed to
+    :meth:`copy` as well, before their visit method is called.
+
+    Copied lines keep their trailing whitespace. If the source ends with a
+    line break, an empty line is copied at the end of the class.
+    """
+
     def copy(self, line: str, context: type = ClassVisitor) -> None:
         """Copies the given line.
 
@@ -46,12 +72,171 @@ class SupportsCopy:
         :type line: str
         """
 
+    def copy_block(self, lines: list, context: type = ClassVisitor) -> None:
+        """Copies all lines of a member that won't be visited.
+
+        The lines are taken from the source unchanged (including comments
+        and trailing whitespace), only the final ``\\n`` of each line is
+        removed. This method is only called if :attr:`verbatim` is enabled.
+
+        :param lines: the member's lines, starting with its directive
+        :type lines: list[str]
+        :param context: the type of the visitor that declined the member
+        :type context: type
+        """
+        for line in lines:
+            self.copy(line, context)
+
+
+def _strip_newline(line: str) -> str:
+    """Removes the line break of a line read from the source.
+
+    Only ``\\n`` is removed, so copies of CRLF sources keep their ``\\r``.
+
+    :meta private:
+    """
+    return line[:-1] if line.endswith("\n") else line
+
 
 EMPTY_ANNOV = AnnotationVisitor()
 EMPTY_METHV = MethodVisitor()
 EMPTY_FIELDV = FieldVisitor()
 EMPTY_CLASSV = ClassVisitor()
 
+
+class ClassHeader(NamedTuple):
+    """The class definition of a Smali file as returned by :func:`read_header`."""
+
+    name: str
+    """The class name (type descriptor, e.g. "Lcom/example/A;")"""
+
+    access_flags: int
+    """The class access flags"""
+
+    super_class: Optional[str]
+    """The super class (type descriptor) or None if not defined"""
+
+    interfaces: tuple
+    """All implemented interfaces (type descriptors)"""
+
+    source: Optional[str]
+    """The value of the ``.source`` directive or None if not defined"""
+
+
+class Diagnostic(NamedTuple):
+    """A parsing error that has been skipped by a reader with ``errors="recover"``."""
+
+    lineno: int
+    """The number of the line that caused the error (starting at 1)"""
+
+    line: str
+    """The raw line that caused the error"""
+
+    message: str
+    """The error message"""
+
+    error: Exception
+    """The original exception"""
+
+
+RECOVERABLE_ERRORS = (SyntaxError, ValueError, StopIteration, IndexError, KeyError)
+"""Exceptions that are turned into :class:`Diagnostic` objects in recovery mode."""
+
+_END_SCOPES = {
+    str(Token.METHOD): MethodVisitor,
+    str(Token.FIELD): FieldVisitor,
+    str(Token.ANNOTATION): AnnotationVisitor,
+    str(Token.SUBANNOTATION): AnnotationVisitor,
+}
+"""Visitor types that are closed by ``.end <scope>``.
+
+:meta private:
+"""
+
+
+class MethodHandle:
+    """Reference to a method body that has not been parsed yet.
+
+    Handles are created by a :class:`SmaliReader` with *lazy_methods* enabled
+    and passed to :meth:`ClassVisitor.visit_method_handle`. The body can be
+    parsed later on with :meth:`visit`, which requires the source to still
+    be open.
+
+    :param reader: the reader (context) that created this handle
+    :type reader: SmaliReader
+    :param start: the source position of the first line after ``.method``
+    :type start: int
+    :param end: the source position after the ``.end method`` line
+    :type end: int
+    """
+
+    name: str
+    """The method's name"""
+
+    access_flags: int
+    """The method's access flags"""
+
+    parameters: list
+    """The parameter list (internal names)"""
+
+    return_type: str
+    """The return type (internal name)"""
+
+    start: int
+    """The source position of the method body (as returned by ``tell()``)"""
+
+    end: int
+    """The source position after the ``.end method`` line"""
+
+    def __init__(
+        self,
+        reader: "SmaliReader",
+        name: str,
+        access_flags: int,
+        parameters: list,
+        return_type: str,
+        start: int,
+        end: int,
+    ) -> None:
+        self._reader = reader
+        self.name = name
+        self.access_flags = access_flags
+        self.parameters = parameters
+        self.return_type = return_type
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"<MethodHandle {self.name} [{self.start}:{self.end}]>"
+
+    def visit(self, visitor: MethodVisitor) -> None:
+        """Parses the method body and notifies the given visitor.
+
+        The visitor receives the same events it would get from
+        :meth:`ClassVisitor.visit_method` in a normal run, including the
+        final ``visit_end()``.
+
+        :param visitor: the visitor to notify
+        :type visitor: MethodVisitor
+        :raises ValueError: if the visitor is null
+        :raises SyntaxError: if the body ends unexpectedly
+        """
+        if not visitor:
+            raise ValueError("Invalid visitor (nullptr)")
+
+        reader = self._reader
+        source = reader.source
+        position = source.tell()
+        source.seek(self.start)
+        try:
+            context = reader._new_context(source, visitor)
+            context._skip_unused(visitor)
+            context._visit_method_body()
+        finally:
+            # The handle may be used while the class is still being parsed
+            source.seek(position)
+
+
 class SmaliReader:
     """Basic implementation of a line-base Smali-SourceCode parser.
 
@@ -63,9 +248,16 @@ class SmaliReader:
     :param snippet: With this option enabled, the initial class definition will be
                     skipped, defaults to False
     :type snippet: bool, optional
-    :param errors: Indicates whether this reader should throw errors (values: ``strict``, ``ignore``),
-                    defaults to 'strict'
+    :param errors: Indicates whether this reader should throw errors (values: ``strict``, ``ignore``,
+                    ``recover``), defaults to 'strict'
     :type errors: str, optional
+    :param lazy_methods: With this option enabled, bodies of methods without a visitor
+                         won't be parsed, defaults to False
+    :type lazy_methods: bool, optional
+    :param encoding: The encoding of binary sources, defaults to ``"utf-8"``
+    :type encoding: str, optional
+    :param profile: Collects statistics of all runs of this reader, defaults to None
+    :type profile: ReaderProfile, optional
     """
 
     validate: bool = False
@@ -78,13 +270,35 @@ class SmaliReader:
     snippet: bool = False
     """With this option enabled, the initial class definition will be skipped."""
 
-    line: Line = Line(None)
-    """The current line. (Mainly used for debugging purposes)"""
+    lazy_methods: bool = False
+    """With this option enabled, the body of a method for which
+    :meth:`ClassVisitor.visit_method` returns no visitor is skipped without
+    tokenizing it. The visitor receives a :class:`MethodHandle` instead,
+    which can be used to parse the body later on."""
+
+    encoding: str = "utf-8"
+    """The encoding used to decode lines of binary sources (``bytes``,
+    ``bytearray``, ``memoryview``, ``mmap`` or binary file objects)."""
+
+    profile: Optional[ReaderProfile] = None
+    """Collects line counts and handler timings if set (see :mod:`smali.profile`).
+
+    Profiling is enabled once per call to :meth:`visit`, so readers without
+    a profile run the uninstrumented handlers.
+    """
+
+    line: Line = LineTokenizer(None)
+    """The current line. (Mainly used for debugging purposes)
+
+    Any :class:`Line` implementation can be assigned here, the default
+    :class:`LineTokenizer` splits each line in a single pass. Each call
+    to :meth:`visit` uses a new instance of the same type.
+    """
 
     source: io.IOBase
     """The source to read from."""
 
-    stack: list = []
+    stack: list
     """Stores the current visitors (index 0 stores the initial visitor)
 
     A null value indicates that no visitors are registered for the current parsing
@@ -92,31 +306,191 @@ class SmaliReader:
     """
 
     errors: str = "strict"
-    """Indicates whether this reader should throw errors (values: 'strict', 'ignore')"""
+    """Indicates whether this reader should throw errors (values: 'strict', 'ignore', 'recover')
+
+    With ``"recover"``, malformed statements are reported to
+    :meth:`ClassVisitor.visit_diagnostic` and the reader continues at the next
+    ``.method``, ``.field`` or ``.end`` directive.
+    """
+
+    lineno: int
+    """The number of the current line (starting at 1)"""
 
     copy_handler: Optional[SupportsCopy]
 
+    _directives: dict = {}
+    """Maps directive names (without the leading dot) to their handler function.
+
+    The table is built at class creation from all ``_handle_<name>`` methods,
+    where underscores in the name are replaced by ``-``. Internal methods
+    must therefore use another prefix (e.g. ``_dispatch_``).
+
+    :meta private:
+    """
+
+    _custom_directives: dict = {}
+    """Handlers registered with :meth:`register_directive`.
+
+    :meta private:
+    """
+
+    _instructions: dict = {}
+    """Maps known opcode names to the function that reads the instruction.
+
+    :meta private:
+    """
+
+    _INTERNAL_HANDLERS = ("token", "block", "value", "instruction", "method_int")
+    """``_handle_*`` methods that don't handle a directive.
+
+    :meta private:
+    """
+
+    _line_events: dict = {}
+    """Maps the first token of single-line method statements to the only
+    event they produce. Used to skip lines no visitor is interested in.
+
+    :meta private:
+    """
+
+    _skip_cache: dict = {}
+    """Stores the tokens to skip for each set of interests.
+
+    :meta private:
+    """
+
+    _HANDLER_EVENTS = {
+        "_read_invoke": "invoke",
+        "_read_return": "return",
+        "_read_goto": "goto",
+        "_read_instruction": "instruction",
+        "_handle_line": "line",
+        "_handle_locals": "locals",
+        "_handle_registers": "registers",
+        "_handle_local": "local",
+        "_handle_param": "param",
+        "_handle_parameter": "param",
+        "_handle_catch": "catch",
+        "_handle_catchall": "catchall",
+        "_handle_prologue": "prologue",
+        "_handle_restart": "restart",
+        "_handle_block": "block",
+    }
+    """Default handlers that read exactly one line and produce one event.
+
+    :meta private:
+    """
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._build_dispatch_tables()
+
+    @classmethod
+    def _build_dispatch_tables(cls) -> None:
+        """Creates the directive and instruction tables of the given class.
+
+        :meta private:
+        """
+        directives = {}
+        for attr in dir(cls):
+            if attr.startswith("_handle_") and attr[8:] not in cls._INTERNAL_HANDLERS:
+                directives[attr[8:].replace("_", "-")] = getattr(cls, attr)
+
+        custom = {}
+        for base in reversed(cls.__mro__):
+            custom.update(base.__dict__.get("_custom_directives", {}))
+        directives.update(custom)
+        cls._custom_directives = custom
+        cls._directives = directives
+
+        cls._instructions = {
+            name: cls._instruction_handler(name) for name in opcode.REGISTRY
+        }
+
+        # Only handlers of this class are known to consume a single line,
+        # overridden or custom handlers are never skipped.
+        line_events = {":": cls._handle_block}
+        line_events.update((f".{name}", func) for name, func in directives.items())
+        line_events.update(cls._instructions)
+        cls._line_events = {
+            token: cls._HANDLER_EVENTS[func.__name__]
+            for token, func in line_events.items()
+            if func.__name__ in cls._HANDLER_EVENTS
+            and SmaliReader.__dict__.get(func.__name__) is func
+        }
+        cls._skip_cache = {}
+
+    @classmethod
+    def _instruction_handler(cls, instruction: str):
+        """Returns the function that reads the given instruction.
+
+        :param instruction: the opcode name
+        :type instruction: str
+        :meta private:
+        """
+        if instruction.startswith("invoke"):
+            return cls._read_invoke
+        if instruction.startswith(RETURN):
+            return cls._read_return
+        if instruction == GOTO:
+            return cls._read_goto
+        return cls._read_instruction
+
+    @classmethod
+    def register_directive(cls, name: str, handler) -> None:
+        """Registers a handler for a (custom) directive.
+
+        The handler will be called with the reader as its only argument
+        and the current line positioned at the directive token. Handlers
+        can also be added by defining a ``_handle_<name>`` method in a
+        subclass.
+
+        >>> def handle_foo(reader: SmaliReader) -> None:
+        ...     reader.line.last()
+        >>> SmaliReaderSubclass.register_directive("foo", handle_foo)
+
+        :param name: the directive name without the leading dot
+        :type name: str
+        :param handler: the function to call
+        :type handler: Callable[[SmaliReader], None]
+        """
+        if "_custom_directives" not in cls.__dict__:
+            cls._custom_directives = dict(cls._custom_directives)
+        cls._custom_directives[name] = handler
+        cls._directives[name] = handler
+
     def __init__(
         self,
         validate: bool = True,
         comments: bool = False,
         snippet: bool = False,
         errors: str = "strict",
+        lazy_methods: bool = False,
+        encoding: str = "utf-8",
+        profile: Optional[ReaderProfile] = None,
     ) -> None:
         self.validate = validate
         self.comments = comments
         self.snippet = snippet
         self.errors = errors
+        self.lazy_methods = lazy_methods
+        self.encoding = encoding
+        self.profile = profile
         self.copy_handler = None
         # check valid values
-        if self.errors not in ("ignore", "strict"):
+        if self.errors not in ("ignore", "strict", "recover"):
             raise ValueError(f"Invalid error handler: {errors}")
 
     def visit(self, source: io.IOBase, visitor: ClassVisitor) -> None:
         """Parses the given input which can be any readable source.
 
-        :param source: the Smali source code
-        :type source: io.IOBase | str | bytes
+        Binary sources are read line by line and each line is decoded
+        using :attr:`encoding`. Buffers are not copied into a string
+        before parsing. Paths (:class:`os.PathLike` objects) are mapped
+        into memory, so strings always store source code.
+
+        :param source: the Smali source code or the path of a source file
+        :type source: io.IOBase | str | bytes | bytearray | memoryview | mmap.mmap | os.PathLike
         :param visitor: the visitor to use, defaults to None
         :type visitor: ClassVisitor, optional
         :raises ValueError: If the provided values are null
@@ -126,31 +500,112 @@ class SmaliReader:
         if not visitor or not source:
             raise ValueError("Invalid source or visitor (nullptr)")
 
+        source = self._open_source(source)
+        context = self._new_context(source, visitor)
+        # We need to parse the class definition first if needed
+        if not context.snippet:
+            context._class_def()
+        context._do_visit()
+
+    def _open_source(self, source: io.IOBase | str | bytes) -> io.IOBase:
+        """Wraps and verifies the given source.
+
+        :param source: the Smali source code or the path of a source file
+        :type source: io.IOBase | str | bytes | bytearray | memoryview | mmap.mmap | os.PathLike
+        :raises TypeError: if the source type is not accepted
+        :raises ValueError: if the source is not readable
+        :return: a readable source
+        :rtype: io.IOBase
+        :meta public:
+        """
+        if isinstance(source, os.PathLike):
+            source = map_file(source)
+
         # Wrap string and bytes instances automatically.
         if isinstance(source, str):
             source = io.StringIO(source)
 
-        elif isinstance(source, bytes):
+        elif isinstance(source, (bytes, bytearray, memoryview)):
             source = io.BytesIO(source)
 
+        # Memory maps already provide readline(), tell() and seek()
+        elif isinstance(source, mmap.mmap):
+            if source.closed:
+                raise ValueError("Source object is not readable!")
+
         # The TypeError is needed to provide information about
         # types we don't accept
         elif not isinstance(source, io.IOBase):
             raise TypeError(f"Invalid source type: {source.__class__}")
 
-        if not source.readable():
+        elif not source.readable():
             raise ValueError("Source object is not readable!")
 
-        if self.errors not in ("ignore", "strict"):
+        if self.errors not in ("ignore", "strict", "recover"):
             raise ValueError(f"Invalid error handling type: {self.errors}")
+        return source
 
-        self.source = source
-        self.stack.append(visitor)
+    def _new_context(self, source: io.IOBase, visitor: ClassVisitor) -> "SmaliReader":
+        """Creates the parse context for one call to :meth:`visit`.
 
-        # We need to parse the class definition first if needed
-        if not self.snippet:
-            self._class_def()
-        self._do_visit()
+        The context is a shallow copy of this reader that owns the source,
+        the current line and the visitor stack. Therefore, this reader is
+        never modified while parsing and can be shared across threads or
+        used again from within a visitor.
+
+        :param source: the source to read from
+        :type source: io.IOBase
+        :param visitor: the initial visitor
+        :type visitor: ClassVisitor
+        :return: the new parse context
+        :rtype: SmaliReader
+        :meta public:
+        """
+        cls = self.__class__
+        if self.profile is not None:
+            cls = self.profile.reader_class(cls)
+            visitor = self.profile.wrap(visitor)
+
+        context = object.__new__(cls)
+        context.__dict__.update(self.__dict__)
+        context.source = source
+        context.stack = [visitor]
+        context.line = self.line.__class__(None)
+        context._source_line = ""
+        context.lineno = 0
+        context._skipped = None
+        return context
+
+    def _skip_unused(self, visitor: MethodVisitor) -> None:
+        """Enables skipping of method statements the given visitor won't consume.
+
+        Lines are never skipped if a copy handler is present or the visitor
+        wants to receive EOL comments. Skipping ends once another visitor
+        is on top of the stack.
+
+        :param visitor: the active method visitor (its interests are used)
+        :type visitor: MethodVisitor
+        :meta public:
+        """
+        self._skipped = None
+        if self.copy_handler:
+            return
+
+        interests = visitor.get_interests()
+        if "eol_comment" in interests:
+            return
+
+        tokens = self._skip_cache.get(interests)
+        if tokens is None:
+            tokens = frozenset(
+                token
+                for token, event in self._line_events.items()
+                if event not in interests
+            )
+            self._skip_cache[interests] = tokens
+        if tokens:
+            # Profiled runs wrap the visitor, so the stack object is stored
+            self._skipped = (self.stack[-1], tokens)
 
     @property
     def _visitor(self) -> VisitorBase[ClassVisitor | FieldVisitor | MethodVisitor | AnnotationVisitor]:
@@ -162,15 +617,14 @@ class SmaliReader:
         """
         return self.stack[-1]
 
-    def _next_line(self):
+    def _next_line(self, skip: bool = False):
         """Reads until the next code statement.
 
         Comments will be returned to the visitory immediately.
 
-        :param source: the source to read from
-        :type source: io.IOBase
-        :param visitor: the visitor to notify
-        :type visitor: ClassVisitor
+        :param skip: whether statements the current method visitor is not
+                     interested in should be skipped, defaults to False
+        :type skip: bool, optional
         :raises EOFError: if the end of file has beeen reached
         :meta public:
         """
@@ -182,31 +636,115 @@ class SmaliReader:
             if len(raw_line) == 0:
                 raise EOFError()
 
-            # REVISIT: what about encodings?
-            if isinstance(raw_line, (bytes, bytearray)):
-                raw_line = raw_line.decode()
-            elif isinstance(raw_line, memoryview):
-                raw_line = raw_line.tobytes().decode()
+            self.lineno += 1
+            # Lines of binary sources are decoded in one call, str() accepts
+            # bytes, bytearray and memoryview objects.
+            if raw_line.__class__ is not str:
+                raw_line = str(raw_line, self.encoding)
 
             # Sort out blank lines without anything
             if not raw_line:
                 continue
 
+            if skip and self._skipped and self.stack[-1] is self._skipped[0]:
+                # Skip the line before tokenizing it
+                token = raw_line.split(None, 1)
+                if token:
+                    token = token[0] if token[0][0] != ":" else ":"
+                    if token in self._skipped[1]:
+                        continue
+
+            self._source_line = raw_line
             self.line.reset(raw_line)
             # Comments will be returned immediately
             if raw_line.strip().startswith("#"):
-                if self._visitor and self.comments:
-                    self._visitor.visit_comment(self.line.eol_comment)
-                elif not self._visitor and self.comments:
-                    self._copy_line()
+                if self.comments:
+                    visitor = self._visitor
+                    if visitor is EMPTY_FIELDV:
+                        # Fields are closed implicitly, so the comment
+                        # belongs to the enclosing class
+                        self._copy_line(-2)
+                    elif visitor:
+                        if isinstance(visitor, ClassVisitor):
+                            self._copy_verbatim()
+                        visitor.visit_comment(self.line.eol_comment)
+                    else:
+                        self._copy_line()
                 continue
 
             # return nothing as the line object is defined globally
             break
 
-    def _copy_line(self) -> None:
+    def _copy_context(self, index: int = -1) -> type:
+        """Returns the visitor type copied lines are passed with.
+
+        :param index: the stack index of the visitor, defaults to -1
+        :type index: int, optional
+        :return: the type of the visitor at the given index
+        :rtype: type
+        :meta public:
+        """
+        visitor = self.stack[index]
+        if isinstance(visitor, _TimedVisitor):
+            # Profiled runs must copy lines exactly like normal runs
+            visitor = visitor.delegate
+        return visitor.__class__
+
+    def _copy_line(self, index: int = -1) -> None:
         if self.copy_handler:
-            self.copy_handler.copy(self.line.raw, self._visitor.__class__)
+            if getattr(self.copy_handler, "verbatim", False):
+                line = _strip_newline(self._source_line)
+            else:
+                line = self.line.raw
+            self.copy_handler.copy(line, self._copy_context(index))
+
+    def _copy_verbatim(self) -> None:
+        """Copies the current line if the copy handler keeps the original
+        formatting of class headers (see :attr:`SupportsCopy.verbatim`).
+
+        :meta public:
+        """
+        if getattr(self.copy_handler, "verbatim", False):
+            self._copy_line()
+
+    def _copy_block(self, end: str) -> bool:
+        """Copies the current member to the copy handler without parsing it.
+
+        All lines up to and including the next line starting with *end*
+        are read and passed to :meth:`SupportsCopy.copy_block` at once.
+        The current line will be set to the last line of the member.
+
+        :param end: the directive that ends the member, e.g. ``".end method"``
+        :type end: str
+        :return: whether the member has been copied, which requires a
+                 copy handler with :attr:`SupportsCopy.verbatim` enabled
+        :rtype: bool
+        :meta public:
+        """
+        if not getattr(self.copy_handler, "verbatim", False):
+            return False
+
+        lines = [_strip_newline(self._source_line)]
+        if end:
+            readline = self.source.readline
+            while True:
+                raw_line = readline()
+                if len(raw_line) == 0:
+                    # The class ends with the next line
+                    break
+
+                self.lineno += 1
+                if raw_line.__class__ is not str:
+                    raw_line = str(raw_line, self.encoding)
+
+                self._source_line = raw_line
+                lines.append(_strip_newline(raw_line))
+                if raw_line.lstrip().startswith(end):
+                    self.line.reset(raw_line)
+                    break
+
+        self.copy_handler.copy_block(lines, self._copy_context())
+        return True
 
     def _validate_token(self, token: str, expected: Token) -> None:
         """Validates the given token if validation is enabled.
@@ -291,7 +829,7 @@ class SmaliReader:
         i_values = []
         while self.line.has_next():
             value = next(self.line).rstrip(strip_chars)
-            # As the Line object splits all values by ' ', strings can
+            # As the Line object splits all values by whitespace, strings can
             # be marked by their '"' at the start or end.
             if (
                 value[0] not in ('"', "'")
@@ -312,43 +850,169 @@ class SmaliReader:
         :type visitor: ClassVisitor
         :meta public:
         """
+        handle = self._statement_handler()
         try:
             # Maybe use a loop that only executed one method at time
             # so we don't have recursion
             while True:
-                self._next_line()
-                if len(self.line) == 0:
-                    # These are just blank lines used in the original
-                    # source file.
-                    self._copy_line()
-                    continue
-
-                statement = self.line.peek()
-                # Tokens start with a leading dot
-                if statement[0] == ".":
-                    self._handle_token()
-                # The same with blocks and a ':'
-                elif statement[0] == ":":
-                    self._handle_block()
-
-                elif isinstance(self._visitor, AnnotationVisitor):
-                    self._handle_value()
-
-                elif isinstance(self._visitor, MethodVisitor):
-                    self._handle_instruction()
+                self._next_line(skip=True)
+                handle()
 
-                else:
-                    raise SyntaxError(f'Invalid statement: "{statement}"')
+        except UnicodeError:
+            # Decoding errors are ValueErrors, but must not end the class silently
+            raise
 
         except (EOFError, ValueError):
             # The error is needed to indicate the visitation should end
             while not isinstance(self._visitor, ClassVisitor):
                 self.stack.pop()
+            if self._source_line.endswith("\n"):
+                # Copied lines are joined by line breaks, so the final
+                # one is kept by an empty line
+                self._source_line = ""
+                self._copy_verbatim()
             self._visitor.visit_end()
 
         except StopIteration as err:
             raise SyntaxError("Unexpected EOL (end of line)") from err
 
+    def _dispatch_statement(self) -> None:
+        """Dispatches the current line.
+
+        :meta public:
+        """
+        if len(self.line) == 0:
+            # These are just blank lines used in the original
+            # source file.
+            self._copy_line()
+            return
+
+        statement = self.line.peek()
+        # Tokens start with a leading dot
+        if statement[0] == ".":
+            self._handle_token()
+        # The same with blocks and a ':'
+        elif statement[0] == ":":
+            self._handle_block()
+
+        elif isinstance(self._visitor, AnnotationVisitor):
+            self._handle_value()
+
+        elif isinstance(self._visitor, MethodVisitor):
+            self._handle_instruction()
+
+        else:
+            raise SyntaxError(f'Invalid statement: "{statement}"')
+
+    def _statement_handler(self):
+        """Returns the function that handles the current line.
+
+        :meta public:
+        """
+        if self.errors == "recover":
+            return self._dispatch_recovering
+        return self._dispatch_statement
+
+    def _dispatch_recovering(self) -> None:
+        """Dispatches the current line and recovers from parsing errors.
+
+        :meta public:
+        """
+        while True:
+            try:
+                self._dispatch_statement()
+                return
+            except UnicodeError:
+                raise
+            except RECOVERABLE_ERRORS as err:
+                self._recover(err)
+
+    def _recover(self, error: Exception) -> None:
+        """Reports the given error and moves to the next member boundary.
+
+        Lines are skipped until a ``.method`` or ``.field`` directive is
+        found or an ``.end`` directive that closes the active visitor. Open
+        methods and annotations are closed before the next member, so the
+        visitor stack is valid again afterwards.
+
+        :param error: the error raised while handling the current line
+        :type error: Exception
+        :raises EOFError: if EOF is reached while skipping
+        :meta public:
+        """
+        message = str(error) or error.__class__.__name__
+        diagnostic = Diagnostic(self.lineno, self.line.raw, message, error)
+        if self.stack[0]:
+            self.stack[0].visit_diagnostic(diagnostic)
+
+        while True:
+            self._next_line()
+            token = self.line.peek(None)
+            if token in (".method", ".field"):
+                while not isinstance(self._visitor, ClassVisitor):
+                    visitor = self.stack.pop()
+                    # Fields are closed implicitly (see _handle_token)
+                    if visitor and visitor not in (EMPTY_ANNOV, EMPTY_METHV):
+                        if not isinstance(visitor, FieldVisitor):
+                            visitor.visit_end()
+                return
+
+            if token == ".end" and len(self.stack) > 1:
+                scope = _END_SCOPES.get(self.line.last())
+                visitor = self._visitor
+                if scope and (
+                    isinstance(visitor, scope)
+                    or (visitor is None and scope is AnnotationVisitor)
+                ):
+                    return
+
+    def _visit_method_body(self) -> None:
+        """Parses a method body until its visitor has been removed from the stack.
+
+        :raises SyntaxError: if EOF is reached before ``.end method``
+        :meta public:
+        """
+        try:
+            while self.stack:
+                self._next_line(skip=True)
+                self._dispatch_statement()
+        except EOFError as eof:
+            raise SyntaxError("Expected '.end method' - got EOF") from eof
+        except StopIteration as err:
+            raise SyntaxError("Unexpected EOL (end of line)") from err
+
+    def _skip_method_body(self) -> int:
+        """Moves the source behind the next ``.end method`` line without parsing.
+
+        Lines are still passed to the copy handler (if any). Comments are
+        left out, just like they are for methods that won't be visited. The
+        current line will be set to the ``.end method`` line.
+
+        :raises EOFError: if EOF is reached
+        :return: the source position after the ``.end method`` line
+        :rtype: int
+        :meta public:
+        """
+        readline = self.source.readline
+        copy = self.copy_handler.copy if self.copy_handler else None
+        while True:
+            raw_line = readline()
+            if len(raw_line) == 0:
+                raise EOFError()
+
+            self.lineno += 1
+            if raw_line.__class__ is not str:
+                raw_line = str(raw_line, self.encoding)
+
+            cleaned = raw_line.strip()
+            if cleaned.startswith(".end method"):
+                self._source_line = raw_line
+                self.line.reset(raw_line)
+                return self.source.tell()
+
+            if copy and not cleaned.startswith("#"):
+                copy(raw_line.rstrip(), MethodVisitor)
+
     def _handle_token(self):
         # Remove the leading dot first bevore comparison
         statement = self.line.peek()[1:]
@@ -356,36 +1020,38 @@ class SmaliReader:
         # If the current visitor is a FieldVisitor, it should
         # be removed if the statement is not of type .annnotation
         # or .end
-        visitor = self._visitor
-        if isinstance(visitor, FieldVisitor):
-            if statement not in (Token.ANNOTATION, Token.END):
+        if isinstance(self._visitor, FieldVisitor):
+            if statement != "annotation" and statement != "end":
                 self.stack.pop()
 
-        if statement == Token.IMPLEMENTS:
-            # The name validation is done by checking if the name
-            # contains the type descriptor: 'Lcom/example/Class;'
-            next(self.line)
-            if self._visitor:
-                name = self.line.peek()
-                self._validate_descriptor(name)
-                self._visitor.visit_implements(name)
-                self._publish_comment()
-            else:
-                self._copy_line()
+        # The handlers are resolved at class creation, so we only need
+        # one lookup here.
+        callback = self._directives.get(statement)
+        if callback is None:
+            raise SyntaxError(f"Invalid token: {statement!r} - not implemented!")
 
-        elif statement == Token.CLASS:
-            c_visitor = self._class_def(next_line=False, inner_class=True)
-            self.stack.append(c_visitor)
+        callback(self)
 
+    def _handle_implements(self) -> None:
+        # The name validation is done by checking if the name
+        # contains the type descriptor: 'Lcom/example/Class;'
+        next(self.line)
+        if self._visitor:
+            name = self.line.peek()
+            self._validate_descriptor(name)
+            self._copy_verbatim()
+            self._visitor.visit_implements(name)
+            self._publish_comment()
         else:
-            # Dynamic method calling, we just need to implement specific
-            # token handling.
-            method = f'_handle_{statement.replace("-", "_")}'
-            callback = getattr(self, method, None)
-            if callback is None:
-                raise SyntaxError(f"Invalid token: {method!r} - not implemented!")
+            self._copy_line()
 
-            callback()
+    def _handle_class(self) -> None:
+        c_visitor = self._class_def(next_line=False, inner_class=True)
+        self.stack.append(c_visitor)
+        # The definition and its comment belong to the inner class
+        if c_visitor is not EMPTY_CLASSV:
+            self._copy_verbatim()
+            self._publish_comment()
 
     def _class_def(self, next_line=True, inner_class=False):
         """Parses (and verifies) the class definition.
@@ -427,12 +1093,14 @@ class SmaliReader:
             access_flags = AccessType.get_flags(flags)
             if not inner_class:
                 c_visitor = self._visitor
+                self._copy_verbatim()
                 self._visitor.visit_class(name, access_flags)
+                # Don't forget the comment
+                self._publish_comment()
             else:
+                # The comment is published by _handle_class
                 c_visitor = self._visitor.visit_inner_class(name, access_flags)
 
-            # Don't forget the comment
-            self._publish_comment()
             return c_visitor or EMPTY_CLASSV
         except StopIteration as err:
             self._throw_eol(err)
@@ -454,6 +1122,7 @@ class SmaliReader:
                 )
 
             if self._visitor:
+                self._copy_verbatim()
                 # Visit the class afterwards
                 self._visitor.visit_super(super_class)
             else:
@@ -475,6 +1144,7 @@ class SmaliReader:
 
             source = self.line.peek().replace('"', "")
             if self._visitor:
+                self._copy_verbatim()
                 self._visitor.visit_source(source)
             else:
                 self._copy_line()
@@ -508,6 +1178,10 @@ class SmaliReader:
                 f_visitor = self._visitor.visit_field(
                     name, access_flags, descriptor, value
                 )
+                # Annotations and '.end field' are copied line by line
+                if not f_visitor and self._copy_block(""):
+                    self.stack.append(EMPTY_FIELDV)
+                    return
                 self._publish_comment()
             else:
                 f_visitor = EMPTY_FIELDV
@@ -534,6 +1208,10 @@ class SmaliReader:
             self._copy_line()
             return
 
+        if isinstance(self._visitor, ClassVisitor):
+            # Inner classes don't write their end directive
+            self._copy_verbatim()
+
         visitor = self.stack.pop()
         if visitor and visitor not in (EMPTY_ANNOV, EMPTY_FIELDV, EMPTY_METHV):
             visitor.visit_end()
@@ -555,16 +1233,45 @@ class SmaliReader:
                 raise SyntaxError(f"Expected a method signature - got {signature}")
 
             m_visitor = EMPTY_METHV
+            parameters = [str(x) for x in signature.parameter_types]
+            return_type = str(signature.return_type)
             if self._visitor:
                 m_visitor = self._visitor.visit_method(
-                    signature.name,
-                    access_flags,
-                    [str(x) for x in signature.parameter_types],
-                    str(signature.return_type),
+                    signature.name, access_flags, parameters, return_type
                 )
 
+            verbatim = getattr(self.copy_handler, "verbatim", False)
+            if not m_visitor and self._visitor and (verbatim or self.lazy_methods):
+                start = self.source.tell()
+                if verbatim:
+                    self._copy_block(".end method")
+                    end = self.source.tell()
+                else:
+                    self.stack.append(EMPTY_METHV)
+                    self._publish_comment()
+                    self._copy_line()
+                    end = self._skip_method_body()
+                    # The '.end method' line belongs to the class again
+                    self.stack.pop()
+                    self._copy_line()
+
+                if self.lazy_methods:
+                    self._visitor.visit_method_handle(
+                        MethodHandle(
+                            self,
+                            signature.name,
+                            access_flags,
+                            parameters,
+                            return_type,
+                            start,
+                            end,
+                        )
+                    )
+                return
+
             # Add the visitor first before publishing the comment
             self.stack.append(m_visitor if m_visitor else EMPTY_METHV)
+            self._skip_unused(self.stack[-1])
             self._publish_comment()
             # The line will be copied if no visitor has been set
             if not m_visitor or m_visitor == EMPTY_METHV:
@@ -592,6 +1299,8 @@ class SmaliReader:
             a_visitor = EMPTY_ANNOV
             if self._visitor:
                 a_visitor = self._visitor.visit_annotation(access_flags, descriptor)
+                if not a_visitor and self._copy_block(".end annotation"):
+                    return
 
             self.stack.append(a_visitor if a_visitor else EMPTY_ANNOV)
             self._publish_comment()
@@ -661,6 +1370,7 @@ class SmaliReader:
 
         enbaled = self.line.peek()
         if self._visitor:
+            self._copy_verbatim()
             # Visit the class afterwards
             self._visitor.visit_super(int(enbaled))
         else:
@@ -829,42 +1539,49 @@ class SmaliReader:
             return
 
         instruction = next(self.line)
-        sub_ins = (
-            "" if "-" not in instruction else instruction[instruction.find("-") + 1 :]
-        )
-        if instruction.startswith("invoke"):
-            # Invoke instructions will be handles separately as they have
-            # as special structure
-            cleaned = self.line.cleaned
-            args = [
-                x.strip()
-                for x in cleaned[cleaned.find("{") + 1 : cleaned.find("}")].split(",")
-            ]
-
-            # Maybe replace this with a method call in Line
-            method_sig = self.line.last()
-
-            descriptor, signature = method_sig.split("->")
-            self._validate_descriptor(descriptor)
+        callback = self._instructions.get(instruction)
+        if callback is None:
+            # Unknown opcodes are classified by their prefix
+            callback = self._instruction_handler(instruction)
 
-            self._visitor.visit_invoke(sub_ins, args, descriptor, signature)
-        elif instruction.startswith(RETURN):
-            # Return statements are handled separately to make building
-            # Smali files easier
-            i_values = self._collect_values(",")
-            self._visitor.visit_return(sub_ins, i_values)
-
-        elif instruction == GOTO:
-            # Goto instructions are handled directly
-            block = self.line.peek().lstrip(":")
-            self._visitor.visit_goto(block)
-        else:
-            i_values = self._collect_values(",")
-            if self._visitor and self._visitor != EMPTY_METHV:
-                self._visitor.visit_instruction(instruction, i_values)
+        callback(self, instruction)
         # Don't forget the EOL comment
         self._publish_comment()
 
+    def _read_invoke(self, instruction: str) -> None:
+        # Invoke instructions will be handles separately as they have
+        # as special structure
+        sub_ins = instruction[instruction.find("-") + 1 :] if "-" in instruction else ""
+        cleaned = self.line.cleaned
+        args = [
+            x.strip()
+            for x in cleaned[cleaned.find("{") + 1 : cleaned.find("}")].split(",")
+        ]
+
+        # Maybe replace this with a method call in Line
+        method_sig = self.line.last()
+
+        descriptor, signature = method_sig.split("->")
+        self._validate_descriptor(descriptor)
+
+        self._visitor.visit_invoke(sub_ins, args, descriptor, signature)
+
+    def _read_return(self, instruction: str) -> None:
+        # Return statements are handled separately to make building
+        # Smali files easier
+        sub_ins = instruction[instruction.find("-") + 1 :] if "-" in instruction else ""
+        i_values = self._collect_values(",")
+        self._visitor.visit_return(sub_ins, i_values)
+
+    def _read_goto(self, instruction: str) -> None:
+        # Goto instructions are handled directly
+        block = self.line.peek().lstrip(":")
+        self._visitor.visit_goto(block)
+
+    def _read_instruction(self, instruction: str) -> None:
+        i_values = self._collect_values(",")
+        self._visitor.visit_instruction(instruction, i_values)
+
     def _handle_packed_switch(self) -> None:
         do_copy = not self._visitor or self._visitor == EMPTY_METHV
         next(self.line)
@@ -917,10 +1634,11 @@ class SmaliReader:
                 self._copy_line()
             if value[0] == "." and value[1:] == Token.END.value:
                 break
-            values.append(smali_value(value))
+            values.append(value)
 
         if self._visitor and self._visitor != EMPTY_METHV:
-            self._visitor.visit_array_data(length, values)
+            # All elements are decoded at once
+            self._visitor.visit_array_data(length, smali_values(values))
 
     def _handle_local(self) -> None:
         """Handle debug information."""
@@ -987,3 +1705,105 @@ class SmaliReader:
         register = self.line.last()
         self._visitor.visit_restart(register)
         self._publish_comment()
+
+
+SmaliReader._build_dispatch_tables()
+
+
+HEADER_TOKENS = frozenset(
+    str(token) for token in (Token.SUPER, Token.IMPLEMENTS, Token.SOURCE, Token.DEBUG)
+)
+"""Directives that may follow the class definition in a file header."""
+
+
+def read_header(
+    source: io.IOBase | str | bytes, encoding: str = "utf-8"
+) -> ClassHeader:
+    """Reads only the class definition and its header directives.
+
+    In contrast to :meth:`SmaliReader.visit`, no visitors are created and
+    reading stops at the first directive that is not part of the header (usually
+    ``.annotation``, ``.field`` or ``.method``), so the rest of the file won't be
+    read.
+
+    >>> read_header(".class public LA;\n.super Ljava/lang/Object;\n.method ...")
+    ClassHeader(name='LA;', access_flags=1, super_class='Ljava/lang/Object;', interfaces=(), source=None)
+
+    :param source: the Smali source code or the path of a source file
+    :type source: io.IOBase | str | bytes | bytearray | memoryview | mmap.mmap | os.PathLike
+    :param encoding: the encoding of binary sources, defaults to ``"utf-8"``
+    :type encoding: str, optional
+    :raises SyntaxError: if the source does not start with a class definition
+    :return: the parsed header
+    :rtype: ClassHeader
+    """
+    if isinstance(source, os.PathLike):
+        source = map_file(source)
+
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    name = super_class = source_name = None
+    access_flags = 0
+    interfaces = []
+    while True:
+        raw_line = source.readline()
+        if len(raw_line) == 0:
+            break
+
+        if raw_line.__class__ is not str:
+            raw_line = str(raw_line, encoding)
+
+        cleaned = raw_line.strip()
+        if not cleaned or cleaned[0] == "#":
+            continue
+
+        # Strings are only allowed in .source directives, so we can
+        # split the line without a full tokenizer.
+        directive, _, value = cleaned.partition(" ")
+        directive = directive[1:]
+        if name is None:
+            if directive != Token.CLASS:
+                raise SyntaxError(f"Expected a class defintion - got {cleaned!r}")
+
+            *flags, name = value.split("#", 1)[0].split()
+            access_flags = AccessType.get_flags(flags)
+        elif directive not in HEADER_TOKENS:
+            break
+        elif directive == Token.SOURCE:
+            source_name = value.strip().strip('"')
+        elif directive != Token.DEBUG:
+            value = value.split(None, 1)[0] if value else None
+            if directive == Token.SUPER:
+                super_class = value
+            else:
+                interfaces.append(value)
+
+    if name is None:
+        raise SyntaxError("Expected a class defintion - got EOF")
+    return ClassHeader(name, access_flags, super_class, tuple(interfaces), source_name)
+
+
+def map_file(path: str | os.PathLike) -> mmap.mmap | io.BytesIO:
+    """Maps the given file into memory (read-only).
+
+    All readers of the same file share the pages of the OS page cache and
+    lines are copied out of the mapping only when they are read. The
+    mapping stays valid after the file has been closed and is released
+    together with the last reference to it.
+
+    Files that can't be mapped (empty files, pipes or special files) are
+    read into memory instead.
+
+    :param path: the file to map
+    :type path: str | os.PathLike
+    :return: a readable source for :meth:`SmaliReader.visit`
+    :rtype: mmap.mmap | io.BytesIO
+    """
+    with open(path, "rb") as fp:
+        try:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            return io.BytesIO(fp.read())
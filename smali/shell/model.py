@@ -17,6 +17,7 @@ import os
 import sys
 import traceback
 import pprint
+import pathlib
 
 from cmd import Cmd
 
@@ -43,11 +44,35 @@ from smali.bridge.vm import (
     SmaliVMFieldReader,
     SmaliVM,
 )
+from smali.bridge.errors import ExecutionError
 
 SMALI_SCRIPT_SUFFIX = "ssf"
 """File suffix for Smali-Script files"""
 
 
+class _PendingLabels(dict):
+    """Label mapping that accepts labels which are not defined yet.
+
+    The shell executes every instruction immediately, so branches may refer
+    to labels typed later on. Such labels are mapped to negative positions
+    and only fail if the branch is taken.
+
+    :meta private:
+    """
+
+    def __init__(self, labels: dict) -> None:
+        super().__init__(labels)
+        self.pending = {}
+
+    def __contains__(self, name) -> bool:
+        return True
+
+    def __missing__(self, name: str) -> int:
+        pos = -len(self.pending) - 1
+        self.pending[pos] = name
+        return pos
+
+
 class DefaultVisitor(MethodVisitor, ClassVisitor):
     """Visitor implementation that handles both class and method definitions"""
 
@@ -86,8 +111,8 @@ class DefaultVisitor(MethodVisitor, ClassVisitor):
         self.frame.registers[register] = val
 
     def visit_block(self, name: str) -> None:
+        # Labels point to the next instruction
         self.frame.labels[name] = self.pos
-        self.pos += 1
         self.last_label = name
         self.frame.label = name
 
@@ -106,16 +131,29 @@ class DefaultVisitor(MethodVisitor, ClassVisitor):
         self.visit_catch(exc_name, blocks)
 
     def visit_instruction(self, ins_name: str, args: list) -> None:
-        for _, value in opcode.__dict__.items():
-            if value == ins_name:
-                exc = executor.get_executor(ins_name)
-                exc.args = args
-                exc(self.frame)
-                self.pos += 1
-
-                if "return" in value:
-                    print(self.frame.return_value)
-                return
+        if ins_name in opcode.REGISTRY:
+            exc = executor.get_executor(ins_name)
+            frame = self.frame
+            labels = frame.labels
+            frame.labels = _PendingLabels(labels)
+            try:
+                exc.args = exc.decode(frame, args)
+                pending = frame.labels.pending
+            finally:
+                frame.labels = labels
+
+            pos, label = frame.pos, frame.label
+            exc(frame)
+            if frame.pos in pending:
+                # Same as the VM: jumps to unknown labels are errors
+                name = pending[frame.pos]
+                frame.pos, frame.label = pos, label
+                raise ExecutionError("NoSuchLabelError", name)
+            self.pos += 1
+
+            if "return" in ins_name:
+                print(self.frame.return_value)
+            return
 
         if self.importing:
             self.shell.onecmd(f"{ins_name} {' '.join(args)}")
@@ -234,14 +272,17 @@ class ISmaliShell(Cmd):
             return
 
         cls = None
-        with open(path, "r", encoding="utf-8") as source:
-            self.__imported_files.append(path)
-            if path.endswith(f".{SMALI_SCRIPT_SUFFIX}"):
+        self.__imported_files.append(path)
+        if path.endswith(f".{SMALI_SCRIPT_SUFFIX}"):
+            with open(path, "r", encoding="utf-8") as source:
                 self.visitor.importing = True
                 self.reader.visit(source, self.visitor)
                 self.visitor.importing = False
-            else:
-                cls = self.emulator.classloader.load_class(source, init=False)
+        else:
+            # Paths are mapped into memory by the class loader
+            cls = self.emulator.classloader.load_class(
+                pathlib.Path(path), init=False
+            )
 
         try:
             if cls is not None:
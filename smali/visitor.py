@@ -13,11 +13,27 @@
 
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
+from functools import lru_cache
 from typing import List, Optional, Generic, TypeVar
 
 _VT = TypeVar("_VT", bound="VisitorBase")
 
 
+@lru_cache(maxsize=None)
+def _overridden_events(cls: type) -> frozenset:
+    """Returns the names of all events with an overridden ``visit_*`` method.
+
+    :meta private:
+    """
+    # The first class of this module in the MRO defines the no-op methods
+    base = next(c for c in cls.__mro__ if c.__module__ == __name__)
+    return frozenset(
+        name[6:]
+        for name in dir(cls)
+        if name.startswith("visit_") and getattr(cls, name) is not getattr(base, name)
+    )
+
+
 class VisitorBase(Generic[_VT]):
     """Base class for Smali-Class visitor classes.
 
@@ -33,6 +49,34 @@ class VisitorBase(Generic[_VT]):
                 f"Invalid Visitor type - expected subclass of {self.__class__}"
             )
 
+    interests: Optional[frozenset] = None
+    """The names of all events (``visit_<name>`` without the prefix) this
+    visitor consumes.
+
+    If not set, the events of all overridden ``visit_*`` methods are used.
+    Readers may skip lines that would only produce other events, so this
+    attribute should be set explicitly if methods are replaced at runtime.
+    """
+
+    def get_interests(self) -> frozenset:
+        """Returns the names of all events this visitor or its delegate consumes.
+
+        >>> class InvokeVisitor(MethodVisitor):
+        ...     def visit_invoke(self, inv_type, args, owner, method):
+        ...         ...
+        >>> InvokeVisitor().get_interests()
+        frozenset({'invoke'})
+
+        :return: the event names
+        :rtype: frozenset
+        """
+        interests = self.interests
+        if interests is None:
+            interests = _overridden_events(self.__class__)
+        if self.delegate:
+            interests = interests | self.delegate.get_interests()
+        return interests
+
     def visit_comment(self, text: str) -> None:
         """Visits a comment string.
 
@@ -429,6 +473,29 @@ class ClassVisitor(VisitorBase["ClassVisitor"]):
                 name, access_flags, parameters, return_type
             )
 
+    def visit_method_handle(self, handle) -> None:
+        """Called instead of parsing a method body if the reader skips it.
+
+        This event is only used by readers with *lazy_methods* enabled
+        and only for methods where :meth:`visit_method` returned no visitor.
+
+        :param handle: the handle that can parse the method body later on
+        :type handle: MethodHandle
+        """
+        if self.delegate:
+            self.delegate.visit_method_handle(handle)
+
+    def visit_diagnostic(self, diagnostic) -> None:
+        """Called when a malformed statement has been skipped.
+
+        This event is only used by readers with ``errors="recover"``.
+
+        :param diagnostic: the error description
+        :type diagnostic: Diagnostic
+        """
+        if self.delegate:
+            self.delegate.visit_diagnostic(diagnostic)
+
     def visit_inner_class(
         self, name: str, access_flags: int
     ) -> Optional["ClassVisitor"]:
@@ -472,3 +539,132 @@ class ClassVisitor(VisitorBase["ClassVisitor"]):
         """
         if self.delegate:
             self.delegate.visit_debug(enabled)
+
+
+class _MulticastVisitor:
+    """Mixin for visitors that forward each event to several visitors.
+
+    :meta private:
+    """
+
+    visitors: tuple
+    """The visitors that receive all events"""
+
+    def __init__(self, *visitors: VisitorBase) -> None:
+        VisitorBase.__init__(self)
+        self.visitors = tuple(visitor for visitor in visitors if visitor is not None)
+
+    def get_interests(self) -> frozenset:
+        interests = frozenset()
+        for visitor in self.visitors:
+            interests |= visitor.get_interests()
+        return interests
+
+
+def _multicast_event(name: str, child: Optional[type] = None):
+    """Creates a visitor method that forwards the event *name* to all visitors.
+
+    If *child* is given, the non-null results of all visitors are combined
+    into a visitor of that type.
+
+    :meta private:
+    """
+    if child is None:
+
+        def visit(self, *args, **kwargs):
+            for visitor in self.visitors:
+                getattr(visitor, name)(*args, **kwargs)
+
+    else:
+
+        def visit(self, *args, **kwargs):
+            children = []
+            for visitor in self.visitors:
+                result = getattr(visitor, name)(*args, **kwargs)
+                if result is not None:
+                    children.append(result)
+
+            if len(children) > 1:
+                return child(*children)
+            # A single visitor doesn't need another indirection
+            return children[0] if children else None
+
+    visit.__name__ = name
+    return visit
+
+
+class MulticastAnnotationVisitor(_MulticastVisitor, AnnotationVisitor):
+    """Forwards all annotation events to several visitors.
+
+    :param visitors: the visitors to notify, None values are ignored
+    :type visitors: AnnotationVisitor
+    """
+
+
+class MulticastFieldVisitor(_MulticastVisitor, FieldVisitor):
+    """Forwards all field events to several visitors.
+
+    :param visitors: the visitors to notify, None values are ignored
+    :type visitors: FieldVisitor
+    """
+
+
+class MulticastMethodVisitor(_MulticastVisitor, MethodVisitor):
+    """Forwards all method events to several visitors.
+
+    :param visitors: the visitors to notify, None values are ignored
+    :type visitors: MethodVisitor
+    """
+
+
+class MulticastClassVisitor(_MulticastVisitor, ClassVisitor):
+    """Forwards all class events to several visitors.
+
+    Independent analyses can share a single parse of each file this way:
+
+    >>> visitor = MulticastClassVisitor(StringCollector(), InvokeGraph(), AnnotationIndex())
+    >>> reader.visit(source, visitor)
+
+    Visitors returned for fields, methods, annotations and inner classes are
+    combined as well. Visitors that return None for a member won't receive
+    its events, and if no visitor is left, None is returned to the reader,
+    so the member can be skipped. The reader only skips statements that none
+    of the visitors is interested in.
+
+    .. note::
+        The reader notifies only one copy handler, so a :class:`SmaliWriter`
+        that copies comments or blank lines should not be combined with
+        other visitors.
+
+    :param visitors: the visitors to notify, None values are ignored
+    :type visitors: ClassVisitor
+    """
+
+
+def _install(multicast: type, base: type, children: dict) -> None:
+    for name in dir(base):
+        if name.startswith("visit_"):
+            setattr(multicast, name, _multicast_event(name, children.get(name[6:])))
+
+
+_install(
+    MulticastAnnotationVisitor,
+    AnnotationVisitor,
+    {"subannotation": MulticastAnnotationVisitor},
+)
+_install(
+    MulticastFieldVisitor, FieldVisitor, {"annotation": MulticastAnnotationVisitor}
+)
+_install(
+    MulticastMethodVisitor, MethodVisitor, {"annotation": MulticastAnnotationVisitor}
+)
+_install(
+    MulticastClassVisitor,
+    ClassVisitor,
+    {
+        "annotation": MulticastAnnotationVisitor,
+        "field": MulticastFieldVisitor,
+        "method": MulticastMethodVisitor,
+        "inner_class": MulticastClassVisitor,
+    },
+)
@@ -19,6 +19,8 @@ to procude classes, method, fields and annotations.
 """
 
 import abc
+import io
+
 from typing import List, Optional
 from smali.visitor import ClassVisitor, MethodVisitor, FieldVisitor, AnnotationVisitor
 from smali.base import AccessType, Token
@@ -54,10 +56,51 @@ class _ContainsCodeCache(SupportsCopy):
             elif isinstance(last_writer, context):
                 last_writer.get_cache().add(line)
 
+    def copy_block(self, lines: list, context: type = ClassVisitor) -> None:
+        if isinstance(self, context):
+            self.get_cache().add_to_cache(_VerbatimMember(lines))
+
+        else:
+            last_writer = self.get_cache().peek()
+            if isinstance(last_writer, SupportsCopy):
+                last_writer.copy_block(lines, context)
+            else:
+                self.get_cache().add_to_cache(_VerbatimMember(lines))
+
+
+class _VerbatimMember(_ContainsCodeCache):
+    """Source lines of a member that is copied without changes.
+
+    All lines passed to the copy methods are appended, so blank lines
+    following the member stay with it (like they do for other writers).
+
+    :param lines: the lines of the member
+    :type lines: list[str]
+    """
+
+    def __init__(self, lines: list) -> None:
+        self.cache = _CodeCache()
+        for line in lines:
+            self.cache.add(line)
+
+    def get_cache(self) -> "_CodeCache":
+        return self.cache
+
+    def copy(self, line: str, context: type = ClassVisitor) -> None:
+        self.cache.add(line)
+
+    def copy_block(self, lines: list, context: type = ClassVisitor) -> None:
+        for line in lines:
+            self.cache.add(line)
+
 
 class _CodeCache:
     """Simple container class for a code cache.
 
+    Lines and the caches of nested writers are stored in the order they were
+    added. Nested caches are rendered in place once they are applied, so
+    adding a line never copies previous code.
+
     :param indent: the indentation level of this code, defaults to 0
     :type indent: int, optional
     """
@@ -65,10 +108,10 @@ class _CodeCache:
     default_indent = "    "
 
     def __init__(self, indent=0) -> None:
-        self.__indent = indent
-        self.__code = []
-        self.__cache = []
+        self.__chunks = []
+        self.__pending = []
         self.__comment_cache = []
+        self.indent = indent
 
     @property
     def indent(self) -> int:
@@ -82,6 +125,8 @@ class _CodeCache:
     @indent.setter
     def indent(self, value: int) -> None:
         self.__indent = value
+        self.__prefix = self.default_indent * value
+        self.__inner_prefix = self.__prefix + self.default_indent
 
     def add(
         self, line: str, start: str = "", end: str = "", custom_indent: int = -1
@@ -95,19 +140,38 @@ class _CodeCache:
         :param end: additional suffix, defaults to ""
         :type end: str, optional
         """
-        indent = self.default_indent * (
-            self.indent if custom_indent == -1 else custom_indent
-        )
-        self.__code.append(start + indent + line + end)
+        if custom_indent == -1:
+            indent = self.__prefix
+        elif custom_indent == self.__indent + 1:
+            indent = self.__inner_prefix
+        else:
+            indent = self.default_indent * custom_indent
+        self.__chunks.append(start + indent + line + end)
+
+    def add_inner(self, line: str, end: str = "") -> None:
+        """Appends the given line indented by one more level than this cache.
+
+        This is the same as ``add(line, end=end, custom_indent=indent + 1)``.
+
+        :param line: the line to add
+        :type line: str
+        :param end: additional suffix, defaults to ""
+        :type end: str, optional
+        """
+        self.__chunks.append(self.__inner_prefix + line + end)
 
     def add_to_cache(self, cache: "_ContainsCodeCache") -> None:
         """Appends the given code cache to the end of this cache.
 
+        The code of the cache is inserted at this position when this
+        cache is applied.
+
         :param cache: the cache to append
         :type cache: _CodeCache
         """
         if cache:
-            self.__cache.append(cache)
+            self.__pending.append(len(self.__chunks))
+            self.__chunks.append(cache)
 
     def add_comment(self, comment: str) -> None:
         """Adds the given comment to the last line
@@ -115,12 +179,19 @@ class _CodeCache:
         :param comment: the comment to add
         :type comment: str
         """
-        line = self.__code[-1]
+        # The comment belongs to the last line, not to a nested cache
+        index = len(self.__chunks) - 1
+        while index >= 0 and not isinstance(self.__chunks[index], str):
+            index -= 1
+        if index < 0:
+            raise IndexError("No line to add the comment to")
+
+        line = self.__chunks[index]
         new_line = line[:-1] if line[-1] == "\n" else str(line)
         new_line += f" # {comment}"
         if line[-1] == "\n":
             new_line += "\n"
-        self.__code[-1] = new_line
+        self.__chunks[index] = new_line
 
     def pop_comments(self) -> list:
         """Clears the comment cache and returns all elements.
@@ -135,22 +206,26 @@ class _CodeCache:
     def apply_code_cache(self, clear_caches=False) -> None:
         """Applies stored caches to this one.
 
-        The stored caches will be cleared and removed afterwards.
+        The code of each stored cache replaces its position in this cache
+        and the stored caches will be cleared afterwards.
 
         :param clear_caches: whether sub-caches should be applied, defaults to False
         :type clear_caches: bool, optional
         """
-        for element in self.__cache:
+        chunks = self.__chunks
+        for index in self.__pending:
+            element = chunks[index]
             cache = element.get_cache()
             end = (
                 "\n"
-                if isinstance(element, (_SmaliFieldWriter, _SmaliMethodWriter))
+                if isinstance(
+                    element, (_SmaliFieldWriter, _SmaliMethodWriter)
+                )
                 else ""
             )
-            if cache:
-                self.add(cache.get_code(clear_cache=clear_caches), end=end)
-                cache.clear()
-        self.__cache.clear()
+            chunks[index] = self.__prefix + cache.get_code(clear_cache=clear_caches) + end
+            cache.clear()
+        self.__pending.clear()
 
     def get_code(self, clear_cache=False) -> str:
         """Returns the Smali-Code
@@ -162,13 +237,27 @@ class _CodeCache:
         """
         if clear_cache:
             self.apply_code_cache(True)
-        return "\n".join(self.__code)
+
+        if self.__pending:
+            return "\n".join([chunk for chunk in self.__chunks if isinstance(chunk, str)])
+        return "\n".join(self.__chunks)
 
     def clear(self) -> None:
         """Clears this cache."""
-        self.__cache.clear()
+        self.__pending.clear()
         self.__comment_cache.clear()
-        self.__code.clear()
+        self.__chunks.clear()
+
+    def pop_lines(self) -> list:
+        """Applies all stored caches and removes the resulting lines.
+
+        :return: the removed lines
+        :rtype: list
+        """
+        self.apply_code_cache(True)
+        lines = self.__chunks.copy()
+        self.clear()
+        return lines
 
     def peek(self) -> _ContainsCodeCache | None:
         """Returns the last element of this cache
@@ -176,8 +265,44 @@ class _CodeCache:
         :return: the last element that contains itself a ``_CodeCache``
         :rtype: _ContainsCodeCache
         """
-        if len(self.__cache) > 0:
-            return self.__cache[-1]
+        if len(self.__pending) > 0:
+            return self.__chunks[self.__pending[-1]]
+
+
+class _CodeSink:
+    """Writes lines of code to a text or binary file-like object.
+
+    The written text is equal to joining all lines with ``"\n"``, as done
+    by :meth:`_CodeCache.get_code`.
+
+    :param sink: the object to write to
+    :type sink: io.IOBase
+    :param encoding: the encoding used for binary sinks
+    :type encoding: str
+    """
+
+    def __init__(self, sink, encoding: str) -> None:
+        self.sink = sink
+        self.encoding = encoding
+        self.binary = isinstance(sink, io.IOBase) and not isinstance(
+            sink, io.TextIOBase
+        )
+        self.started = False
+
+    def write(self, lines: list) -> None:
+        """Writes the given lines (without a trailing line break).
+
+        :param lines: the lines to write
+        :type lines: list
+        """
+        if not lines:
+            return
+
+        text = "\n".join(lines)
+        if self.started:
+            text = "\n" + text
+        self.started = True
+        self.sink.write(text.encode(self.encoding) if self.binary else text)
 
 
 ##########################################################################################
@@ -275,6 +400,9 @@ class _SmaliFieldWriter(FieldVisitor, _ContainsCodeCache):
 
     def visit_annotation(self, access_flags: int, signature: str) -> AnnotationVisitor:
         delegate = super().visit_annotation(access_flags, signature)
+        if delegate is None and self.verbatim:
+            return None
+
         desc = f".{Token.ANNOTATION} {' '.join(AccessType.get_names(access_flags))} {signature}"
         if isinstance(delegate, _SmaliAnnotationWriter):
             a_visitor = delegate
@@ -306,6 +434,12 @@ class _SmaliFieldWriter(FieldVisitor, _ContainsCodeCache):
 ##########################################################################################
 # METHOD IMPLEMENTATION
 ##########################################################################################
+# Prefixes of frequent debug directives, formatting a Token is comparatively slow
+_LINE = f".{Token.LINE} "
+_PARAM = f".{Token.PARAM} "
+_LOCAL = f".{Token.LOCAL} "
+
+
 class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
     cache: _CodeCache
 
@@ -315,6 +449,9 @@ class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
 
     def visit_annotation(self, access_flags: int, signature: str) -> AnnotationVisitor:
         delegate = super().visit_annotation(access_flags, signature)
+        if delegate is None and self.verbatim:
+            return None
+
         desc = f".{Token.ANNOTATION} {' '.join(AccessType.get_names(access_flags))} {signature}"
         if isinstance(delegate, _SmaliAnnotationWriter):
             a_visitor = delegate
@@ -327,120 +464,83 @@ class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
         return a_visitor
 
     def visit_block(self, name: str) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_block(name)
-        self.cache.add(f":{name}", custom_indent=self.cache.indent + 1)
+        self.cache.add_inner(f":{name}")
 
     def visit_line(self, number: int) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_line(number)
-        self.cache.add(f".{Token.LINE} {number}", custom_indent=self.cache.indent + 1)
+        self.cache.add_inner(_LINE + str(number))
 
     def visit_goto(self, block_name: str) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_goto(block_name)
-        self.cache.add(
-            f"{opcode.GOTO} :{block_name}", custom_indent=self.cache.indent + 1
-        )
+        self.cache.add_inner(f"{opcode.GOTO} :{block_name}")
 
     def visit_instruction(self, ins_name: str, args: list) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_instruction(ins_name, args)
-        self.cache.add(
-            f"{ins_name} {', '.join(args)}",
-            custom_indent=self.cache.indent + 1,
-            end="\n",
-        )
+        self.cache.add_inner(f"{ins_name} {', '.join(args)}", end="\n")
 
     def visit_param(self, register: str, name: str) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_param(register, name)
-        self.cache.add(
-            f'.{Token.PARAM} {register} "{name}"', custom_indent=self.cache.indent + 1
-        )
+        self.cache.add_inner(f'{_PARAM}{register} "{name}"')
 
     def visit_comment(self, text: str) -> None:
         super().visit_comment(text)
-        self.cache.add(f"# {text}", custom_indent=self.cache.indent + 1)
+        self.cache.add_inner(f"# {text}")
 
     def visit_restart(self, register: str) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_restart(register)
-        self.cache.add(
-            f".{Token.RESTART} {register}", custom_indent=self.cache.indent + 1
-        )
+        self.cache.add_inner(f".{Token.RESTART} {register}")
 
     def visit_locals(self, local_count: int) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_locals(local_count)
-        self.cache.add(
-            f".{Token.LOCALS} {local_count}", custom_indent=self.cache.indent + 1
-        )
+        self.cache.add_inner(f".{Token.LOCALS} {local_count}")
 
     def visit_local(
         self, register: str, name: str, descriptor: str, full_descriptor: str
     ) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_local(register, name, descriptor, full_descriptor)
-        self.cache.add(
-            f'.{Token.LOCAL} {register}, "{name}":{descriptor}, "{full_descriptor}"',
-            custom_indent=self.cache.indent + 1,
+        self.cache.add_inner(
+            f'{_LOCAL}{register}, "{name}":{descriptor}, "{full_descriptor}"'
         )
 
     def visit_prologue(self) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_prologue()
-        self.cache.add(f".{Token.PROLOGUE}", custom_indent=self.cache.indent + 1)
+        self.cache.add_inner(f".{Token.PROLOGUE}")
 
     def visit_catch(self, exc_name: str, blocks: tuple) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_catch(exc_name, blocks)
         start, end, catch = blocks
-        self.cache.add(
-            ".%s %s { :%s .. :%s } :%s" % (Token.CATCH, exc_name, start, end, catch),
-            custom_indent=self.cache.indent + 1,
+        self.cache.add_inner(
+            ".%s %s { :%s .. :%s } :%s" % (Token.CATCH, exc_name, start, end, catch)
         )
 
     def visit_catchall(self, exc_name: str, blocks: tuple) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_catchall(exc_name, blocks)
         start, end, catch = blocks
-        self.cache.add(
+        self.cache.add_inner(
             ".%s { :%s .. :%s } :%s" % (Token.CATCHALL, start, end, catch),
-            custom_indent=self.cache.indent + 1,
             end="\n",
         )
 
     def visit_registers(self, registers: int) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_registers(registers)
-        self.cache.add(
-            f".{Token.REGISTERS} {registers}",
-            custom_indent=self.cache.indent + 1,
-            end="\n",
-        )
+        self.cache.add_inner(f".{Token.REGISTERS} {registers}", end="\n")
 
     def visit_return(self, ret_type: str, args: list) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_return(ret_type, args)
         if ret_type:
             ret_type = f"-{ret_type}"
 
-        self.cache.add(
-            f"return{ret_type} {' '.join(args)}", custom_indent=self.cache.indent + 1
-        )
+        self.cache.add_inner(f"return{ret_type} {' '.join(args)}")
 
     def visit_invoke(self, inv_type: str, args: list, owner: str, method: str) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_invoke(inv_type, args, owner, method)
-        self.cache.add(
+        self.cache.add_inner(
             "invoke-%s { %s }, %s->%s" % (inv_type, ", ".join(args), owner, method),
-            custom_indent=self.cache.indent + 1,
             end="\n",
         )
 
     def visit_array_data(self, length: str, value_list: List[int]) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_array_data(length, value_list)
         indent_value = self.cache.default_indent * (self.cache.indent + 2)
         sep_value = "\n" + indent_value
@@ -451,7 +551,6 @@ class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
         )
 
     def visit_packed_switch(self, value: str, blocks: list) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_packed_switch(value, blocks)
         indent_value = self.cache.default_indent * (self.cache.indent + 2)
         sep_value = "\n" + indent_value + ":"
@@ -461,7 +560,6 @@ class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
         )
 
     def visit_sparse_switch(self, branches: dict) -> None:
-        self.cache.apply_code_cache(True)
         super().visit_sparse_switch(branches)
         indent_value = self.cache.default_indent * (self.cache.indent + 2)
         values = [f"{x} -> :{y}" for x, y in branches.items()]
@@ -487,7 +585,36 @@ class _SmaliMethodWriter(MethodVisitor, _ContainsCodeCache):
 # CLASS IMPLEMENTATION
 ##########################################################################################
 class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
-    """Public standard implementation of a Smali Source-Code writer."""
+    """Public standard implementation of a Smali Source-Code writer.
+
+    By default, the whole class is kept in memory until :attr:`code` is
+    requested. With a *sink*, the writer streams the code instead: the
+    class header and each finished member are written as soon as the next
+    member (or class comment) starts, so only one member is buffered at a
+    time.
+
+    >>> with open("Large.smali", "wb") as fp:
+    ...     reader.visit(source, SmaliWriter(reader, sink=fp))
+
+    The written text is the same as :attr:`code` would return. Inner
+    classes created by a streaming writer stream to the same sink.
+
+    :param reader: the reader whose copied lines should be written, defaults to None
+    :type reader: SmaliReader, optional
+    :param indent: the indentation level, defaults to 0
+    :type indent: int, optional
+    :param delegate: the visitor to forward all events to, defaults to None
+    :type delegate: ClassVisitor, optional
+    :param sink: a text or binary file-like object to stream the code to,
+                 defaults to None
+    :type sink: io.IOBase, optional
+    :param encoding: the encoding used for binary sinks, defaults to ``"utf-8"``
+    :type encoding: str, optional
+    :param verbatim: whether members the delegate doesn't visit should be copied
+                     from the source unchanged, defaults to False
+    :type verbatim: bool, optional
+    :raises ValueError: if *verbatim* is enabled without a reader
+    """
 
     cache: _CodeCache
     """The code cache to use."""
@@ -497,12 +624,22 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
         reader: Optional[SmaliReader] = None,
         indent=0,
         delegate: Optional[ClassVisitor] = None,
+        sink: Optional[io.IOBase] = None,
+        encoding: str = "utf-8",
+        verbatim: bool = False,
     ) -> None:
         super().__init__(delegate)
+        if verbatim and not reader:
+            raise ValueError("Verbatim copies require a reader")
+
         self.cache = _CodeCache(indent)
+        self.verbatim = verbatim
         if reader:
             reader.copy_handler = self
         self._reader = reader
+        self._sink = _CodeSink(sink, encoding) if sink is not None else None
+        self._inner = None
+        self._copied_line = False
 
     def __str__(self) -> str:
         return self.code
@@ -511,6 +648,9 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
     def code(self) -> str:
         """Returns the source code as an utf-8 string
 
+        If this writer streams to a sink, only code that has not been
+        written yet is returned.
+
         :return: the complete source code
         :rtype: str
         """
@@ -520,9 +660,25 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
         """Resets the writer.
 
         Use this method before calling #visit() to ensure the internal
-        buffer is cleared.
+        buffer is cleared. A streaming writer starts a new document in
+        its sink afterwards.
         """
         self.cache.clear()
+        if self._sink:
+            self._sink.started = False
+
+    def flush(self) -> None:
+        """Writes all buffered code to the sink.
+
+        Members that are still being visited must not be flushed, as their
+        remaining code would be lost. This writer calls this method before
+        each member and at the end of the class, so manual calls are only
+        needed if the code should be written earlier. Does nothing if the
+        writer has no sink.
+        """
+        if self._sink:
+            self._sink.write(self.cache.pop_lines())
+            self._inner = None
 
     def get_cache(self) -> "_CodeCache":
         return self.cache
@@ -530,37 +686,53 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
     ######################################################################################
     # INTERNAL
     ######################################################################################
+    def _copied(self) -> bool:
+        # Verbatim readers copy header lines (including their end-of-line
+        # comments) before visiting them.
+        self._copied_line = self.verbatim
+        return self.verbatim
+
     def visit_class(self, name: str, access_flags: int) -> None:
         super().visit_class(name, access_flags)
-        flags = " ".join(AccessType.get_names(access_flags))
-        self.cache.add(f".{Token.CLASS} {flags} {name}")
+        if not self._copied():
+            flags = " ".join(AccessType.get_names(access_flags))
+            self.cache.add(f".{Token.CLASS} {flags} {name}")
 
     def visit_super(self, super_class: str) -> None:
         super().visit_super(super_class)
-        self.cache.add(f".{Token.SUPER} {super_class}\n")
+        if not self._copied():
+            self.cache.add(f".{Token.SUPER} {super_class}\n")
 
     def visit_implements(self, interface: str) -> None:
         super().visit_implements(interface)
-        self.cache.add(f".{Token.IMPLEMENTS} {interface}")
+        if not self._copied():
+            self.cache.add(f".{Token.IMPLEMENTS} {interface}")
 
     def visit_source(self, source: str) -> None:
         super().visit_source(source)
-        self.cache.add(f'.{Token.SOURCE} "{source}"\n')
+        if not self._copied():
+            self.cache.add(f'.{Token.SOURCE} "{source}"\n')
 
     def visit_field(
         self, name: str, access_flags: int, field_type: str, value=None
     ) -> Optional[FieldVisitor]:
+        self.flush()
+        self._copied_line = False
+        delegate = super().visit_field(name, access_flags, field_type, value)
+        if delegate is None and self.verbatim:
+            return None
+
         flags = " ".join(AccessType.get_names(access_flags))
         desc = f".{Token.FIELD} {flags} {name}:{field_type}"
         if value:
             # String values come with their '"' characters
             desc = f"{desc} = {value}"
 
-        delegate = super().visit_field(name, access_flags, field_type, value)
         if isinstance(delegate, _SmaliFieldWriter):
             f_visitor = delegate
         else:
             f_visitor = _SmaliFieldWriter(delegate, self.cache.indent)
+            f_visitor.verbatim = self.verbatim
         f_visitor.cache.add(desc)
         self.cache.add_to_cache(f_visitor)
         return f_visitor
@@ -568,7 +740,12 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
     def visit_annotation(
         self, access_flags: int, signature: str
     ) -> Optional[AnnotationVisitor]:
+        self.flush()
+        self._copied_line = False
         delegate = super().visit_annotation(access_flags, signature)
+        if delegate is None and self.verbatim:
+            return None
+
         flags = " ".join(AccessType.get_names(access_flags))
         desc = f".{Token.ANNOTATION} {flags} {signature}"
         if isinstance(delegate, _SmaliAnnotationWriter):
@@ -582,22 +759,41 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
         return a_visitor
 
     def visit_inner_class(self, name: str, access_flags: int) -> Optional[ClassVisitor]:
+        self.flush()
         delegate = super().visit_inner_class(name, access_flags)
         flags = " ".join(AccessType.get_names(access_flags))
-        desc = f".{Token.CLASS} {flags} {name}"
+        # The reader copies the definition into the inner class
+        desc = None if self._copied() else f".{Token.CLASS} {flags} {name}"
 
         if isinstance(delegate, _SmaliClassWriter):
             c_visitor = delegate
         else:
             c_visitor = _SmaliClassWriter(self._reader, delegate=delegate)
-        c_visitor.cache.add(desc)
+            c_visitor.verbatim = self.verbatim
+
+        # The reader publishes the definition's comment to the inner class
+        c_visitor._copied_line = desc is None
+        if desc:
+            c_visitor.cache.add(desc)
+        if self._sink and c_visitor is not delegate:
+            # The reader never ends the outer class of a nested definition,
+            # so the inner class writes its code on its own.
+            c_visitor._sink = self._sink
+            self._inner = c_visitor
+            return c_visitor
+
         self.cache.add_to_cache(c_visitor)
         return c_visitor
 
     def visit_method(
         self, name: str, access_flags: int, parameters: list, return_type: str
     ) -> Optional[MethodVisitor]:
+        self.flush()
+        self._copied_line = False
         delegate = super().visit_method(name, access_flags, parameters, return_type)
+        if delegate is None and self.verbatim:
+            return None
+
         flags = " ".join(AccessType.get_names(access_flags))
         params = "".join(parameters)
         desc = f".{Token.METHOD} {flags} {name}({params}){return_type}"
@@ -606,6 +802,7 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
             m_visitor.cache.indent = self.cache.indent
         else:
             m_visitor = _SmaliMethodWriter(delegate, self.cache.indent)
+            m_visitor.verbatim = self.verbatim
 
         m_visitor.cache.add(desc)
         self.cache.add_to_cache(m_visitor)
@@ -613,27 +810,33 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
 
     def visit_comment(self, text: str) -> None:
         self.cache.apply_code_cache(True)
+        self.flush()
         super().visit_comment(text)
-        self.cache.add(f"# {text}")
+        if not self._copied():
+            self.cache.add(f"# {text}")
 
     def visit_eol_comment(self, text: str) -> None:
         super().visit_eol_comment(text)
-        self.cache.add_comment(text)
+        if not self._copied_line:
+            self.cache.add_comment(text)
 
     def visit_debug(self, enabled: int) -> None:
         super().visit_debug(enabled)
-        self.cache.add(f".{Token.DEBUG} {enabled}")
+        if not self._copied():
+            self.cache.add(f".{Token.DEBUG} {enabled}")
 
     def visit_end(self) -> None:
         self.cache.apply_code_cache(True)
         super().visit_end()
+        self.flush()
 
     def copy(self, line: str, context: type = ClassVisitor) -> None:
         if context == ClassVisitor:
             self.cache.add(line)
 
         else:
-            last_writer = self.cache.peek()
+            # Streamed inner classes are not stored in the cache
+            last_writer = self.cache.peek() or self._inner
             if not last_writer:
                 self.cache.add(line)
 
@@ -646,6 +849,14 @@ class _SmaliClassWriter(ClassVisitor, _ContainsCodeCache):
             else:
                 print("Line excluded:", line, "<context> =", context)
 
+    def copy_block(self, lines: list, context: type = ClassVisitor) -> None:
+        # The reader never returns to the outer class of a nested definition
+        last_writer = self.cache.peek() or self._inner
+        if isinstance(last_writer, _SmaliClassWriter):
+            last_writer.copy_block(lines, context)
+        else:
+            super().copy_block(lines, context)
+
 
 ##########################################################################################
 # EXPORTS
@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from smali import SmaliReader
+from smali.cache import ParseCache
+from smali.events import record_events, replay_events
+from smali.visitor import ClassVisitor
+
+from test_events import logging_visitor
+from test_writer import SOURCE
+
+
+def parse_log(cache: ParseCache, source) -> tuple:
+    log = []
+    hit = cache.visit(source, logging_visitor(ClassVisitor, log, ""))
+    return hit, log
+
+
+def test_hits_and_misses(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    first = parse_log(cache, SOURCE)
+    second = parse_log(cache, SOURCE.encode("utf-8"))
+
+    assert (first[0], second[0]) == (False, True)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second[1] == first[1]
+
+    expected = []
+    replay_events(record_events(SOURCE), logging_visitor(ClassVisitor, expected, ""))
+    assert first[1] == expected
+
+    # Entries are shared between instances
+    assert ParseCache(str(tmp_path)).visit(SOURCE, ClassVisitor())
+
+
+def test_path_source(tmp_path):
+    path = tmp_path / "Sample.smali"
+    path.write_text(SOURCE, encoding="utf-8")
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert not cache.visit(path, ClassVisitor())
+    assert cache.visit(path, ClassVisitor())
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"lazy_methods": True},
+        {"encoding": "latin-1"},
+        {"comments": True},
+        {"errors": "recover"},
+        {"validate": False},
+    ],
+)
+def test_key_depends_on_reader_options(tmp_path, options):
+    default = ParseCache(str(tmp_path))
+    changed = ParseCache(str(tmp_path), reader=SmaliReader(**options))
+    assert default.key(SOURCE) == ParseCache(str(tmp_path)).key(SOURCE)
+    assert changed.key(SOURCE) != default.key(SOURCE)
+
+
+def test_corrupted_entry_is_parsed_again(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.visit(SOURCE, ClassVisitor())
+    path = cache._path(cache.key(SOURCE))
+    with open(path, "wb") as fp:
+        fp.write(b"not an entry")
+
+    hit, log = parse_log(cache, SOURCE)
+    assert not hit and log
+    # The entry has been replaced
+    assert cache.visit(SOURCE, ClassVisitor())
+
+
+def test_evict_honours_max_size(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    records = record_events(SOURCE)
+    keys = [cache.key(SOURCE + "\n" * i) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.store(key, records)
+        # Oldest entries are used least recently
+        os.utime(cache._path(key), (1000 + i, 1000 + i))
+
+    entry_size = cache.size() // len(keys)
+    cache.max_size = entry_size * 2
+    cache.evict()
+
+    assert cache.size() <= cache.max_size
+    assert [cache.load(key) is not None for key in keys] == [False, False, False, True]
+
+
+def test_store_evicts_above_max_size(tmp_path):
+    records = record_events(SOURCE)
+    cache = ParseCache(str(tmp_path))
+    cache.store(cache.key(SOURCE), records)
+    cache = ParseCache(str(tmp_path), max_size=cache.size() * 2)
+    for i in range(5):
+        cache.store(cache.key(SOURCE + "\n" * (i + 1)), records)
+        assert cache.size() <= cache.max_size
+
+    cache.clear()
+    assert cache.size() == 0
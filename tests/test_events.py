@@ -0,0 +1,91 @@
+import pytest
+
+from smali import SmaliReader
+from smali.events import Event, iter_events, record_events, replay_events
+from smali.visitor import (
+    AnnotationVisitor,
+    ClassVisitor,
+    FieldVisitor,
+    MethodVisitor,
+)
+
+from test_writer import SOURCE
+
+
+def logging_visitor(base: type, log: list, path: str):
+    """Creates a visitor that logs every event together with its scope."""
+
+    class Logger(base):
+        def visit_end(self) -> None:
+            log.append((path, "end", ()))
+
+    def event(name: str):
+        def visit(self, *args):
+            log.append((path, name, args))
+            child = CHILDREN.get(name)
+            if child is not None:
+                return logging_visitor(child, log, f"{path}/{name}:{len(log)}")
+
+        return visit
+
+    for name in dir(base):
+        if name.startswith("visit_") and name != "visit_end":
+            setattr(Logger, name, event(name))
+    return Logger()
+
+
+CHILDREN = {
+    "visit_annotation": AnnotationVisitor,
+    "visit_subannotation": AnnotationVisitor,
+    "visit_field": FieldVisitor,
+    "visit_method": MethodVisitor,
+    "visit_inner_class": ClassVisitor,
+}
+
+
+@pytest.fixture
+def reader():
+    return SmaliReader(comments=True)
+
+
+def test_replay_equals_parse(reader):
+    parsed, replayed = [], []
+    reader.visit(SOURCE, logging_visitor(ClassVisitor, parsed, ""))
+    records = record_events(SOURCE, reader)
+    replay_events(records, logging_visitor(ClassVisitor, replayed, ""))
+
+    assert replayed == parsed
+    names = {name for _, name, _ in parsed}
+    assert {"visit_field", "visit_annotation", "visit_inner_class"} <= names
+    assert {"visit_comment", "visit_eol_comment"} <= names
+
+
+def test_replay_into_declining_visitor(reader):
+    class FieldsOnly(ClassVisitor):
+        def __init__(self) -> None:
+            super().__init__()
+            self.fields = []
+
+        def visit_field(self, name, access_flags, field_type, value=None):
+            self.fields.append(name)
+
+    visitor = FieldsOnly()
+    replay_events(record_events(SOURCE, reader), visitor)
+    assert visitor.fields == ["counter", "name"]
+
+
+def test_iter_events_equals_recording(reader):
+    events = list(iter_events(SOURCE, reader))
+    assert all(isinstance(event, Event) for event in events)
+    records = record_events(SOURCE, reader)
+    assert events == [Event(kind, args) for _, kind, args in records]
+    assert events[0].kind == "class"
+    assert events[0].args[0] == "Lcom/example/Sample;"
+    assert events[-1] == Event("end", ("class",))
+
+
+def test_iter_events_is_lazy(reader):
+    events = iter_events(SOURCE + "\n.bogus", reader)
+    assert next(events).kind == "class"
+    with pytest.raises(SyntaxError):
+        list(events)
@@ -0,0 +1,67 @@
+import pytest
+
+from smali import SmaliReader
+from smali.events import record_events
+from smali.incremental import ParsedSource
+from smali.visitor import ClassVisitor
+
+from test_reader import DiagnosticCollector
+from test_writer import SOURCE as NESTED_SOURCE
+
+SOURCE = """\
+.class public Lcom/example/A;
+.super Ljava/lang/Object;
+
+.field private count:I
+
+.method public get()I
+    .registers 2
+    iget v0, p0, Lcom/example/A;->count:I
+    return v0
+.end method
+
+.method public reset()V
+    .registers 2
+    const/4 v0, 0x0
+    iput v0, p0, Lcom/example/A;->count:I
+    return-void
+.end method
+"""
+
+
+@pytest.mark.parametrize("source", [SOURCE, NESTED_SOURCE])
+def test_records_equal_recording(source):
+    parsed = ParsedSource(source)
+    assert parsed.records() == record_events(source)
+    parsed.replay(ClassVisitor())
+
+
+def test_records_after_member_edit():
+    edited = SOURCE.replace("const/4 v0, 0x0", "const/4 v0, 0x1")
+    parsed = ParsedSource(SOURCE)
+    changes = parsed.update(edited)
+
+    assert [change.new.key for change in changes] == [".method reset()V"]
+    assert parsed.records() == record_events(edited)
+
+
+def comparable(records: list) -> list:
+    # Exceptions don't compare equal, so only the diagnostic's text is used
+    return [
+        (depth, kind, args[0][:3] if kind == "diagnostic" else args)
+        for depth, kind, args in records
+    ]
+
+
+def test_records_with_diagnostic_in_inner_class():
+    source = NESTED_SOURCE.replace(
+        ".super Ljava/lang/Object;\n\n.method public value()I",
+        ".super Ljava/lang/Object;\n.unknown x\n\n.method public value()I",
+    )
+    reader = SmaliReader(errors="recover")
+    parsed = ParsedSource(source, reader)
+    assert comparable(parsed.records()) == comparable(record_events(source, reader))
+
+    visitor = DiagnosticCollector()
+    parsed.replay(visitor)
+    assert len(visitor.diagnostics) == 1
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from smali import SmaliReader, SmaliWriter
+from smali.ir import MethodIRBuilder, OperandPool
+from smali.visitor import ClassVisitor
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), os.pardir, "example.smali")
+
+
+class IRLoader(ClassVisitor):
+    def __init__(self, pool: OperandPool) -> None:
+        super().__init__()
+        self.pool = pool
+        self.builders = []
+
+    def visit_method(self, name, access_flags, parameters, return_type):
+        builder = MethodIRBuilder(self.pool)
+        self.builders.append(builder)
+        return builder
+
+    def visit_inner_class(self, name, access_flags):
+        return self
+
+
+class IRWriter(SmaliWriter):
+    def __init__(self, builders: list) -> None:
+        super().__init__()
+        self.builders = iter(builders)
+
+    def visit_method(self, name, access_flags, parameters, return_type):
+        m_writer = super().visit_method(name, access_flags, parameters, return_type)
+        next(self.builders).ir.visit(m_writer)
+        # The body has been written already
+        return None
+
+
+@pytest.mark.parametrize("comments", [False, True])
+def test_round_trip(comments):
+    with open(EXAMPLE, "r", encoding="utf-8") as fp:
+        source = fp.read()
+
+    reader = SmaliReader(comments=comments)
+    loader = IRLoader(OperandPool())
+    reader.visit(source, loader)
+    assert loader.builders
+
+    expected = SmaliWriter()
+    reader.visit(source, expected)
+    writer = IRWriter(loader.builders)
+    reader.visit(source, writer)
+    assert writer.code == expected.code
+
+
+def test_operand_pool_types():
+    pool = OperandPool()
+    indices = [pool.add(value) for value in (1, 1.0, True, "1")]
+    assert len(set(indices)) == 4
+    assert [pool.add(value) for value in (1, 1.0, True, "1")] == indices
+    assert [pool[index] for index in indices] == [1, 1.0, True, "1"]
+    assert type(pool[indices[2]]) is bool
+
+
+def test_operand_pool_unhashable_values():
+    pool = OperandPool()
+    assert pool.add([1]) != pool.add([1])
+    assert len(pool) == 2
+
+
+def test_operand_pool_is_shared():
+    pool = OperandPool()
+    source = """\
+.class public Lcom/example/A;
+.super Ljava/lang/Object;
+
+.method public a()V
+    .registers 1
+    const/4 v0, 0x1
+    return-void
+.end method
+
+.method public b()V
+    .registers 1
+    const/4 v0, 0x1
+    return-void
+.end method
+"""
+    loader = IRLoader(pool)
+    SmaliReader().visit(source, loader)
+    first, second = (builder.ir for builder in loader.builders)
+    assert first.operands == second.operands
+    assert len(pool) == len(set(first.operands))
@@ -0,0 +1,79 @@
+import json
+import os
+
+from smali.parallel import rewrite_files
+from smali.visitor import ClassVisitor
+
+from test_reader import HEADER
+from test_writer import SOURCE
+
+
+def no_transform(path: str) -> ClassVisitor:
+    return None
+
+
+def rewrite(root, dest, manifest) -> dict:
+    results = rewrite_files(
+        str(root),
+        str(dest),
+        no_transform,
+        verbatim=True,
+        manifest=str(manifest),
+        executor="thread",
+        comments=True,
+    )
+    return {os.path.relpath(path, root): result for path, result in results.items()}
+
+
+def test_rewrite_files(tmp_path):
+    root, dest = tmp_path / "src", tmp_path / "out"
+    manifest = tmp_path / "manifest.json"
+    (root / "com" / "example").mkdir(parents=True)
+    (root / "com" / "example" / "Sample.smali").write_text(SOURCE)
+    (root / "A.smali").write_text(HEADER)
+
+    # Existing output files are replaced, not overwritten in place
+    (dest / "com" / "example").mkdir(parents=True)
+    target = dest / "com" / "example" / "Sample.smali"
+    target.write_text("old")
+    os.link(target, tmp_path / "old.smali")
+
+    results = rewrite(root, dest, manifest)
+    assert {name: r.status for name, r in results.items()} == {
+        "A.smali": "written",
+        os.path.join("com", "example", "Sample.smali"): "written",
+    }
+    assert target.read_text() == SOURCE
+    assert (tmp_path / "old.smali").read_text() == "old"
+    assert not list(dest.rglob("*.tmp"))
+
+    # Unchanged sources are skipped via the manifest
+    results = rewrite(root, dest, manifest)
+    assert {r.status for r in results.values()} == {"skipped"}
+    assert all(r.error is None for r in results.values())
+
+    # Without a manifest, equal output files are left untouched
+    manifest.unlink()
+    results = rewrite(root, dest, manifest)
+    assert {r.status for r in results.values()} == {"unchanged"}
+
+
+def test_rewrite_files_reports_errors(tmp_path):
+    root, dest = tmp_path / "src", tmp_path / "out"
+    manifest = tmp_path / "manifest.json"
+    root.mkdir()
+    (root / "A.smali").write_text(HEADER)
+    (root / "Broken.smali").write_text(HEADER + ".unknown x\n")
+
+    results = rewrite(root, dest, manifest)
+    broken = results["Broken.smali"]
+    assert isinstance(broken.error, SyntaxError)
+    assert broken.status is None
+    assert not (dest / "Broken.smali").exists()
+    assert results["A.smali"].status == "written"
+
+    # Failed files are not stored, so they are parsed again
+    assert list(json.loads(manifest.read_text())) == ["A.smali"]
+    results = rewrite(root, dest, manifest)
+    assert results["A.smali"].status == "skipped"
+    assert isinstance(results["Broken.smali"].error, SyntaxError)
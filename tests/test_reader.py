@@ -0,0 +1,149 @@
+import pytest
+
+from smali import SmaliReader
+from smali.profile import ReaderProfile
+from smali.visitor import ClassVisitor, MethodVisitor
+
+HEADER = """\
+.class public Lcom/example/A;
+.super Ljava/lang/Object;
+"""
+
+
+def visit(source: str, **options) -> None:
+    SmaliReader(**options).visit(source, ClassVisitor())
+
+
+METHODS = HEADER + """
+.method public run()V
+    .registers 2
+    .line 3
+    const/4 v0, 0x1
+    invoke-static {v0}, Lcom/example/A;->log(I)V
+    return-void
+.end method
+"""
+
+
+def test_unknown_directive():
+    with pytest.raises(SyntaxError):
+        visit(HEADER + ".unknown x\n")
+
+
+@pytest.mark.parametrize(
+    "name", ["statement", "recovering", "token", "block", "value", "instruction"]
+)
+def test_internal_handler_is_no_directive(name):
+    with pytest.raises(SyntaxError):
+        visit(HEADER + f".{name} x\n")
+
+
+class CustomReader(SmaliReader):
+    def _handle_custom_value(self) -> None:
+        self.values.append(self.line.last())
+
+
+def handle_extra(reader: SmaliReader) -> None:
+    reader.values.append(reader.line.last())
+
+
+CustomReader.register_directive("extra", handle_extra)
+
+
+def test_custom_directives():
+    reader = CustomReader()
+    reader.values = []
+    reader.visit(HEADER + ".custom-value 1\n.extra 2\n", ClassVisitor())
+    assert reader.values == ["1", "2"]
+
+
+def test_custom_directives_stay_in_subclass():
+    assert "extra" not in SmaliReader._directives
+    assert "custom-value" not in SmaliReader._directives
+    with pytest.raises(SyntaxError):
+        visit(HEADER + ".extra 2\n")
+
+
+class InstructionRecorder(MethodVisitor):
+    def __init__(self, instructions: list) -> None:
+        super().__init__()
+        self.instructions = instructions
+
+    def visit_instruction(self, ins_name, args) -> None:
+        self.instructions.append(ins_name)
+
+
+class InstructionCollector(ClassVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.instructions = []
+
+    def visit_method(self, name, access_flags, parameters, return_type):
+        return InstructionRecorder(self.instructions)
+
+
+class UpperCaseReader(SmaliReader):
+    def _read_instruction(self, instruction: str) -> None:
+        super()._read_instruction(instruction.upper())
+
+
+def test_instruction_dispatch():
+    collector = InstructionCollector()
+    SmaliReader().visit(METHODS.replace("const/4", "unknown-op"), collector)
+    # Unknown opcodes are passed to visit_instruction as well
+    assert collector.instructions == ["unknown-op"]
+
+
+def test_overridden_instruction_reader():
+    collector = InstructionCollector()
+    UpperCaseReader().visit(METHODS, collector)
+    assert collector.instructions == ["CONST/4"]
+
+
+class DiagnosticCollector(ClassVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.diagnostics = []
+
+    def visit_diagnostic(self, diagnostic) -> None:
+        self.diagnostics.append(diagnostic)
+
+
+def test_recovering_dispatcher_is_no_directive():
+    collector = DiagnosticCollector()
+    source = HEADER + ".recovering x\n\n.field public a:I\n"
+    SmaliReader(errors="recover").visit(source, collector)
+    assert [d.lineno for d in collector.diagnostics] == [3]
+
+
+class InvokeVisitor(MethodVisitor):
+    def visit_invoke(self, inv_type, args, owner, method) -> None:
+        pass
+
+
+class HandleCollector(ClassVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.handles = []
+
+    def visit_method_handle(self, handle) -> None:
+        self.handles.append(handle)
+
+
+class InvokeCollector(HandleCollector):
+    def visit_method(self, name, access_flags, parameters, return_type):
+        return InvokeVisitor()
+
+
+@pytest.mark.parametrize("lazy_methods", [False, True])
+def test_profiled_reader_skips_unused_lines(lazy_methods):
+    profile = ReaderProfile()
+    collector = HandleCollector() if lazy_methods else InvokeCollector()
+    reader = SmaliReader(lazy_methods=lazy_methods, profile=profile)
+    reader.visit(METHODS, collector)
+    for handle in collector.handles:
+        handle.visit(InvokeVisitor())
+
+    assert len(collector.handles) == int(lazy_methods)
+    assert dict(profile.instructions) == {"invoke-static": 1}
+    assert "_handle_line" not in profile.handlers
@@ -0,0 +1,28 @@
+import pytest
+
+from smali.bridge.errors import ExecutionError
+from smali.shell.model import ISmaliShell
+
+
+@pytest.fixture
+def visitor():
+    return ISmaliShell().visitor
+
+
+def test_branch_to_later_label_not_taken(visitor):
+    visitor.visit_instruction("const/4", ["v0", "0x1"])
+    visitor.visit_instruction("if-eqz", ["v0", ":cond_0"])
+    assert visitor.frame["v0"] == 1
+
+
+def test_branch_to_later_label_taken(visitor):
+    visitor.visit_instruction("const/4", ["v0", "0x0"])
+    with pytest.raises(ExecutionError):
+        visitor.visit_instruction("if-eqz", ["v0", ":cond_0"])
+
+
+def test_branch_to_defined_label(visitor):
+    visitor.visit_block("cond_0")
+    visitor.visit_instruction("const/4", ["v0", "0x0"])
+    visitor.visit_instruction("if-eqz", ["v0", ":cond_0"])
+    assert visitor.frame.pos == visitor.frame.labels["cond_0"]
@@ -0,0 +1,205 @@
+import pytest
+
+from smali.bridge import SmaliObject, SmaliVM
+from smali.bridge.errors import NoSuchClassError
+
+SOURCE = """\
+.class public Lcom/example/Calc;
+.super Ljava/lang/Object;
+
+.method public static square(I)I
+    .registers 2
+    mul-int v0, p0, p0
+    return v0
+.end method
+
+.method public static length([I)I
+    .registers 2
+    array-length v0, p0
+    return v0
+.end method
+
+.method public static name(Lcom/example/Missing;)V
+    .registers 1
+    return-void
+.end method
+"""
+
+
+@pytest.fixture
+def calc():
+    vm = SmaliVM()
+    return vm.classloader.load_class(SOURCE, init=False)
+
+
+def test_call_with_primitive_parameter(calc):
+    assert calc.method("square")(None, 7) == 49
+
+
+def test_call_with_array_parameter(calc):
+    assert calc.method("length")(None, [1, 2, 3]) == 3
+
+
+def test_call_with_wrong_primitive_type(calc):
+    with pytest.raises(TypeError):
+        calc.method("square")(None, "7")
+
+
+def test_call_with_undefined_class(calc):
+    with pytest.raises(NoSuchClassError):
+        calc.method("name")(None, object())
+
+
+PROGRAM = """\
+.class public Lcom/example/Program;
+.super Ljava/lang/Object;
+
+.field public static counter:I = 0x3
+
+.field public value:I
+
+.method public constructor <init>()V
+    .registers 2
+    invoke-direct {p0}, Ljava/lang/Object;-><init>()V
+    const/4 v0, 0x7
+    iput v0, p0, Lcom/example/Program;->value:I
+    return-void
+.end method
+
+.method public getValue()I
+    .registers 2
+    iget v0, p0, Lcom/example/Program;->value:I
+    return v0
+.end method
+
+.method public static increment()I
+    .registers 1
+    sget v0, Lcom/example/Program;->counter:I
+    add-int/lit8 v0, v0, 0x1
+    sput v0, Lcom/example/Program;->counter:I
+    return v0
+.end method
+
+.method public static sum(I)I
+    .registers 3
+    const/4 v0, 0x0
+    const/4 v1, 0x0
+
+    :goto_0
+    if-ge v1, p0, :cond_0
+    add-int v0, v0, v1
+    add-int/lit8 v1, v1, 0x1
+    goto :goto_0
+
+    :cond_0
+    return v0
+.end method
+
+.method public static literals(I)I
+    .registers 2
+    add-int/lit8 v0, p0, 0x3
+    mul-int/lit16 v0, v0, 0x100
+    return v0
+.end method
+
+.method public static packed(I)I
+    .registers 2
+    packed-switch p0, :pswitch_data_0
+    const/4 v0, -0x1
+    return v0
+
+    :pswitch_0
+    const/16 v0, 0xa
+    return v0
+
+    :pswitch_1
+    const/16 v0, 0x14
+    return v0
+
+    :pswitch_data_0
+    .packed-switch 0x1
+        :pswitch_0
+        :pswitch_1
+    .end packed-switch
+.end method
+
+.method public static sparse(I)I
+    .registers 2
+    sparse-switch p0, :sswitch_data_0
+    const/4 v0, 0x0
+    return v0
+
+    :sswitch_0
+    const/16 v0, 0x64
+    return v0
+
+    :sswitch_1
+    const/16 v0, 0xc8
+    goto :goto_0
+
+    :goto_0
+    return v0
+
+    :sswitch_data_0
+    .sparse-switch
+        0x1 -> :sswitch_0
+        -0x2 -> :sswitch_1
+    .end sparse-switch
+.end method
+
+.method public static element(I)I
+    .registers 3
+    fill-array-data v0, :array_0
+    aget v1, v0, p0
+    return v1
+
+    :array_0
+    .array-data 4
+        0x1
+        0x2
+        -0x3
+    .end array-data
+.end method
+"""
+
+
+@pytest.fixture
+def program():
+    vm = SmaliVM()
+    return vm.classloader.load_class(PROGRAM, init=False)
+
+
+@pytest.mark.parametrize("count, expected", [(0, 0), (1, 0), (5, 10)])
+def test_loop(program, count, expected):
+    assert program.method("sum")(None, count) == expected
+
+
+def test_literal_operations(program):
+    assert program.method("literals")(None, 1) == 0x400
+
+
+@pytest.mark.parametrize("value, expected", [(0, -1), (1, 10), (2, 20), (3, -1)])
+def test_packed_switch(program, value, expected):
+    assert program.method("packed")(None, value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [(1, 100), (-2, 200), (5, 0)])
+def test_sparse_switch(program, value, expected):
+    assert program.method("sparse")(None, value) == expected
+
+
+@pytest.mark.parametrize("index, expected", [(0, 1), (1, 2), (2, -3)])
+def test_array_data(program, index, expected):
+    assert program.method("element")(None, index) == expected
+
+
+def test_static_field(program):
+    increment = program.method("increment")
+    assert increment(None) == 4
+    assert increment(None) == 5
+
+
+def test_instance_field(program):
+    instance = SmaliObject(program)
+    instance.init()
+    assert program.method("getValue")(instance) == 7
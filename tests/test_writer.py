@@ -0,0 +1,107 @@
+import io
+
+import pytest
+
+from smali import SmaliReader, SmaliWriter
+from smali.profile import ReaderProfile
+
+SOURCE = """\
+.class public final Lcom/example/Sample;
+.super Ljava/lang/Object; # the super class
+.source "Sample.java"
+
+.implements Ljava/lang/Runnable;
+
+######################################################################
+# FIELDS
+######################################################################
+.field private static counter:I = 0x0
+# trailing comment of the field section
+
+.field public name:Ljava/lang/String;
+    .annotation runtime Lcom/example/Named;
+        value = "name"
+    .end annotation
+.end field
+
+# direct methods
+.method public constructor <init>()V
+    .registers 1
+
+    # call the super constructor
+    invoke-direct {p0}, Ljava/lang/Object;-><init>()V
+
+    return-void
+.end method
+
+.method public run()V
+    .locals 2  # two registers
+
+    const/4 v0, 0x1
+    sget v1, Lcom/example/Sample;->counter:I
+    add-int/2addr v1, v0
+    sput v1, Lcom/example/Sample;->counter:I
+
+    return-void
+.end method
+
+.class public Lcom/example/Sample$Inner; # nested
+.super Ljava/lang/Object;
+
+.method public value()I
+    .registers 2
+    const/16 v0, 0x2a
+    return v0
+.end method
+.end class"""
+
+
+def rewrite(source: str, verbatim: bool, profile=None) -> str:
+    reader = SmaliReader(comments=True, profile=profile)
+    writer = SmaliWriter(reader, verbatim=verbatim)
+    reader.visit(source, writer)
+    return writer.code
+
+
+VERBATIM_SOURCES = [
+    SOURCE,
+    SOURCE + "\n",
+    # Final blank line
+    SOURCE + "\n\n",
+    # Trailing whitespace in copied members and header lines
+    SOURCE.replace("return-void\n", "return-void  \n").replace(
+        '.source "Sample.java"\n', '.source "Sample.java" \n'
+    ),
+    SOURCE.replace("\n", "\r\n") + "\r\n",
+]
+
+
+@pytest.mark.parametrize("source", VERBATIM_SOURCES)
+def test_verbatim_rewrite_is_identical(source):
+    assert rewrite(source, verbatim=True) == source
+
+
+def test_verbatim_rewrite_is_idempotent():
+    output = rewrite(SOURCE, verbatim=True)
+    assert rewrite(output, verbatim=True) == output
+
+
+def test_profile_does_not_change_output():
+    for verbatim in (False, True):
+        expected = rewrite(SOURCE, verbatim)
+        assert rewrite(SOURCE, verbatim, ReaderProfile()) == expected
+
+
+@pytest.mark.parametrize("verbatim", [False, True])
+@pytest.mark.parametrize("binary", [False, True])
+def test_streaming_output_equals_code(verbatim, binary):
+    sink = io.BytesIO() if binary else io.StringIO()
+    reader = SmaliReader(comments=True)
+    writer = SmaliWriter(reader, sink=sink, verbatim=verbatim)
+    reader.visit(SOURCE, writer)
+    writer.flush()
+
+    output = sink.getvalue()
+    if binary:
+        output = output.decode("utf-8")
+    assert output == rewrite(SOURCE, verbatim)